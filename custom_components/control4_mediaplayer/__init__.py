@@ -1,24 +1,130 @@
+import asyncio
 import logging
+from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
 
-from .const import DEFAULT_UDP_TIMEOUT, DOMAIN, PREFIX
+from .const import (
+    CONF_NATIVE_MUTE,
+    CONF_ZONES,
+    DEFAULT_UDP_TIMEOUT,
+    DOMAIN,
+    HEARTBEAT_INTERVAL,
+    PREFIX,
+    REGISTER_SAVE_DELAY,
+    REGISTER_STORE_VERSION,
+    get_amp_identifier,
+    get_register_store_key,
+    get_zones,
+    parse_source_list,
+)
 from .frontend import async_register_frontend
-from .manager import Control4Manager
+from .manager import Control4Manager, input_gain_command, is_ack, parse_reply
+from .models import Control4ConfigEntry, Control4Data, async_loaded_entries, coalesced_state_writes
+from .presets import async_setup_presets
+from .reconcile import async_reconcile_amp
+from .slo import async_check_slo, async_delete_slo_issue
+from .startup import async_seed_from_startup_probe, async_start_startup_probe
+from .transport import RecordingTransport, save_capture
+from .websocket_api import async_invalidate_zone_map, async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = ["media_player", "number"]
+
+# Settings that change how the amp is reached require a full reload; so do zone additions/removals
+# and EQ toggles, which change which entities exist. Everything else is applied in place.
+RELOAD_KEYS = {"host", "port"}
+ZONE_RELOAD_KEYS = {"enable_eq"}
+
+# Per-zone settings of the legacy (version 1) one-entry-per-zone layout
+LEGACY_ZONE_KEYS = ("zone_custom_name", "on_volume", "source_list", "enable_eq")
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Control4 Media Player integration."""
+    # Runs before any entry is set up, so the amps are probed while the entries get going
+    async_start_startup_probe(hass)
+    async_setup_websocket_api(hass)
+    async_setup_presets(hass)
     await async_register_frontend(hass)
     return True
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Fold the legacy one-entry-per-zone layout into a single entry per amplifier.
+
+    The first zone entry of a host to migrate absorbs its siblings: their zone settings move
+    under `zones`, their entities and devices are handed over (unique IDs and entity IDs are
+    untouched), and the now empty sibling entries are marked migrated and removed. Until the
+    removal lands they keep their legacy data, which `async_setup_entry` leaves alone.
+    """
+    if entry.version > 1:
+        return True
+
+    host = entry.data.get("host")
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if any(other.version > 1 and CONF_ZONES in other.data and other.data.get("host") == host for other in entries):
+        # A stray zone entry of an amplifier that already has its own entry, which owns the zones
+        hass.config_entries.async_update_entry(entry, version=2)
+        hass.async_create_task(hass.config_entries.async_remove(entry.entry_id))
+        return True
+
+    siblings = sorted(
+        (other for other in entries if other.version == 1 and other.data.get("host") == host),
+        key=lambda other: other.data.get("channel", 0),
+    )
+    zones = {
+        str(other.data["channel"]): {key: other.data[key] for key in LEGACY_ZONE_KEYS if key in other.data}
+        for other in siblings
+        if "channel" in other.data
+    }
+    # Input gains are amp-wide and were only ever applied from channel 1
+    amp_source = next((other for other in siblings if other.data.get("channel") == 1), entry).data
+    new_data = {
+        "host": host,
+        "port": amp_source.get("port", 8750),
+        "name": amp_source.get("name", "Matrix Amp"),
+        "amp_size": amp_source.get("amp_size", "8"),
+        "udp_timeout": amp_source.get("udp_timeout", DEFAULT_UDP_TIMEOUT),
+        "input_gains": amp_source.get("input_gains", ""),
+        CONF_ZONES: zones,
+    }
+    hass.config_entries.async_update_entry(
+        entry,
+        data=new_data,
+        title=new_data["name"],
+        unique_id=f"{PREFIX}_{host}",
+        version=2,
+    )
+
+    ent_reg = er.async_get(hass)
+    dev_reg = dr.async_get(hass)
+    for other in siblings:
+        if other.entry_id == entry.entry_id:
+            continue
+        for reg_entry in er.async_entries_for_config_entry(ent_reg, other.entry_id):
+            ent_reg.async_update_entity(reg_entry.entity_id, config_entry_id=entry.entry_id)
+        for device in dr.async_entries_for_config_entry(dev_reg, other.entry_id):
+            dev_reg.async_update_device(device.id, add_config_entry_id=entry.entry_id)
+        # Marked migrated, so Home Assistant does not report a failed migration for it before it is gone
+        hass.config_entries.async_update_entry(other, version=2)
+        hass.async_create_task(hass.config_entries.async_remove(other.entry_id))
+
+    _LOGGER.info("Control4: migrated %d zone entries of %s into one amplifier entry", len(siblings), host)
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: Control4ConfigEntry) -> bool:
+    if CONF_ZONES not in entry.data:
+        # A zone entry folded into its amplifier's entry by the migration, about to be removed
+        return True
+
     ent_reg = er.async_get(hass)
     dev_reg = dr.async_get(hass)
     prefix = PREFIX
@@ -55,80 +161,356 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     _LOGGER.info("Control4: manager for %s:%s using UDP timeout %.2f seconds", host, port, udp_timeout)
 
-    hass.data.setdefault(DOMAIN, {})
     manager = Control4Manager(host, port, udp_timeout)
-    hass.data[DOMAIN][entry.entry_id] = {"manager": manager}
+
+    # Shadow registers survive restarts so reconciliation knows what the amp last acknowledged
+    store = Store(hass, REGISTER_STORE_VERSION, get_register_store_key(entry.entry_id))
+    manager.registers = await store.async_load() or {}
+    entry.async_on_unload(
+        manager.async_add_register_listener(
+            lambda: store.async_delay_save(lambda: dict(manager.registers), REGISTER_SAVE_DELAY)
+        )
+    )
+
+    # Native mute support is learned once and kept; an acknowledged mute in the shadow proves it too
+    manager.native_mute = entry.data.get(CONF_NATIVE_MUTE)
+    if manager.native_mute is None and any(key.startswith("c4.amp.mute ") for key in manager.registers):
+        manager.native_mute = True
+    entry.async_on_unload(
+        manager.async_add_capability_listener(
+            lambda: hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_NATIVE_MUTE: manager.native_mute}
+            )
+        )
+    )
+
+    # One record per amplifier; entities register themselves per channel during platform setup
+    entry.runtime_data = Control4Data(manager=manager, register_store=store, applied_data=dict(entry.data))
+
+    # Low-rate liveness check; skipped by the manager whenever real traffic was acked recently.
+    # The latency SLO is judged on the same beat.
+    async def _async_heartbeat(_now):
+        await manager.async_heartbeat()
+        async_check_slo(hass, entry)
+
+    entry.async_on_unload(
+        async_track_time_interval(hass, _async_heartbeat, timedelta(seconds=HEARTBEAT_INTERVAL))
+    )
 
     # Force device name to match user-set name from config entry
-    device = dev_reg.async_get_device(identifiers={(DOMAIN, f"v27_{host}_main_amp")})
+    device = dev_reg.async_get_device(identifiers={(DOMAIN, get_amp_identifier(host))})
     if device and device.name != amp_label:
         _LOGGER.info("Updating device name to %s", amp_label)
         dev_reg.async_update_device(device.id, name=amp_label)
 
-    # Apply input gains from config entry (only do it once for Channel 1)
-    if entry.data.get("channel") == 1:
-        input_gains_str = entry.data.get("input_gains", "")
-        if input_gains_str:
-            _LOGGER.info("Applying input gains for %s", amp_label)
-            gains = input_gains_str.split("\n")
-            for i, gain in enumerate(gains):
-                if gain.strip():
-                    try:
-                        gain_val = float(gain.strip())
-                        await manager.async_set_input_gain(i + 1, gain_val)
-                    except ValueError:
-                        _LOGGER.warning("Invalid input gain value in config: %s", gain)
+    # Reachability and RTT from the probe of all amps sent at integration start
+    await async_seed_from_startup_probe(hass, entry, manager)
+
+    # Apply input gains from config entry
+    await _async_apply_input_gains(entry, manager)
 
     if not hass.services.has_service(DOMAIN, "party_mode"):
 
-        async def handle_party_mode(call):
-            source = call.data.get("source")
-            volume = call.data.get("volume", 50)
-            for current_entry in hass.config_entries.async_entries(DOMAIN):
-                if current_entry.entry_id in hass.data.get(DOMAIN, {}):
-                    manager = hass.data[DOMAIN][current_entry.entry_id]["manager"]
-                    channel = current_entry.data.get("channel")
-                    source_list = current_entry.data.get("source_list", "").split("\n")
-                    sources = [s.strip() for s in source_list if s.strip()]
-                    if source in sources:
-                        idx = sources.index(source) + 1
-                        await manager.async_send_command("c4.amp.psave 00 00")
-                        await manager.async_send_command(f"c4.amp.out {channel:02x} {idx:02x}")
-                        vol_hex = f"{int(volume + 155):02x}"
-                        await manager.async_send_command(f"c4.amp.chvol {channel:02x} {vol_hex}")
-
-        hass.services.async_register(DOMAIN, "party_mode", handle_party_mode)
+        async def handle_party_mode(call: ServiceCall) -> ServiceResponse:
+            return await async_party_mode(hass, call.data.get("source"), call.data.get("volume", 50))
+
+        hass.services.async_register(
+            DOMAIN, "party_mode", handle_party_mode, supports_response=SupportsResponse.OPTIONAL
+        )
 
     if not hass.services.has_service(DOMAIN, "send_raw_command"):
 
-        async def handle_send_raw_command(call):
-            command = call.data.get("command")
+        async def handle_send_raw_command(call: ServiceCall) -> ServiceResponse:
             entity_ids = call.data.get("entity_id", [])
             if isinstance(entity_ids, str):
                 entity_ids = [entity_ids]
+            return await async_send_raw_command(hass, call.data.get("command"), entity_ids)
 
-            for entity_id in entity_ids:
-                entity = ent_reg.async_get(entity_id)
-                if entity and entity.config_entry_id in hass.data.get(DOMAIN, {}):
-                    manager = hass.data[DOMAIN][entity.config_entry_id]["manager"]
-                    await manager.async_send_command(command)
+        hass.services.async_register(
+            DOMAIN, "send_raw_command", handle_send_raw_command, supports_response=SupportsResponse.OPTIONAL
+        )
 
-        hass.services.async_register(DOMAIN, "send_raw_command", handle_send_raw_command)
+    if not hass.services.has_service(DOMAIN, "record_traffic"):
+
+        async def handle_record_traffic(call: ServiceCall) -> ServiceResponse:
+            entity_ids = call.data.get("entity_id", [])
+            if isinstance(entity_ids, str):
+                entity_ids = [entity_ids]
+            return async_start_record_traffic(hass, entity_ids, float(call.data.get("duration", 60)))
+
+        hass.services.async_register(
+            DOMAIN, "record_traffic", handle_record_traffic, supports_response=SupportsResponse.OPTIONAL
+        )
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
-    await hass.config_entries.async_forward_entry_setups(entry, ["media_player", "number"])
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_invalidate_zone_map(hass)
+
+    # Entities have restored their state by now; converge the amp without holding up startup
+    hass.async_create_task(async_reconcile_amp(hass, entry))
     return True
 
 
-async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def async_party_mode(hass: HomeAssistant, source: str, volume: float) -> dict:
+    """Route `source` to every zone that has it, on all amplifiers at once.
+
+    Each amp gets one batch, and amps run concurrently, so the whole house takes about as long
+    as the slowest amp. Entity states are published together once every amp has answered.
+    Returns per-zone success and latency.
+    """
+    with coalesced_state_writes():
+        results = await asyncio.gather(
+            *(_async_party_mode_amp(entry, source, volume) for entry in async_loaded_entries(hass))
+        )
+    return {"zones": [zone for amp_zones in results for zone in amp_zones]}
+
+
+async def _async_party_mode_amp(entry: Control4ConfigEntry, source: str, volume: float) -> list[dict]:
+    record = entry.runtime_data
+    targets = []
+    for channel, zone in get_zones(entry.data).items():
+        sources = parse_source_list(zone.get("source_list", ""))
+        if source not in sources:
+            continue
+        # The max volume limit is enforced in software only, so it has to be applied here too
+        zone_volume = min(volume, record.manager.zone(channel).max_volume)
+        targets.append((channel, zone, sources.index(source) + 1, zone_volume))
+    if not targets:
+        return []
+
+    # Same order as turning a zone on: volumes first, then wake from power save, then route
+    commands = [f"c4.amp.chvol {channel:02x} {int(zone_volume + 155):02x}" for channel, _, _, zone_volume in targets]
+    commands.append("c4.amp.psave 00 00")
+    commands += [f"c4.amp.out {channel:02x} {idx:02x}" for channel, _, idx, _ in targets]
+    replies = await record.manager.async_send_batch(commands)
+
+    count = len(targets)
+    wake_ok = is_ack(replies[count][0])
+    zones = []
+    for i, (channel, zone, idx, zone_volume) in enumerate(targets):
+        (vol_reply, _), (out_reply, _) = replies[i], replies[count + 1 + i]
+        success = wake_ok and is_ack(vol_reply) and is_ack(out_reply)
+        media_player = record.media_players.get(channel)
+        if success and media_player is not None:
+            media_player.async_apply_party_mode(idx, zone_volume / 100.0)
+        zones.append(
+            {
+                "entity_id": media_player.entity_id if media_player is not None else None,
+                "amp": entry.data.get("name", "Matrix Amp"),
+                "channel": channel,
+                "zone": zone.get("zone_custom_name", f"Zone {channel}"),
+                "volume": zone_volume,
+                "success": success,
+                # Time from the start of the amp's batch until this zone was routed
+                "latency_ms": round(sum(latency for _, latency in replies[: count + 2 + i]), 1),
+            }
+        )
+    return zones
+
+
+@callback
+def _async_target_entries(
+    hass: HomeAssistant, entity_ids: list[str]
+) -> tuple[dict[str, Control4ConfigEntry], dict[str, list[str]]]:
+    """Loaded entries by ID, and the targeted entity IDs grouped by the entry (amplifier) behind them."""
+    ent_reg = er.async_get(hass)
+    entries = {entry.entry_id: entry for entry in async_loaded_entries(hass)}
+    targets: dict[str, list[str]] = {}
+    for entity_id in entity_ids:
+        entity = ent_reg.async_get(entity_id)
+        if entity and entity.config_entry_id in entries:
+            targets.setdefault(entity.config_entry_id, []).append(entity_id)
+    return entries, targets
+
+
+async def async_send_raw_command(hass: HomeAssistant, command: str, entity_ids: list[str]) -> dict:
+    """Send `command` once to every amplifier behind `entity_ids`, all amplifiers concurrently.
+
+    Zones of the same amp share one UDP endpoint, so targeting several of them sends the command
+    once. Returns each amp's reply and latency along with the targeted entities behind it.
+    """
+    entries, targets = _async_target_entries(hass, entity_ids)
+
+    async def _async_send(entry_id: str) -> dict:
+        manager = entries[entry_id].runtime_data.manager
+        [(reply, latency_ms)] = await manager.async_send_batch([command])
+        return {
+            "entry_id": entry_id,
+            "host": manager.host,
+            "entity_ids": targets[entry_id],
+            "success": is_ack(reply),
+            "reply": parse_reply(reply),
+            "latency_ms": latency_ms,
+        }
+
+    return {"amps": await asyncio.gather(*(_async_send(entry_id) for entry_id in targets))}
+
+
+@callback
+def async_start_record_traffic(hass: HomeAssistant, entity_ids: list[str], duration: float) -> dict:
+    """Start recording every exchange with the amplifiers behind `entity_ids` for `duration` seconds.
+
+    Each amp records in a background task of its entry, so the caller does not wait out the window.
+    When it ends, the capture (send offset, command, reply, latency) is written to
+    `control4_capture_<host>.json` in the config directory, ready for `ReplayTransport`.
+    Returns the file each amp's capture will be written to.
+    """
+    entries, targets = _async_target_entries(hass, entity_ids)
+    amps = []
+    for entry_id in targets:
+        entry = entries[entry_id]
+        manager = entry.runtime_data.manager
+        recorder = RecordingTransport(manager.transport, manager.host)
+        manager.transport = recorder
+        path = hass.config.path(f"control4_capture_{manager.host}.json")
+        entry.async_create_background_task(
+            hass, _async_finish_recording(hass, manager, recorder, duration, path), f"{DOMAIN} record {manager.host}"
+        )
+        amps.append({"entry_id": entry_id, "host": manager.host, "file": path})
+    return {"amps": amps, "duration": duration}
+
+
+async def _async_finish_recording(
+    hass: HomeAssistant, manager: Control4Manager, recorder: RecordingTransport, duration: float, path: str
+) -> None:
+    """Record for `duration` seconds, then put the amp's transport back and write the capture to `path`."""
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        if manager.transport is recorder:
+            manager.transport = recorder.inner
+    await hass.async_add_executor_job(save_capture, path, recorder.capture())
+    _LOGGER.info("Control4: recorded %d exchange(s) with %s to %s", len(recorder.exchanges), manager.host, path)
+
+
+async def _async_apply_input_gains(entry: ConfigEntry, manager: Control4Manager) -> None:
+    """Send the configured input gain trims (amp-wide, shared by all zones) that the amp does not hold yet.
+
+    The shadow registers remember the last acknowledged gain of every input across restarts, so
+    setups and reloads only send the inputs whose trim actually changed, as one batch.
+    """
+    commands = []
+    for i, gain in enumerate(entry.data.get("input_gains", "").split("\n")):
+        if not gain.strip():
+            continue
+        try:
+            command = input_gain_command(i + 1, float(gain.strip()))
+        except ValueError:
+            _LOGGER.warning("Invalid input gain value in config: %s", gain)
+            continue
+        if not manager.register_holds(command):
+            commands.append(command)
+
+    if commands and not manager.available:
+        # Known unreachable: resend once the amp answers rather than time out on every input
+        manager.queue(commands)
+    elif commands:
+        _LOGGER.info(
+            "Control4: applying %d changed input gain(s) for %s", len(commands), entry.data.get("name", "Matrix Amp")
+        )
+        await manager.async_send_batch(commands)
+
+
+def _diff_entry_data(applied: dict, data: dict) -> tuple[set, dict[int, set]]:
+    """Return the changed amp-level keys and the changed keys of every zone (added/removed zones get all keys)."""
+    amp_changed = {
+        key for key in (applied.keys() | data.keys()) - {CONF_ZONES} if applied.get(key) != data.get(key)
+    }
+    old_zones, new_zones = get_zones(applied), get_zones(data)
+    zone_changed = {}
+    for channel in old_zones.keys() | new_zones.keys():
+        old_zone, new_zone = old_zones.get(channel), new_zones.get(channel)
+        if old_zone is None or new_zone is None:
+            zone_changed[channel] = {CONF_ZONES}
+            continue
+        keys = {key for key in old_zone.keys() | new_zone.keys() if old_zone.get(key) != new_zone.get(key)}
+        if keys:
+            zone_changed[channel] = keys
+    return amp_changed, zone_changed
+
+
+@callback
+def _async_claim_changes(hass: HomeAssistant, entry: Control4ConfigEntry) -> tuple[set, dict[int, set]] | None:
+    """Return what changed since the entry was last applied and mark it as applied."""
+    entry_data = getattr(entry, "runtime_data", None)
+    if entry_data is None:
+        return None
+
+    amp_changed, zone_changed = _diff_entry_data(entry_data.applied_data, entry.data)
+    entry_data.applied_data = dict(entry.data)
+    if not amp_changed and not zone_changed:
+        return None
+    return amp_changed, zone_changed
+
+
+async def update_listener(hass: HomeAssistant, entry: Control4ConfigEntry) -> None:
+    """Handle options update, applying changes in place unless the platforms must be rebuilt."""
+    changes = _async_claim_changes(hass, entry)
+    if changes is None:
+        return
+    async_invalidate_zone_map(hass)
+
+    amp_changed, zone_changed = changes
+    if amp_changed & RELOAD_KEYS or any(keys & (ZONE_RELOAD_KEYS | {CONF_ZONES}) for keys in zone_changed.values()):
+        _LOGGER.debug("Control4: reloading %s, changed %s %s", entry.entry_id, sorted(amp_changed), zone_changed)
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    await _async_hot_apply(hass, entry, amp_changed, zone_changed)
+
+
+async def _async_hot_apply(
+    hass: HomeAssistant, entry: Control4ConfigEntry, amp_changed: set, zone_changed: dict[int, set]
+) -> None:
+    """Push changed settings into the running manager and entities without a reload."""
+    _LOGGER.debug("Control4: hot-applying %s %s to %s", sorted(amp_changed), zone_changed, entry.entry_id)
+    entry_data = entry.runtime_data
+    manager = entry_data.manager
+
+    if "udp_timeout" in amp_changed:
+        manager.udp_timeout = float(entry.data.get("udp_timeout", DEFAULT_UDP_TIMEOUT))
+
+    if "name" in amp_changed:
+        dev_reg = dr.async_get(hass)
+        amp_label = entry.data.get("name", "Matrix Amp")
+        device = dev_reg.async_get_device(identifiers={(DOMAIN, get_amp_identifier(entry.data.get("host")))})
+        if device and device.name != amp_label:
+            dev_reg.async_update_device(device.id, name=amp_label)
+
+    with coalesced_state_writes():
+        for channel, keys in zone_changed.items():
+            if not keys & {"zone_custom_name", "source_list"}:
+                # on_volume is read from the entry on every turn-on, nothing to push
+                continue
+            media_player = entry_data.media_players.get(channel)
+            if media_player:
+                media_player.async_apply_entry_data()
+            if "zone_custom_name" in keys:
+                for number_entity in entry_data.number_entities.get(channel, []):
+                    number_entity.async_apply_entry_data()
+
+    if "input_gains" in amp_changed:
+        await _async_apply_input_gains(entry, manager)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the persisted shadow registers and any repair issue of a deleted amplifier."""
+    async_delete_slo_issue(hass, entry.entry_id)
+    await Store(hass, REGISTER_STORE_VERSION, get_register_store_key(entry.entry_id)).async_remove()
 
 
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+async def async_unload_entry(hass: HomeAssistant, entry: Control4ConfigEntry) -> bool:
     """Unload entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, ["media_player", "number"])
-    if unload_ok and entry.entry_id in hass.data.get(DOMAIN, {}):
-        hass.data[DOMAIN].pop(entry.entry_id)
+    if CONF_ZONES not in entry.data:
+        # Folded into its amplifier's entry by the migration: nothing was set up
+        return True
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        record = entry.runtime_data
+        # Write pending register changes now so a reload starts from the latest shadow
+        await record.register_store.async_save(dict(record.manager.registers))
+        record.manager.close()
+        async_delete_slo_issue(hass, entry.entry_id)
+    async_invalidate_zone_map(hass)
     return unload_ok
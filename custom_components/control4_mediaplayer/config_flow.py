@@ -1,10 +1,31 @@
+import ipaddress
+import logging
+
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
 from homeassistant.core import callback
 from homeassistant.helpers import selector
 
-from .const import DEFAULT_UDP_TIMEOUT, DOMAIN
+from .const import (
+    CONF_LINK_LEADER,
+    CONF_LINK_OFFSET,
+    CONF_SLO_P95_MS,
+    CONF_SLO_TIMEOUT_RATE,
+    CONF_ZONES,
+    DEFAULT_PORT,
+    DEFAULT_SLO_P95_MS,
+    DEFAULT_SLO_TIMEOUT_RATE,
+    DEFAULT_UDP_TIMEOUT,
+    DOMAIN,
+    PREFIX,
+    get_followers,
+    get_zone_data,
+    get_zones,
+)
+from .discovery import async_discover_amps, parse_host_range
+
+_LOGGER = logging.getLogger(__name__)
 
 
 def int_to_little_endian_hex(val: int) -> str:
@@ -20,7 +41,7 @@ def int_to_little_endian_hex(val: int) -> str:
 class Control4ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Control4 Media Player."""
 
-    VERSION = 1
+    VERSION = 2
 
     @staticmethod
     @callback
@@ -31,20 +52,89 @@ class Control4ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self):
         """Initialize the config flow."""
         self.init_info = {}
+        self._discovered = {}
+        self._selected_host = None
+        self._selected_port = DEFAULT_PORT
 
     async def async_step_user(self, user_input=None):
+        """Let the user scan the network or enter the amplifier address by hand."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_discover(self, user_input=None):
+        """Sweep a subnet or address range for amplifiers answering on the control port."""
+        errors = {}
+        if user_input is not None:
+            try:
+                parse_host_range(user_input["host_range"])
+            except ValueError:
+                errors["host_range"] = "invalid_range"
+            else:
+                self._selected_port = user_input[CONF_PORT]
+                found = await async_discover_amps(user_input["host_range"], self._selected_port)
+                if found:
+                    self._discovered = dict(found)
+                    return await self.async_step_discover_select()
+                errors["base"] = "no_devices_found"
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("host_range", default=await self._async_default_host_range()): str,
+                    vol.Required(CONF_PORT, default=self._selected_port): int,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_discover_select(self, user_input=None):
+        """Pick one of the amplifiers that answered the sweep."""
+        if user_input is not None:
+            self._selected_host = user_input[CONF_HOST]
+            return await self.async_step_manual()
+
+        configured = {entry.data.get(CONF_HOST) for entry in self._async_current_entries()}
+        choices = {
+            host: f"{host} ({rtt:.0f} ms){' - already configured' if host in configured else ''}"
+            for host, rtt in self._discovered.items()
+        }
+        return self.async_show_form(
+            step_id="discover_select",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(choices)}),
+            description_placeholders={"count": str(len(choices))},
+        )
+
+    async def _async_default_host_range(self) -> str:
+        """Suggest the /24 around Home Assistant's own address."""
+        try:
+            from homeassistant.components import network
+
+            source_ip = await network.async_get_source_ip(self.hass)
+            return str(ipaddress.IPv4Network(f"{source_ip}/24", strict=False))
+        except Exception as err:
+            # Only a suggestion; never block the flow on it
+            _LOGGER.debug("Could not determine local subnet for discovery: %s", err)
+            return ""
+
+    async def async_step_manual(self, user_input=None):
         if user_input is not None:
+            # One entry per amplifier
+            await self.async_set_unique_id(f"{PREFIX}_{user_input[CONF_HOST]}")
+            self._abort_if_unique_id_configured()
             self.init_info = user_input
             return await self.async_step_zones()
 
         default_sources = "\n".join([f"Input {i}" for i in range(1, 9)])
+        host_field = (
+            vol.Required(CONF_HOST, default=self._selected_host) if self._selected_host else vol.Required(CONF_HOST)
+        )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_HOST): str,
-                    vol.Required(CONF_PORT, default=8750): int,
+                    host_field: str,
+                    vol.Required(CONF_PORT, default=self._selected_port): int,
                     vol.Optional(CONF_NAME, default="Matrix Amp"): str,
                     vol.Required("amp_size", default="8"): vol.In({"4": "4-Zone", "8": "8-Zone"}),
                     vol.Required("source_list", default=default_sources): selector.TextSelector(
@@ -64,16 +154,28 @@ class Control4ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
     async def async_step_zones(self, user_input=None):
-        """Zone naming step."""
+        """Zone naming step. All named zones become part of one amplifier entry."""
         if user_input is not None:
-            for key, zone_name in user_input.items():
-                if zone_name.strip():
-                    await self.hass.config_entries.flow.async_init(
-                        DOMAIN,
-                        context={"source": config_entries.SOURCE_IMPORT},
-                        data={**self.init_info, "channel": int(key.replace("zone", "")), "zone_custom_name": zone_name},
-                    )
-            return self.async_abort(reason="bulk_add_success")
+            zones = {
+                key.replace("zone", ""): {
+                    "zone_custom_name": zone_name.strip(),
+                    "on_volume": 50,
+                    "source_list": self.init_info.get("source_list", ""),
+                    "enable_eq": self.init_info.get("enable_eq", False),
+                }
+                for key, zone_name in user_input.items()
+                if zone_name.strip()
+            }
+            data = {
+                CONF_HOST: self.init_info[CONF_HOST],
+                CONF_PORT: self.init_info.get(CONF_PORT, DEFAULT_PORT),
+                CONF_NAME: self.init_info.get(CONF_NAME, "Matrix Amp"),
+                "amp_size": self.init_info.get("amp_size", "8"),
+                "udp_timeout": self.init_info.get("udp_timeout", DEFAULT_UDP_TIMEOUT),
+                "input_gains": "",
+                CONF_ZONES: zones,
+            }
+            return self.async_create_entry(title=data[CONF_NAME], data=data)
 
         fields = {
             vol.Optional(f"zone{i}", default=f"Zone {i}"): str
@@ -81,59 +183,99 @@ class Control4ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         }
         return self.async_show_form(step_id="zones", data_schema=vol.Schema(fields))
 
-    async def async_step_import(self, data):
-        """Create entry with v27 prefix to ensure clean registration."""
-        await self.async_set_unique_id(f"v27_{data[CONF_HOST]}_ch{data['channel']}")
-        self._abort_if_unique_id_configured()
-        return self.async_create_entry(title=data["zone_custom_name"], data=data)
-
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
-    """Standalone options flow handler with bulk copy functionality."""
+    """Standalone options flow handler: amplifier-wide settings and per-zone settings."""
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Initialize with a private entry reference."""
         self._entry = config_entry
-        self._preset_data = {}
+        self._channel = None
 
     async def async_step_init(self, user_input=None):
         """Manage the settings menu."""
-        return await self.async_step_zone_settings(user_input)
+        return self.async_show_menu(step_id="init", menu_options=["zone_select", "amp_settings"])
 
-    async def async_step_zone_settings(self, user_input=None):
+    async def async_step_zone_select(self, user_input=None):
+        """Pick the zone to configure."""
+        zones = get_zones(self._entry.data)
         if user_input is not None:
+            self._channel = int(user_input["zone"])
+            return await self.async_step_zone_settings()
+
+        choices = {str(channel): zone.get("zone_custom_name", f"Zone {channel}") for channel, zone in zones.items()}
+        return self.async_show_form(
+            step_id="zone_select",
+            data_schema=vol.Schema({vol.Required("zone"): vol.In(choices)}),
+        )
+
+    async def async_step_zone_settings(self, user_input=None):
+        zone = get_zone_data(self._entry.data, self._channel)
+        errors = {}
+        if user_input is not None and user_input.get(CONF_LINK_LEADER) and get_followers(
+            self._entry.data, self._channel
+        ):
+            # Links are one level deep: a leader cannot follow another zone
+            errors[CONF_LINK_LEADER] = "link_chain"
+        elif user_input is not None:
             sync_all = user_input.pop("copy_to_all", False)
-            sync_timeout = user_input.pop("copy_timeout_to_all", False)
-            new_data = {**self._entry.data, **user_input}
-            self.hass.config_entries.async_update_entry(self._entry, data=new_data)
-
-            if sync_all or sync_timeout:
-                current_entries = self.hass.config_entries.async_entries(DOMAIN)
-                for entry in current_entries:
-                    if entry.entry_id != self._entry.entry_id:
-                        updated_data = {**entry.data}
-                        if sync_all:
-                            updated_data["source_list"] = user_input.get("source_list")
-                            updated_data["input_gains"] = user_input.get("input_gains", "")
-                            updated_data["enable_eq"] = user_input.get("enable_eq", False)
-                        if sync_timeout:
-                            updated_data["udp_timeout"] = user_input.get("udp_timeout", DEFAULT_UDP_TIMEOUT)
-                        self.hass.config_entries.async_update_entry(entry, data=updated_data)
+            zones = {key: dict(value) for key, value in self._entry.data.get(CONF_ZONES, {}).items()}
+            zones[str(self._channel)] = {**zone, **user_input}
+
+            if sync_all:
+                for other in zones.values():
+                    other["source_list"] = user_input.get("source_list")
+                    other["enable_eq"] = user_input.get("enable_eq", False)
 
+            # A single entry update, so copying to every zone costs one apply for the whole amp
+            self.hass.config_entries.async_update_entry(self._entry, data={**self._entry.data, CONF_ZONES: zones})
             return self.async_create_entry(title="", data=None)
 
+        # Zones that already follow another zone cannot be leaders
+        leaders = [
+            selector.SelectOptionDict(value=str(channel), label=other.get("zone_custom_name", f"Zone {channel}"))
+            for channel, other in get_zones(self._entry.data).items()
+            if channel != self._channel and not other.get(CONF_LINK_LEADER)
+        ]
         return self.async_show_form(
             step_id="zone_settings",
             data_schema=vol.Schema(
                 {
-                    vol.Required("zone_custom_name", default=self._entry.data.get("zone_custom_name", "")): str,
-                    vol.Required("on_volume", default=self._entry.data.get("on_volume", 50)): vol.All(
+                    vol.Required("zone_custom_name", default=zone.get("zone_custom_name", "")): str,
+                    vol.Required("on_volume", default=zone.get("on_volume", 50)): vol.All(
                         vol.Coerce(int), vol.Range(min=0, max=100)
                     ),
-                    vol.Required("source_list", default=self._entry.data.get("source_list", "")): selector.TextSelector(
+                    vol.Required("source_list", default=zone.get("source_list", "")): selector.TextSelector(
                         selector.TextSelectorConfig(multiline=True)
                     ),
-                    vol.Optional("enable_eq", default=self._entry.data.get("enable_eq", False)): bool,
+                    vol.Optional("enable_eq", default=zone.get("enable_eq", False)): bool,
+                    vol.Optional(CONF_LINK_LEADER, default=zone.get(CONF_LINK_LEADER) or ""): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[selector.SelectOptionDict(value="", label="-"), *leaders],
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                        )
+                    ),
+                    vol.Optional(CONF_LINK_OFFSET, default=zone.get(CONF_LINK_OFFSET, 0)): vol.All(
+                        vol.Coerce(int), vol.Range(min=-50, max=50)
+                    ),
+                    vol.Optional("copy_to_all", default=False): bool,
+                }
+            ),
+            errors=errors,
+            description_placeholders={"zone": zone.get("zone_custom_name", f"Zone {self._channel}")},
+        )
+
+    async def async_step_amp_settings(self, user_input=None):
+        """Settings shared by every zone of the amplifier."""
+        if user_input is not None:
+            self.hass.config_entries.async_update_entry(self._entry, data={**self._entry.data, **user_input})
+            return self.async_create_entry(title="", data=None)
+
+        return self.async_show_form(
+            step_id="amp_settings",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NAME, default=self._entry.data.get(CONF_NAME, "Matrix Amp")): str,
                     vol.Optional(
                         "input_gains",
                         default=self._entry.data.get("input_gains") or "0\n0\n0\n0\n0\n0\n0\n0"
@@ -151,8 +293,30 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             mode=selector.NumberSelectorMode.SLIDER,
                         )
                     ),
-                    vol.Optional("copy_to_all", default=False): bool,
-                    vol.Optional("copy_timeout_to_all", default=False): bool,
+                    vol.Optional(
+                        CONF_SLO_P95_MS,
+                        default=self._entry.data.get(CONF_SLO_P95_MS, DEFAULT_SLO_P95_MS),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=25,
+                            max=2000,
+                            step=25,
+                            unit_of_measurement="ms",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_SLO_TIMEOUT_RATE,
+                        default=self._entry.data.get(CONF_SLO_TIMEOUT_RATE, DEFAULT_SLO_TIMEOUT_RATE),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1,
+                            max=50,
+                            step=1,
+                            unit_of_measurement="%",
+                            mode=selector.NumberSelectorMode.SLIDER,
+                        )
+                    ),
                 }
             ),
         )
@@ -5,12 +5,63 @@ CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_CHANNEL = "channel"
 CONF_SOURCE_LIST = "source_list"
+CONF_ZONES = "zones"
+CONF_LINK_LEADER = "link_leader"   # channel this zone follows ("" when not linked)
+CONF_LINK_OFFSET = "link_offset"   # volume offset from the leader, in percent
+CONF_NATIVE_MUTE = "native_mute"   # learned: whether the amp accepts c4.amp.mute (absent while unknown)
 
 DEFAULT_PORT = 8750
 DEFAULT_VOLUME = 5                 # percent
 DEFAULT_SOURCE_LIST = ["1", "2", "3", "4"]
 DEFAULT_UDP_TIMEOUT = 2.0
 
+# Availability tracking
+HEARTBEAT_INTERVAL = 30            # seconds between liveness checks of an idle amp
+HEARTBEAT_COMMAND = "c4.sy.fwv"    # read-only firmware query; any reply (even n01) proves the amp is alive
+UNAVAILABLE_AFTER_FAILURES = 3     # consecutive unanswered commands before entities go unavailable
+
+ADDRESS_TTL = 300                  # seconds a resolved amplifier hostname is trusted
+RESOLVE_AFTER_FAILURES = 2         # consecutive unanswered commands before the hostname is resolved again
+
+# Latency SLO per amp: a repair issue is raised while p95 latency or the timeout rate stays too high
+CONF_SLO_P95_MS = "slo_p95_ms"
+CONF_SLO_TIMEOUT_RATE = "slo_timeout_rate"
+DEFAULT_SLO_P95_MS = 250
+DEFAULT_SLO_TIMEOUT_RATE = 10      # percent of commands
+SLO_WINDOW = 300                   # seconds of recent traffic judged
+SLO_MIN_SAMPLES = 5                # fewer commands in the window are not judged
+SLO_MAX_SAMPLES = 200              # per-amp sample buffer
+SLO_BREACH_CHECKS = 3              # consecutive failing checks (one per heartbeat interval) before raising
+
+# Subnet discovery
+DISCOVERY_TIMEOUT = 1.0            # seconds to wait for each probe reply
+DISCOVERY_CONCURRENCY = 128        # probes in flight at once (a /24 sweep takes two timeout windows)
+DISCOVERY_MAX_HOSTS = 1024
+
+# Shadow registers: last value the amp acknowledged per register, persisted across restarts.
+# Maps each tracked command to how many of its arguments address the register (the rest is the value).
+REGISTER_COMMANDS = {
+    "c4.amp.chvol": 1,
+    "c4.amp.out": 1,
+    "c4.amp.mute": 1,
+    "c4.amp.trebgain": 1,
+    "c4.amp.bassgain": 1,
+    "c4.amp.bal": 1,
+    "c4.amp.ingain": 1,
+    "c4.amp.psave": 0,
+}
+# Commands whose first argument is the channel; their latency and drops are tracked per zone
+ZONE_COMMANDS = {
+    "c4.amp.chvol", "c4.amp.out", "c4.amp.mute", "c4.amp.trebgain", "c4.amp.bassgain", "c4.amp.bal",
+    "c4.amp.chvolmax", "c4.amp.chmode",
+}
+REGISTER_STORE_VERSION = 1
+REGISTER_SAVE_DELAY = 5            # seconds; coalesces bursts of changes into one write
+
+# Named presets: zone snapshots shared by all amplifiers, persisted in one store
+PRESET_STORE_VERSION = 1
+PRESET_STORE_KEY = f"{DOMAIN}.presets"
+
 PREFIX = "v27"
 
 def get_unique_id(host: str, channel: int, suffix: str = None) -> str:
@@ -25,3 +76,39 @@ def get_entity_name(zone_custom_name: str, name_suffix: str = None) -> str:
         return f"{zone_custom_name} {name_suffix}"
     return zone_custom_name
 
+def get_amp_identifier(host: str) -> str:
+    """Device registry identifier shared by every zone of one amplifier."""
+    return f"{PREFIX}_{host}_main_amp"
+
+def get_zones(entry_data: dict) -> dict[int, dict]:
+    """Return the configured zones of an amplifier entry keyed by integer channel."""
+    return {int(channel): zone for channel, zone in entry_data.get(CONF_ZONES, {}).items()}
+
+def get_zone_data(entry_data: dict, channel: int) -> dict:
+    """Return the settings of one zone of an amplifier entry."""
+    return entry_data.get(CONF_ZONES, {}).get(str(channel), {})
+
+def get_followers(entry_data: dict, leader: int) -> list[tuple[int, int]]:
+    """Return (channel, volume offset %) of every zone linked to follow `leader` on the same amp."""
+    return [
+        (channel, int(zone.get(CONF_LINK_OFFSET, 0)))
+        for channel, zone in get_zones(entry_data).items()
+        if channel != leader and str(zone.get(CONF_LINK_LEADER) or "") == str(leader)
+    ]
+
+def get_register_store_key(entry_id: str) -> str:
+    """Storage key of the shadow registers of one amplifier entry."""
+    return f"{DOMAIN}.{entry_id}.registers"
+
+def volume_to_hex(volume: float) -> str:
+    """Amp volume byte for a 0.0-1.0 level (percent + 155)."""
+    return f"{int(float(volume) * 100) + 155:02x}"
+
+def hex_to_volume(value: str) -> float:
+    """Inverse of volume_to_hex."""
+    return (int(value, 16) - 155) / 100.0
+
+def parse_source_list(raw_sources: str) -> list[str]:
+    """Split the multiline source list setting into input names (input 1 first)."""
+    return [s.strip() for s in (raw_sources or "").split("\n") if s.strip()]
+
@@ -1,11 +1,14 @@
+from .const import volume_to_hex
+
+
 class control4AmpChannel:
     """Represents a channel of a Control 4 Matrix Amp."""
 
     def __init__(self, manager, channel):
         self._manager = manager
         self._channel = channel
-        self._source = 1
-        self._volume = 0
+        # Shared with every other entity of this zone through the manager
+        self._zone = manager.zone(channel)
 
     @property
     def channel(self):
@@ -13,30 +16,28 @@ class control4AmpChannel:
 
     @property
     def source(self):
-        return self._source
+        return self._zone.source
 
     async def async_set_source(self, value):
-        self._source = value
-        cmd = f"c4.amp.out {int(self._channel):02x} {int(self._source):02x}"
+        self._zone.source = int(value)
+        cmd = f"c4.amp.out {int(self._channel):02x} {self._zone.source:02x}"
         return await self._manager.async_send_command(cmd)
 
     @property
     def volume(self):
-        return self._volume
+        return self._zone.volume
 
     async def async_set_volume(self, value):
-        self._volume = value
+        self._zone.volume = value
         # Volume offset formula: hex(percentage + 155)
-        new_volume = int(float(self._volume) * 100) + 155
-        new_volume_hex = f"{new_volume:02x}"
-        cmd = f"c4.amp.chvol {int(self._channel):02x} {new_volume_hex}"
+        cmd = f"c4.amp.chvol {int(self._channel):02x} {volume_to_hex(value)}"
         return await self._manager.async_send_command(cmd)
 
     async def async_turn_on(self):
         # Disable power save (wake up)
         await self._manager.async_send_command("c4.amp.psave 00 00")
-        # Route the input to this channel
-        cmd = f"c4.amp.out {int(self._channel):02x} {int(self._source):02x}"
+        # Route the input to this channel (input 1 while the source is unknown)
+        cmd = f"c4.amp.out {int(self._channel):02x} {self._zone.source or 1:02x}"
         return await self._manager.async_send_command(cmd)
 
     async def async_turn_off(self):
@@ -45,11 +46,13 @@ class control4AmpChannel:
         return await self._manager.async_send_command(cmd)
 
     async def async_mute_volume(self, mute: bool):
-        # Try native muting first
-        val = "01" if mute else "00"
-        cmd = f"c4.amp.mute {int(self._channel):02x} {val}"
-        res = await self._manager.async_send_command(cmd)
-        
+        # Try native muting first, unless the amp is known to refuse it
+        res = None
+        if self._manager.native_mute is not False:
+            val = "01" if mute else "00"
+            cmd = f"c4.amp.mute {int(self._channel):02x} {val}"
+            res = await self._manager.async_send_command(cmd)
+
         # If native muting fails or is not supported (timed out/error returned), fallback to volume-based muting
         if not res or "n01" in res:
             if mute:
@@ -58,8 +61,14 @@ class control4AmpChannel:
                 return await self._manager.async_send_command(cmd)
             else:
                 # Restore previous volume
-                new_volume = int(float(self._volume) * 100) + 155
-                new_volume_hex = f"{new_volume:02x}"
-                cmd = f"c4.amp.chvol {int(self._channel):02x} {new_volume_hex}"
+                cmd = f"c4.amp.chvol {int(self._channel):02x} {volume_to_hex(self._zone.volume)}"
+                return await self._manager.async_send_command(cmd)
+        elif not mute:
+            # A fallback mute that reached the amp later (queued while it was unreachable) may
+            # still hold the volume at 0, which a native unmute does not lift
+            zone_hex = f"{int(self._channel):02x}"
+            volume_hex = volume_to_hex(self._zone.volume)
+            if self._manager.registers.get(f"c4.amp.chvol {zone_hex}") == "9b" and volume_hex != "9b":
+                cmd = f"c4.amp.chvol {zone_hex} {volume_hex}"
                 return await self._manager.async_send_command(cmd)
         return res
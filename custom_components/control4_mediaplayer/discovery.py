@@ -0,0 +1,118 @@
+import asyncio
+import ipaddress
+import logging
+import time
+from collections.abc import Iterable
+
+from .const import (
+    DEFAULT_PORT,
+    DISCOVERY_CONCURRENCY,
+    DISCOVERY_MAX_HOSTS,
+    DISCOVERY_TIMEOUT,
+    HEARTBEAT_COMMAND,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_host_range(value: str) -> list[str]:
+    """Expand a CIDR subnet ("192.168.1.0/24"), a range ("192.168.1.10-192.168.1.60") or a single IP.
+
+    Raises ValueError for malformed input or ranges larger than DISCOVERY_MAX_HOSTS.
+    """
+    value = value.strip()
+    if "-" in value:
+        start_str, end_str = (part.strip() for part in value.split("-", 1))
+        start = ipaddress.IPv4Address(start_str)
+        # Allow the short form "192.168.1.10-60"
+        end = ipaddress.IPv4Address(end_str) if "." in end_str else ipaddress.IPv4Address(
+            f"{start_str.rsplit('.', 1)[0]}.{end_str}"
+        )
+        if end < start:
+            raise ValueError("Range end is before range start")
+        count = int(end) - int(start) + 1
+        if count > DISCOVERY_MAX_HOSTS:
+            raise ValueError(f"Range of {count} hosts exceeds the limit of {DISCOVERY_MAX_HOSTS}")
+        return [str(ipaddress.IPv4Address(int(start) + i)) for i in range(count)]
+
+    network = ipaddress.IPv4Network(value, strict=False)
+    if network.num_addresses > DISCOVERY_MAX_HOSTS:
+        raise ValueError(f"Subnet of {network.num_addresses} hosts exceeds the limit of {DISCOVERY_MAX_HOSTS}")
+    hosts = list(network.hosts())
+    return [str(ip) for ip in hosts] if hosts else [str(network.network_address)]
+
+
+class _ProbeProtocol(asyncio.DatagramProtocol):
+    """Single shared socket that routes replies to the probe waiting on that address."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending: dict[tuple[str, int], tuple[str, asyncio.Future]] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        waiter = self.pending.get(addr[:2])
+        if waiter is None:
+            return
+        expected_prefix, future = waiter
+        if not future.done() and data.decode("utf-8", "ignore").strip().startswith(expected_prefix):
+            future.set_result(time.monotonic())
+
+    def error_received(self, exc):
+        # ICMP port/host unreachable for silent addresses is expected during a sweep
+        _LOGGER.debug("Control4 discovery socket error: %s", exc)
+
+
+async def async_probe_hosts(
+    targets: Iterable[tuple[str, int]],
+    timeout: float = DISCOVERY_TIMEOUT,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+) -> dict[tuple[str, int], float]:
+    """Probe (host, port) targets concurrently over one UDP socket.
+
+    Returns a mapping of every answering target to its round-trip time in milliseconds.
+    Any reply carrying the matching response prefix counts, including `n01` errors.
+    """
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_ProbeProtocol, local_addr=("0.0.0.0", 0))
+    semaphore = asyncio.Semaphore(concurrency)
+    results: dict[tuple[str, int], float] = {}
+
+    async def _probe(index: int, target: tuple[str, int]):
+        # Replies are matched on source address and the per-probe sequencer prefix
+        counter = f"0s2a{10 + index % 90}"
+        future = loop.create_future()
+        async with semaphore:
+            protocol.pending[target] = (counter.replace("s", "r", 1), future)
+            started = time.monotonic()
+            try:
+                transport.sendto(f"{counter} {HEARTBEAT_COMMAND} \r\n".encode(), target)
+                answered = await asyncio.wait_for(future, timeout)
+            except (TimeoutError, OSError):
+                return
+            finally:
+                protocol.pending.pop(target, None)
+            results[target] = round((answered - started) * 1000, 1)
+
+    try:
+        await asyncio.gather(*(_probe(i, target) for i, target in enumerate(targets)))
+    finally:
+        transport.close()
+    return results
+
+
+async def async_discover_amps(
+    host_range: str,
+    port: int = DEFAULT_PORT,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> list[tuple[str, float]]:
+    """Sweep a subnet or range for Matrix Amps. Returns (host, rtt_ms) sorted by address."""
+    hosts = parse_host_range(host_range)
+    found = await async_probe_hosts(((host, port) for host in hosts), timeout=timeout)
+    _LOGGER.info("Control4: discovery probed %d hosts on port %s, %d answered", len(hosts), port, len(found))
+    return sorted(
+        ((host, rtt) for (host, _), rtt in found.items()),
+        key=lambda item: ipaddress.IPv4Address(item[0]),
+    )
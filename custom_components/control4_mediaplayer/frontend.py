@@ -9,15 +9,28 @@ except ImportError:
     HAS_STATIC_PATH_CONFIG = False
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.start import async_at_started
+from homeassistant.loader import async_get_integration
+
+from .const import DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 URL_BASE = "/control4-mediaplayer-frontend"
 CARD_FILENAME = "control4-mediaplayer-card.js"
 
+# hass.data key of the card version, read from the manifest once per run
+DATA_CARD_VERSION = f"{DOMAIN}_card_version"
+FALLBACK_CARD_VERSION = "2.3.4"
+
 
 async def async_register_frontend(hass: HomeAssistant) -> None:
-    """Register the frontend resources."""
+    """Serve the card now; register its Lovelace resource once Home Assistant has started.
+
+    Only the static path is set up on the startup path, so the card is reachable as soon as
+    the frontend is. Loading the Lovelace resources, reading the manifest and writing the
+    resource store wait until bootstrap is done.
+    """
     # 1. Register the static path
     frontend_dir = Path(__file__).parent / "frontend"
     if not frontend_dir.exists():
@@ -43,7 +56,25 @@ async def async_register_frontend(hass: HomeAssistant) -> None:
             False,
         )
 
-    # 2. Register the Lovelace resource
+    # 2. Register the Lovelace resource (runs immediately when set up after startup)
+    async_at_started(hass, async_register_lovelace_resource)
+
+
+async def async_get_card_version(hass: HomeAssistant) -> str:
+    """Version used to bust the browser cache of the card, from the integration manifest."""
+    if (version := hass.data.get(DATA_CARD_VERSION)) is None:
+        try:
+            integration = await async_get_integration(hass, DOMAIN)
+            version = str(integration.version)
+        except Exception as err:
+            _LOGGER.warning("Could not retrieve integration version: %s", err)
+            version = FALLBACK_CARD_VERSION
+        hass.data[DATA_CARD_VERSION] = version
+    return version
+
+
+async def async_register_lovelace_resource(hass: HomeAssistant) -> None:
+    """Add or update the card's Lovelace resource in storage mode dashboards."""
     # To avoid the lazy loading data loss bug, we ensure the resources are loaded first.
     lovelace = hass.data.get("lovelace")
     if not lovelace:
@@ -66,19 +97,7 @@ async def async_register_frontend(hass: HomeAssistant) -> None:
     if not resources.loaded:
         await resources.async_load()
 
-    # Find the version dynamically from the integration manifest
-    try:
-        from homeassistant.loader import async_get_integration
-
-        from .const import DOMAIN
-
-        integration = await async_get_integration(hass, DOMAIN)
-        version = integration.version
-    except Exception as err:
-        _LOGGER.warning("Could not retrieve integration version: %s", err)
-        version = "2.3.4"
-
-    url = f"{URL_BASE}/{CARD_FILENAME}?v={version}"
+    url = f"{URL_BASE}/{CARD_FILENAME}?v={await async_get_card_version(hass)}"
 
     # Check if resource already exists (checking url prefix to handle version changes)
     existing = None
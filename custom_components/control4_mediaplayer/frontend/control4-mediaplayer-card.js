@@ -1,3 +1,21 @@
+// Compact amps -> zones -> entity IDs map served by the integration. Much smaller than the
+// full entity registry, which grows with every integration installed in Home Assistant.
+function fetchControl4Zones(hass) {
+  return hass.callWS({ type: "control4_mediaplayer/zones" }).then(r => {
+    const index = {};
+    for (const amp of r.amps || []) {
+      for (const zone of amp.zones || []) {
+        if (zone.media_player) index[zone.media_player] = zone;
+      }
+    }
+    return index;
+  });
+}
+
+function control4ZoneIds(zoneIndex, hass) {
+  return zoneIndex ? Object.keys(zoneIndex).filter(id => id in hass.states) : [];
+}
+
 class Control4Card extends HTMLElement {
   setConfig(config) {
     // Make a shallow copy because HA freezes the config object,
@@ -10,6 +28,8 @@ class Control4Card extends HTMLElement {
     }
     
     this._prevPlayingStates = {};
+    this._pendingInputs = new Map();
+    this._shell = null;
     this._optimisticSources = {};
     this._optimisticMutes = {};
     this._optimisticVolumes = {};
@@ -20,25 +40,94 @@ class Control4Card extends HTMLElement {
   }
 
   set hass(hass) {
+    const prevHass = this._hass;
     this._hass = hass;
     
-    // Fetch entity registry to find entities by platform
-    if (!this._entityReg && !this._fetchingReg && hass && typeof hass.callWS === 'function') {
-      this._fetchingReg = true;
-      hass.callWS({ type: "config/entity_registry/list" })
-        .then(r => {
-          this._entityReg = r;
-          this._fetchingReg = false;
-          this.render();
-        })
-        .catch(e => {
-          console.error("Failed to get entity registry", e);
-          this._entityReg = [];
-          this._fetchingReg = false;
-          this.render();
-        });
+    // Fetch this integration's zones and their related entities
+    if (!this._zoneIndex && !this._fetchingZones && hass && typeof hass.callWS === 'function') {
+      this.loadZones();
     }
+    this.subscribeZoneStates();
+    
+    // While zone state is pushed by the integration, HA state churn elsewhere needs no work.
+    // Only the selected zone (name, source list) and mapped players are still compared here.
+    if (this._zoneStates && prevHass && !this._zoneStatesDirty && !this.watchedStateChanged(prevHass, hass)) {
+      return;
+    }
+    this._zoneStatesDirty = false;
+    
+    this.clearOptimisticStates();
     
+    // Auto-detect playing source and switch zone/input
+    // this.autoDetectPlaying();
+    
+    this.render();
+  }
+
+  disconnectedCallback() {
+    if (this._zoneStatesUnsub) {
+      this._zoneStatesUnsub.then(unsub => unsub()).catch(() => {});
+      this._zoneStatesUnsub = null;
+      this._zoneStates = null;
+    }
+  }
+
+  loadZones() {
+    this._fetchingZones = true;
+    fetchControl4Zones(this._hass)
+      .then(index => {
+        this._zoneIndex = index;
+        this._fetchingZones = false;
+        this.render();
+      })
+      .catch(e => {
+        console.error("Failed to get Control4 zones", e);
+        this._zoneIndex = {};
+        this._fetchingZones = false;
+        this.render();
+      });
+  }
+
+  subscribeZoneStates() {
+    if (this._zoneStatesUnsub || this._zoneStatesFailed || !this._hass?.connection?.subscribeMessage) return;
+    this._zoneStatesUnsub = this._hass.connection.subscribeMessage(
+      msg => this.handleZoneStates(msg),
+      { type: "control4_mediaplayer/subscribe_zones" }
+    );
+    this._zoneStatesUnsub.catch(e => {
+      // Older integration versions: fall back to re-rendering on every hass update
+      console.error("Failed to subscribe to Control4 zone states", e);
+      this._zoneStatesUnsub = null;
+      this._zoneStatesFailed = true;
+    });
+  }
+
+  handleZoneStates(msg) {
+    if (msg.full) {
+      const changed = this._zoneStates && Object.keys(msg.zones).sort().join() !== Object.keys(this._zoneStates).sort().join();
+      this._zoneStates = msg.zones;
+      // Zones were added or removed: refresh the zone map as well
+      if (changed && !this._fetchingZones) this.loadZones();
+    } else {
+      for (const [id, delta] of Object.entries(msg.zones)) {
+        this._zoneStates[id] = { ...this._zoneStates[id], ...delta };
+      }
+    }
+    // The matching hass update may land before or after this message; render now and once more after it
+    this._zoneStatesDirty = true;
+    if (this._hass) {
+      this.clearOptimisticStates();
+      this.render();
+    }
+  }
+
+  watchedStateChanged(prevHass, hass) {
+    const ids = [this.selectedZoneId, ...Object.values(this._config.mappings || {})];
+    return ids.some(id => id && prevHass.states[id] !== hass.states[id]);
+  }
+
+  clearOptimisticStates() {
+    const hass = this._hass;
     // Clear optimistic states that match the actual state
     if (hass) {
       for (const id in this._optimisticSources) {
@@ -58,11 +147,6 @@ class Control4Card extends HTMLElement {
         }
       }
     }
-    
-    // Auto-detect playing source and switch zone/input
-    // this.autoDetectPlaying();
-    
-    this.render();
   }
 
   autoDetectPlaying() {
@@ -101,7 +185,7 @@ class Control4Card extends HTMLElement {
             if (this.selectedZoneId !== zoneId || this.selectedInputName !== inputName) {
               this.selectedZoneId = zoneId;
               this.selectedInputName = inputName;
-              this.render(true);
+              this.render();
             }
             return;
           }
@@ -110,56 +194,30 @@ class Control4Card extends HTMLElement {
     }
   }
 
-  getChannel(zoneId) {
-    if (!this._entityReg) return null;
-    const entry = this._entityReg.find(e => e.entity_id === zoneId);
-    if (entry && entry.unique_id) {
-      const match = entry.unique_id.match(/_ch(\d+)$/);
-      return match ? match[1] : null;
-    }
-    return null;
+  getZoneEntity(zoneId, key) {
+    const zone = this._zoneIndex ? this._zoneIndex[zoneId] : null;
+    return zone ? zone.entities[key] || null : null;
   }
 
-  findEntityByUniqueId(pattern) {
-    if (!this._entityReg) return null;
-    const entry = this._entityReg.find(e => e.unique_id && e.unique_id.includes(pattern));
-    return entry ? entry.entity_id : null;
+  render(force = false) {
+    if (!this._hass) return;
+    // A full rebuild is only needed when the card config changes; everything else is patched in place
+    if (force) this._shell = null;
+    // Coalesce bursts of hass updates, pushed deltas and clicks into one patch per animation frame
+    if (this._renderFrame) return;
+    this._renderFrame = requestAnimationFrame(() => {
+      this._renderFrame = null;
+      this.renderNow();
+    });
   }
 
-  render(force = false) {
+  renderNow() {
+    const started = performance.now();
+    let built = false;
     try {
-      if (!this._hass) return;
-      
-      // Avoid blowing away innerHTML if the card is already rendered,
-      // which causes dropdowns to close while the user is interacting.
-      if (!force && this.querySelector('#zone-select')) {
-        this.updateVolatileStates();
-        return;
-      }
-      
-      // 1. Find zones
-      let zones = [];
-      if (this._entityReg) {
-        const integrationEntities = this._entityReg.filter(e => e.platform === 'control4_mediaplayer');
-        
-        zones = integrationEntities
-          .filter(e => e.entity_id.startsWith('media_player.'))
-          .map(e => e.entity_id)
-          .filter(id => id in this._hass.states); // Ensure entity exists in current states
-      }
-      
-      // Fallback
-      if (zones.length === 0 && !this._entityReg) {
-        const refZone = this._config?.default_zone || Object.keys(this._hass.states).find(id => id.startsWith('media_player.') && this._hass.states[id].attributes.source_list);
-        const refSourceList = refZone ? this._hass.states[refZone].attributes.source_list : [];
-        zones = Object.keys(this._hass.states).filter(id => {
-          if (!id.startsWith('media_player.')) return false;
-          const state = this._hass.states[id];
-          return state && JSON.stringify(state.attributes.source_list || []) === JSON.stringify(refSourceList);
-        });
-      }
-      
-      if (zones.length === 0) {
+      const view = this.computeView();
+      if (!view) {
+        this._shell = null;
         this.innerHTML = `
           <ha-card style="padding: 16px;">
             <div style="color: var(--secondary-text-color);">No Control4 zones found.</div>
@@ -168,70 +226,121 @@ class Control4Card extends HTMLElement {
         return;
       }
       
-      // Helper to find longest common prefix
-      const longestCommonPrefix = (strs) => {
-        if (!strs.length) return "";
-        let prefix = strs[0];
-        for (let i = 1; i < strs.length; i++) {
-          while (strs[i].indexOf(prefix) !== 0) {
-            prefix = prefix.substring(0, prefix.length - 1);
-            if (!prefix) return "";
-          }
-        }
-        return prefix;
-      };
-
-      // Get all friendly names to find common prefix
-      const zoneNames = zones.map(id => this._hass.states[id]?.attributes?.friendly_name || id);
-      const commonPrefix = longestCommonPrefix(zoneNames);
-      
-      const getShortName = (name) => {
-        if (commonPrefix && commonPrefix.length < name.length) {
-          return name.substring(commonPrefix.length).replace(/^\d+\s+/, '');
-        }
-        return name.replace(/^\d+\s+/, '');
-      };
-
-      // Ensure selected zone is valid
-      if (!this.selectedZoneId || !zones.includes(this.selectedZoneId)) {
-        this.selectedZoneId = this._config?.default_zone || zones[0];
+      // 1. Build the static DOM once
+      if (!this._shell) {
+        this.innerHTML = this.shellTemplate();
+        this._shell = true;
+        this._sectionKeys = {};
+        built = true;
+        this.setupEvents();
       }
       
-      const selectedZoneState = this._hass.states[this.selectedZoneId];
-      const inputs = selectedZoneState?.attributes?.source_list || [];
+      // 2. Rebuild only the sections whose structure changed, then patch individual fields
+      this.patchSections(view);
+      this.updateVolatileStates(view);
       
-      if (!this.selectedInputName || !inputs.includes(this.selectedInputName)) {
-        this.selectedInputName = selectedZoneState?.attributes?.source || (inputs.length > 0 ? inputs[0] : '');
+    } catch (e) {
+      this._shell = null;
+      this.innerHTML = `
+        <ha-card style="padding: 16px; color: red;">
+          <h3>Render Error</h3>
+          <pre>${e.message}</pre>
+        </ha-card>
+      `;
+    } finally {
+      this.recordRenderTiming(performance.now() - started, built);
+    }
+  }
+
+  getZoneVol(id) {
+    return this._optimisticVolumes[id] !== undefined ? this._optimisticVolumes[id] : Math.round((this._hass.states[id]?.attributes?.volume_level || 0) * 100);
+  }
+
+  getZoneMute(id) {
+    return this._optimisticMutes[id] !== undefined ? this._optimisticMutes[id] : this._hass.states[id]?.attributes?.is_volume_muted || false;
+  }
+
+  getZoneSource(id) {
+    return this._optimisticSources[id] || this._hass.states[id]?.attributes?.source;
+  }
+
+  computeView() {
+    // 1. Find zones
+    let zones = control4ZoneIds(this._zoneIndex, this._hass);
+    
+    // Fallback
+    if (zones.length === 0 && !this._zoneIndex) {
+      const refZone = this._config?.default_zone || Object.keys(this._hass.states).find(id => id.startsWith('media_player.') && this._hass.states[id].attributes.source_list);
+      const refSourceList = refZone ? this._hass.states[refZone].attributes.source_list : [];
+      zones = Object.keys(this._hass.states).filter(id => {
+        if (!id.startsWith('media_player.')) return false;
+        const state = this._hass.states[id];
+        return state && JSON.stringify(state.attributes.source_list || []) === JSON.stringify(refSourceList);
+      });
+    }
+    
+    if (zones.length === 0) return null;
+    
+    // Helper to find longest common prefix
+    const longestCommonPrefix = (strs) => {
+      if (!strs.length) return "";
+      let prefix = strs[0];
+      for (let i = 1; i < strs.length; i++) {
+        while (strs[i].indexOf(prefix) !== 0) {
+          prefix = prefix.substring(0, prefix.length - 1);
+          if (!prefix) return "";
+        }
       }
-      
-      // Helper to get volume (including optimistic)
-      const getZoneVol = (id) => this._optimisticVolumes[id] !== undefined ? this._optimisticVolumes[id] : Math.round((this._hass.states[id]?.attributes?.volume_level || 0) * 100);
-      
-      const vol = getZoneVol(this.selectedZoneId);
-      
-      // Helper to get mute state (including optimistic)
-      const getZoneMute = (id) => this._optimisticMutes[id] !== undefined ? this._optimisticMutes[id] : this._hass.states[id]?.attributes?.is_volume_muted || false;
-      
-      const isMuted = getZoneMute(this.selectedZoneId);
-      const isOn = selectedZoneState?.state === 'on' || selectedZoneState?.state === 'playing';
-      
-      // Get mapped player for media info
-      const mappedPlayerId = this._config?.mappings?.[this.selectedInputName];
-      const mappedPlayerState = mappedPlayerId ? this._hass.states[mappedPlayerId] : null;
-      const artwork = mappedPlayerState?.attributes?.entity_picture;
-      
+      return prefix;
+    };
+
+    // Get all friendly names to find common prefix
+    const names = {};
+    zones.forEach(id => { names[id] = this._hass.states[id]?.attributes?.friendly_name || id; });
+    const commonPrefix = longestCommonPrefix(Object.values(names));
+    
+    const getShortName = (name) => {
+      if (commonPrefix && commonPrefix.length < name.length) {
+        return name.substring(commonPrefix.length).replace(/^\d+\s+/, '');
+      }
+      return name.replace(/^\d+\s+/, '');
+    };
+
+    // Ensure selected zone is valid
+    if (!this.selectedZoneId || !zones.includes(this.selectedZoneId)) {
+      this.selectedZoneId = this._config?.default_zone || zones[0];
+    }
+    
+    const selectedZoneState = this._hass.states[this.selectedZoneId];
+    const inputs = selectedZoneState?.attributes?.source_list || [];
+    
+    if (!this.selectedInputName || !inputs.includes(this.selectedInputName)) {
+      this.selectedInputName = selectedZoneState?.attributes?.source || (inputs.length > 0 ? inputs[0] : '');
+    }
+    
+    // Get mapped player for media info
+    const mappedPlayerId = this._config?.mappings?.[this.selectedInputName];
+    const mappedPlayerState = mappedPlayerId ? this._hass.states[mappedPlayerId] : null;
+    
+    // Find joined zones for volume controls
+    const joinedZones = zones.filter(id => id !== this.selectedZoneId && this.getZoneSource(id) === this.selectedInputName);
+    
+    return {
+      zones,
+      names,
+      getShortName,
+      selectedZoneState,
+      inputs,
+      mappedPlayerId,
+      mappedPlayerState,
+      joinedZones,
       // Get favorites from local storage or config
-      const favorites = this._config.favorites || [];
-      
-      // Helper to get source (including optimistic)
-      const getZoneSource = (id) => this._optimisticSources[id] || this._hass.states[id]?.attributes?.source;
-      
-      // Find joined zones for volume controls
-      const joinedZones = zones.filter(id => id !== this.selectedZoneId && getZoneSource(id) === this.selectedInputName);
-      
-      
-      // 2. Render UI with dropdowns and Glassmorphism
-      this.innerHTML = `
+      favorites: this._config.favorites || [],
+    };
+  }
+
+  shellTemplate() {
+    return `
         <style>
           .glass-card {
             --text-color: var(--primary-text-color, white);
@@ -271,12 +380,12 @@ class Control4Card extends HTMLElement {
           .card-bg {
             position: absolute;
             top: -20px; left: -20px; right: -20px; bottom: -20px;
-            background-image: url('${artwork || ''}');
+            background-image: none;
             background-size: cover;
             background-position: center;
             filter: blur(40px) brightness(0.4);
             z-index: 0;
-            display: ${artwork ? 'block' : 'none'};
+            display: none;
           }
           
           .card-content {
@@ -344,7 +453,7 @@ class Control4Card extends HTMLElement {
           .power-btn {
             background: none;
             border: none;
-            color: ${isOn ? '#03a9f4' : 'var(--text-color-disabled)'};
+            color: var(--text-color-disabled);
             cursor: pointer;
             padding: 8px;
             border-radius: 50%;
@@ -542,10 +651,18 @@ class Control4Card extends HTMLElement {
             color: white !important;
           }
           
+          .render-debug {
+            position: absolute;
+            left: 0; bottom: -14px;
+            font-family: monospace;
+            font-size: 10px;
+            color: var(--text-color-disabled);
+            pointer-events: none;
+          }
 
         </style>
 
-        <ha-card class="glass-card ${artwork ? 'has-artwork' : ''}">
+        <ha-card class="glass-card">
           <div class="card-bg"></div>
           
           <div class="card-content">
@@ -560,51 +677,7 @@ class Control4Card extends HTMLElement {
               <!-- Left Column: Now Playing & Controls -->
               <div class="col-section">
                 <!-- Media Info -->
-                <div id="media-info-container">
-                  ${mappedPlayerState ? `
-                    <div style="background: var(--glass-bg); padding: 16px; border-radius: 12px; position: relative; border: 1px solid var(--border-color);">
-                      <div style="display: flex; align-items: center;">
-                        <div class="media-artwork" style="margin-right: 16px;">
-                          ${artwork ? `
-                            <img src="${artwork}" style="width: 70px; height: 70px; border-radius: 8px; object-fit: cover; box-shadow: 0 4px 10px rgba(0,0,0,0.3);">
-                          ` : `
-                            <div style="width: 70px; height: 70px; border-radius: 8px; background: var(--glass-bg); display: flex; align-items: center; justify-content: center;">
-                              <ha-icon icon="mdi:music" style="color: var(--text-color-disabled); font-size: 30px;"></ha-icon>
-                            </div>
-                          `}
-                        </div>
-                        <div style="flex: 1; min-width: 0; padding-right: 70px;">
-                          <div class="media-title" style="font-weight: bold; font-size: 15px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; margin-bottom: 4px;">${mappedPlayerState.attributes.media_title || 'Unknown Title'}</div>
-                          <div class="media-artist" style="font-size: 13px; color: var(--text-color-secondary); white-space: nowrap; overflow: hidden; text-overflow: ellipsis; margin-bottom: 2px;">${mappedPlayerState.attributes.media_artist || 'Unknown Artist'}</div>
-                          <div style="font-size: 11px; color: var(--text-color-disabled);">via ${mappedPlayerState.attributes.friendly_name || mappedPlayerId}</div>
-                        </div>
-                        <div style="position: absolute; right: 12px; top: 12px; display: flex; gap: 8px;">
-
-                          <button id="browse-btn" style="background: none; border: none; color: var(--text-color-secondary); cursor: pointer; padding: 2px;" title="Browse Media">
-                            <ha-icon icon="mdi:folder-music"></ha-icon>
-                          </button>
-                          <button id="fav-btn" style="background: none; border: none; color: var(--text-color-secondary); cursor: pointer; padding: 2px;" title="Save as Favorite">
-                            <ha-icon icon="mdi:star-outline"></ha-icon>
-                          </button>
-                        </div>
-                      </div>
-                      
-                      <!-- Source Player Controls -->
-                      <div class="player-controls">
-                        <button class="control-btn" id="prev-btn" title="Previous"><ha-icon icon="mdi:skip-previous"></ha-icon></button>
-                        <button class="control-btn" id="play-btn" style="width: 46px; height: 46px; background: var(--glass-bg-active);" title="Play/Pause"><ha-icon icon="${mappedPlayerState.state === 'playing' ? 'mdi:pause' : 'mdi:play'}"></ha-icon></button>
-                        <button class="control-btn" id="next-btn" title="Next"><ha-icon icon="mdi:skip-next"></ha-icon></button>
-                      </div>
-                    </div>
-                  ` : `
-                    <div style="text-align: center; color: var(--text-color-disabled); font-size: 13px; padding: 20px; background: var(--glass-bg); border-radius: 12px; border: 1px solid var(--border-color); position: relative;">
-                      No player mapped for this input.
-                      <div style="position: absolute; right: 12px; top: 12px;">
-
-                      </div>
-                    </div>
-                  `}
-                </div>
+                <div id="media-info-container"></div>
                 
                 <!-- Volume -->
                 <div>
@@ -613,39 +686,18 @@ class Control4Card extends HTMLElement {
                   <div class="vol-grid">
                     <!-- Main Zone Volume -->
                     <div class="vol-container">
-                      <div class="vol-title">
-                        ${getShortName(this._hass.states[this.selectedZoneId]?.attributes?.friendly_name || 'Main Zone')}
-                      </div>
+                      <div id="vol-title" class="vol-title"></div>
                       <div class="vol-control-row">
                         <button id="mute-btn" style="background:none; border:none; color: var(--text-color); cursor:pointer; padding:2px; display:flex; align-items:center;">
-                          <ha-icon icon="${isMuted ? 'mdi:volume-off' : 'mdi:volume-high'}" style="font-size: 20px;"></ha-icon>
+                          <ha-icon icon="mdi:volume-high" style="font-size: 20px;"></ha-icon>
                         </button>
-                        <input id="volume-slider" class="vol-slider" type="range" min="0" max="100" value="${vol}">
-                        <span id="vol-text" class="vol-percentage">${vol}%</span>
+                        <input id="volume-slider" class="vol-slider" type="range" min="0" max="100" value="0">
+                        <span id="vol-text" class="vol-percentage">0%</span>
                       </div>
                     </div>
                     
                     <!-- Linked Zones Volume -->
-                    ${joinedZones.map(id => {
-                      const zoneState = this._hass.states[id];
-                      const zVol = getZoneVol(id);
-                      const zMuted = getZoneMute(id);
-                      const name = zoneState?.attributes?.friendly_name || id;
-                      const shortName = getShortName(name);
-                      
-                      return `
-                        <div class="vol-container">
-                          <div class="vol-title">${shortName}</div>
-                          <div class="vol-control-row">
-                            <button class="linked-mute-btn" data-zone="${id}" style="background:none; border:none; color: var(--text-color); cursor:pointer; padding:2px; display:flex; align-items:center;">
-                              <ha-icon icon="${zMuted ? 'mdi:volume-off' : 'mdi:volume-high'}" style="font-size: 20px;"></ha-icon>
-                            </button>
-                            <input class="linked-vol-slider" data-zone="${id}" type="range" min="0" max="100" value="${zVol}" style="flex: 1; margin: 0; accent-color: #03a9f4; min-width: 50px;">
-                            <span class="vol-percentage">${zVol}%</span>
-                          </div>
-                        </div>
-                      `;
-                    }).join('')}
+                    <div id="linked-volumes" style="display: contents;"></div>
                   </div>
                 </div>
               </div>
@@ -656,35 +708,18 @@ class Control4Card extends HTMLElement {
                 <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 12px;">
                   <div>
                     <label class="glass-label">Zone</label>
-                    <select id="zone-select" class="glass-select">
-                      ${zones.map(id => `<option value="${id}" ${id === this.selectedZoneId ? 'selected' : ''}>${this._hass.states[id].attributes.friendly_name || id}</option>`).join('')}
-                    </select>
+                    <select id="zone-select" class="glass-select"></select>
                   </div>
                   <div>
                     <label class="glass-label">Input</label>
-                    <select id="input-select" class="glass-select">
-                      ${inputs.map(input => `<option value="${input}" ${input === this.selectedInputName ? 'selected' : ''}>${input}</option>`).join('')}
-                    </select>
+                    <select id="input-select" class="glass-select"></select>
                   </div>
                 </div>
                 
                 <!-- Zone Joining (Add/Remove Zones) -->
                 <div>
                   <label class="glass-label">Linked Zones (Join)</label>
-                  <div class="zone-grid">
-                    ${zones.filter(id => id !== this.selectedZoneId).map(id => {
-                      const isJoined = getZoneSource(id) === this.selectedInputName;
-                      const zoneState = this._hass.states[id];
-                      const name = zoneState?.attributes?.friendly_name || id;
-                      const shortName = getShortName(name);
-                      return `
-                        <div class="zone-chip ${isJoined ? 'joined' : ''}" data-zone="${id}">
-                          ${shortName}
-                        </div>
-                      `;
-                    }).join('')}
-                    ${zones.length <= 1 ? `<div style="font-size: 11px; color: var(--text-color-disabled); grid-column: 1 / -1; text-align: center;">No other zones available.</div>` : ''}
-                  </div>
+                  <div id="zone-chips" class="zone-grid"></div>
                 </div>
                 
                 <!-- Favorites Section -->
@@ -699,56 +734,141 @@ class Control4Card extends HTMLElement {
                   <!-- Manual Favorite Form (Hidden by default) -->
                   <div id="manual-fav-form" class="manual-fav-form" style="display: none;">
                     <input id="manual-fav-name" placeholder="Favorite Name (e.g. NPR)">
-                    <select id="manual-fav-input" title="Select Input/Player">
-                      ${inputs.map(input => `<option value="${input}" ${input === this.selectedInputName ? 'selected' : ''}>Target: ${input}</option>`).join('')}
-                    </select>
+                    <select id="manual-fav-input" title="Select Input/Player"></select>
                     <input id="manual-fav-cmd" placeholder="Command (e.g. play NPR)">
                     <button id="save-manual-fav">Save Favorite</button>
                   </div>
                   
-                  <div id="fav-chips-container" style="display: flex; flex-wrap: wrap; gap: 6px;">
-                    ${favorites.map((fav, index) => `
-                      <div class="fav-chip" data-index="${index}">
-                        <span>${fav.name}</span>
-                        <ha-icon icon="mdi:close" style="font-size: 14px; margin-left: 6px; opacity: 0.4;" data-action="delete" data-index="${index}"></ha-icon>
-                      </div>
-                    `).join('')}
-                    ${(favorites.length === 0) ? `
-                      <div style="font-size: 12px; color: var(--text-color-disabled); padding: 10px; text-align: center; background: var(--glass-bg); border-radius: 8px; width: 100%;">No favorites saved yet.</div>
-                    ` : ''}
-                  </div>
+                  <div id="fav-chips-container" style="display: flex; flex-wrap: wrap; gap: 6px;"></div>
                 </div>
               </div>
             </div> <!-- End Grid -->
             
+            ${this._config.debug ? '<div id="render-debug" class="render-debug"></div>' : ''}
           </div>
         </ha-card>
       `;
-      
-      // 3. Bind events
-      this.setupEvents();
-      
-    } catch (e) {
-      this.innerHTML = `
-        <ha-card style="padding: 16px; color: red;">
-          <h3>Render Error</h3>
-          <pre>${e.message}</pre>
-        </ha-card>
-      `;
+  }
+
+  // Replace a section's markup only when its structure (not just its values) changed
+  patchSection(name, el, key, build) {
+    if (!el || this._sectionKeys[name] === key) return;
+    // Rebuilding a select while its dropdown is open would close it; retry on the next patch
+    if (el.tagName === 'SELECT' && document.activeElement === el) return;
+    el.innerHTML = build();
+    this._sectionKeys[name] = key;
+  }
+
+  patchSections(view) {
+    const { zones, names, getShortName, inputs, mappedPlayerId, mappedPlayerState, joinedZones, favorites } = view;
+    
+    this.patchSection('media', this.querySelector('#media-info-container'), mappedPlayerState ? mappedPlayerId : '', () => mappedPlayerState ? `
+      <div style="background: var(--glass-bg); padding: 16px; border-radius: 12px; position: relative; border: 1px solid var(--border-color);">
+        <div style="display: flex; align-items: center;">
+          <div class="media-artwork" style="margin-right: 16px;"></div>
+          <div style="flex: 1; min-width: 0; padding-right: 70px;">
+            <div class="media-title" style="font-weight: bold; font-size: 15px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; margin-bottom: 4px;"></div>
+            <div class="media-artist" style="font-size: 13px; color: var(--text-color-secondary); white-space: nowrap; overflow: hidden; text-overflow: ellipsis; margin-bottom: 2px;"></div>
+            <div class="media-via" style="font-size: 11px; color: var(--text-color-disabled);"></div>
+          </div>
+          <div style="position: absolute; right: 12px; top: 12px; display: flex; gap: 8px;">
+
+            <button id="browse-btn" style="background: none; border: none; color: var(--text-color-secondary); cursor: pointer; padding: 2px;" title="Browse Media">
+              <ha-icon icon="mdi:folder-music"></ha-icon>
+            </button>
+            <button id="fav-btn" style="background: none; border: none; color: var(--text-color-secondary); cursor: pointer; padding: 2px;" title="Save as Favorite">
+              <ha-icon icon="mdi:star-outline"></ha-icon>
+            </button>
+          </div>
+        </div>
+        
+        <!-- Source Player Controls -->
+        <div class="player-controls">
+          <button class="control-btn" id="prev-btn" title="Previous"><ha-icon icon="mdi:skip-previous"></ha-icon></button>
+          <button class="control-btn" id="play-btn" style="width: 46px; height: 46px; background: var(--glass-bg-active);" title="Play/Pause"><ha-icon icon="mdi:play"></ha-icon></button>
+          <button class="control-btn" id="next-btn" title="Next"><ha-icon icon="mdi:skip-next"></ha-icon></button>
+        </div>
+      </div>
+    ` : `
+      <div style="text-align: center; color: var(--text-color-disabled); font-size: 13px; padding: 20px; background: var(--glass-bg); border-radius: 12px; border: 1px solid var(--border-color); position: relative;">
+        No player mapped for this input.
+        <div style="position: absolute; right: 12px; top: 12px;">
+
+        </div>
+      </div>
+    `);
+    
+    this.patchSection('linked-volumes', this.querySelector('#linked-volumes'), joinedZones.map(id => `${id}=${names[id]}`).join('|'), () => joinedZones.map(id => `
+      <div class="vol-container">
+        <div class="vol-title">${getShortName(names[id])}</div>
+        <div class="vol-control-row">
+          <button class="linked-mute-btn" data-zone="${id}" style="background:none; border:none; color: var(--text-color); cursor:pointer; padding:2px; display:flex; align-items:center;">
+            <ha-icon icon="mdi:volume-high" style="font-size: 20px;"></ha-icon>
+          </button>
+          <input class="linked-vol-slider" data-zone="${id}" type="range" min="0" max="100" value="${this.getZoneVol(id)}" style="flex: 1; margin: 0; accent-color: #03a9f4; min-width: 50px;">
+          <span class="vol-percentage">${this.getZoneVol(id)}%</span>
+        </div>
+      </div>
+    `).join(''));
+    
+    this.patchSection('zone-select', this.querySelector('#zone-select'), zones.map(id => `${id}=${names[id]}`).join('|'), () =>
+      zones.map(id => `<option value="${id}">${names[id]}</option>`).join(''));
+    
+    this.patchSection('input-select', this.querySelector('#input-select'), inputs.join('|'), () =>
+      inputs.map(input => `<option value="${input}">${input}</option>`).join(''));
+    
+    this.patchSection('manual-fav-input', this.querySelector('#manual-fav-input'), inputs.join('|'), () =>
+      inputs.map(input => `<option value="${input}">Target: ${input}</option>`).join(''));
+    
+    const otherZones = zones.filter(id => id !== this.selectedZoneId);
+    this.patchSection('zone-chips', this.querySelector('#zone-chips'), otherZones.map(id => `${id}=${names[id]}`).join('|'), () => `
+      ${otherZones.map(id => `
+        <div class="zone-chip" data-zone="${id}">
+          ${getShortName(names[id])}
+        </div>
+      `).join('')}
+      ${zones.length <= 1 ? `<div style="font-size: 11px; color: var(--text-color-disabled); grid-column: 1 / -1; text-align: center;">No other zones available.</div>` : ''}
+    `);
+    
+    this.patchSection('favorites', this.querySelector('#fav-chips-container'), JSON.stringify(favorites), () => `
+      ${favorites.map((fav, index) => `
+        <div class="fav-chip" data-index="${index}">
+          <span>${fav.name}</span>
+          <ha-icon icon="mdi:close" style="font-size: 14px; margin-left: 6px; opacity: 0.4;" data-action="delete" data-index="${index}"></ha-icon>
+        </div>
+      `).join('')}
+      ${(favorites.length === 0) ? `
+        <div style="font-size: 12px; color: var(--text-color-disabled); padding: 10px; text-align: center; background: var(--glass-bg); border-radius: 8px; width: 100%;">No favorites saved yet.</div>
+      ` : ''}
+    `);
+  }
+
+  recordRenderTiming(ms, built) {
+    if (!this._config?.debug) return;
+    const stats = this._renderStats || (this._renderStats = { builds: 0, patches: 0, total: 0, max: 0 });
+    if (built) stats.builds++; else stats.patches++;
+    stats.total += ms;
+    stats.max = Math.max(stats.max, ms);
+    const el = this.querySelector('#render-debug');
+    if (el) {
+      const count = stats.builds + stats.patches;
+      el.textContent = `${built ? 'build' : 'patch'} ${ms.toFixed(1)} ms · avg ${(stats.total / count).toFixed(1)} · max ${stats.max.toFixed(1)} · ${stats.patches} patches / ${stats.builds} builds`;
     }
   }
-  
+
   setupEvents() {
     if (this._eventsSetup) return;
     this._eventsSetup = true;
     
     this.addEventListener('change', (ev) => {
+      if (ev.target.type === 'range') this._activeSlider = null;
+      
       if (ev.target.id === 'zone-select') {
         this.selectedZoneId = ev.target.value;
         const newState = this._hass.states[this.selectedZoneId];
         // Automatically switch Input dropdown to the input it is currently on
         this.selectedInputName = newState?.attributes?.source || '';
-        this.render(true); // Force re-render to update inputs
+        this.render();
       } else if (ev.target.id === 'input-select') {
         this.selectedInputName = ev.target.value;
         
@@ -763,7 +883,7 @@ class Control4Card extends HTMLElement {
           source: this.selectedInputName
         });
         
-        this.render(true); // Force re-render to update media info
+        this.render();
       } else if (ev.target.id === 'volume-slider') {
         const value = parseInt(ev.target.value);
         this._optimisticVolumes[this.selectedZoneId] = value;
@@ -782,8 +902,7 @@ class Control4Card extends HTMLElement {
           volume_level: value / 100
         });
       } else if (ev.target.id === 'eq-preset-select') {
-        const channel = this.getChannel(this.selectedZoneId);
-        const eqPresetEntity = channel ? this.findEntityByUniqueId(`_ch${channel}_eq_preset`) : null;
+        const eqPresetEntity = this.getZoneEntity(this.selectedZoneId, 'eq_preset');
         
         if (eqPresetEntity) {
           this._hass.callService('select', 'select_option', {
@@ -792,8 +911,7 @@ class Control4Card extends HTMLElement {
           });
         }
       } else if (ev.target.id === 'bass-slider') {
-        const channel = this.getChannel(this.selectedZoneId);
-        const bassEntity = channel ? this.findEntityByUniqueId(`_ch${channel}_bass`) : null;
+        const bassEntity = this.getZoneEntity(this.selectedZoneId, 'bass');
         
         if (bassEntity) {
           this._hass.callService('number', 'set_value', {
@@ -802,8 +920,7 @@ class Control4Card extends HTMLElement {
           });
         }
       } else if (ev.target.id === 'treble-slider') {
-        const channel = this.getChannel(this.selectedZoneId);
-        const trebleEntity = channel ? this.findEntityByUniqueId(`_ch${channel}_treble`) : null;
+        const trebleEntity = this.getZoneEntity(this.selectedZoneId, 'treble');
         
         if (trebleEntity) {
           this._hass.callService('number', 'set_value', {
@@ -815,21 +932,10 @@ class Control4Card extends HTMLElement {
     });
     
     this.addEventListener('input', (ev) => {
-      if (ev.target.id === 'volume-slider') {
-        const volText = this.querySelector('#vol-text');
-        if (volText) volText.textContent = `${ev.target.value}%`;
-      } else if (ev.target.classList.contains('linked-vol-slider')) {
-        const span = ev.target.nextElementSibling;
-        if (span) span.textContent = `${ev.target.value}%`;
-      } else if (ev.target.id === 'bass-slider') {
-        const text = this.querySelector('#bass-text');
-        const val = ev.target.value;
-        if (text) text.textContent = `${val > 0 ? '+' : ''}${val}`;
-      } else if (ev.target.id === 'treble-slider') {
-        const text = this.querySelector('#treble-text');
-        const val = ev.target.value;
-        if (text) text.textContent = `${val > 0 ? '+' : ''}${val}`;
-      }
+      if (ev.target.type !== 'range') return;
+      this._activeSlider = ev.target;
+      this._pendingInputs.set(ev.target, ev.target.value);
+      if (!this._inputFrame) this._inputFrame = requestAnimationFrame(() => this.flushSliderInputs());
     });
     
     this.addEventListener('click', (ev) => {
@@ -944,7 +1050,7 @@ class Control4Card extends HTMLElement {
             cmdInput.value = '';
             this.querySelector('#manual-fav-form').style.display = 'none';
             
-            this.render(true);
+            this.render();
           }
         }
       }
@@ -981,7 +1087,7 @@ class Control4Card extends HTMLElement {
           });
         }
         
-        this.render(true);
+        this.render();
       }
       
       // Source Player Controls
@@ -1013,7 +1119,7 @@ class Control4Card extends HTMLElement {
           favorites.splice(index, 1);
           this._config.favorites = favorites;
           localStorage.setItem('control4_favorites', JSON.stringify(favorites));
-          this.render(true);
+          this.render();
           ev.stopPropagation();
           return;
         }
@@ -1023,7 +1129,7 @@ class Control4Card extends HTMLElement {
         if (fav) {
           this.selectedZoneId = fav.zone;
           this.selectedInputName = fav.input;
-          this.render(true);
+          this.render();
           
           // 1. Switch source on the amp
           this._hass.callService('media_player', 'select_source', {
@@ -1080,126 +1186,115 @@ class Control4Card extends HTMLElement {
       favorites.push(newFav);
       this._config.favorites = favorites;
       localStorage.setItem('control4_favorites', JSON.stringify(favorites));
-      this.render(true); // Force re-render to show new chip
+      this.render();
     }
   }
   
-  updateVolatileStates() {
-    const selectedZoneState = this._hass.states[this.selectedZoneId];
+  updateVolatileStates(view) {
+    const { names, getShortName, selectedZoneState, mappedPlayerId, mappedPlayerState } = view;
     if (!selectedZoneState) return;
     
-    // Helper to get volume (including optimistic)
-    const getZoneVol = (id) => this._optimisticVolumes[id] !== undefined ? this._optimisticVolumes[id] : Math.round((this._hass.states[id]?.attributes?.volume_level || 0) * 100);
-    
-    const vol = getZoneVol(this.selectedZoneId);
-    
-    // Helper to get mute state (including optimistic)
-    const getZoneMute = (id) => this._optimisticMutes[id] !== undefined ? this._optimisticMutes[id] : this._hass.states[id]?.attributes?.is_volume_muted || false;
+    // DOM writes only when a value actually changed, so idle patches cost no layout
+    const setText = (el, text) => { if (el && el.textContent !== text) el.textContent = text; };
+    const setIcon = (el, icon) => { if (el && el.getAttribute('icon') !== icon) el.setAttribute('icon', icon); };
+    const setValue = (el, value) => { if (el && el.value !== value) el.value = value; };
+    // Don't fight a slider the user is dragging (touch drags don't always focus it)
+    const isDragging = (el) => el === document.activeElement || el === this._activeSlider;
     
-    const isMuted = getZoneMute(this.selectedZoneId);
+    const vol = this.getZoneVol(this.selectedZoneId);
+    const isMuted = this.getZoneMute(this.selectedZoneId);
     const isOn = selectedZoneState.state === 'on' || selectedZoneState.state === 'playing';
     
     const volSlider = this.querySelector('#volume-slider');
-    const volText = this.querySelector('#vol-text');
     const muteBtn = this.querySelector('#mute-btn');
     const powerBtn = this.querySelector('#power-btn');
     
-    if (volSlider && document.activeElement !== volSlider) {
-      volSlider.value = vol;
-      if (volText) volText.textContent = `${vol}%`;
-    }
+    setText(this.querySelector('#vol-title'), getShortName(names[this.selectedZoneId] || 'Main Zone'));
     
-    if (muteBtn) {
-      const icon = muteBtn.querySelector('ha-icon');
-      if (icon) icon.setAttribute('icon', isMuted ? 'mdi:volume-off' : 'mdi:volume-high');
+    if (volSlider && !isDragging(volSlider)) {
+      setValue(volSlider, String(vol));
+      setText(this.querySelector('#vol-text'), `${vol}%`);
     }
     
+    if (muteBtn) setIcon(muteBtn.querySelector('ha-icon'), isMuted ? 'mdi:volume-off' : 'mdi:volume-high');
+    
     if (powerBtn) {
-      powerBtn.style.color = isOn ? '#03a9f4' : 'var(--text-color-disabled)';
+      const color = isOn ? '#03a9f4' : 'var(--text-color-disabled)';
+      if (powerBtn.style.color !== color) powerBtn.style.color = color;
+    }
+    
+    for (const [selector, value] of [['#zone-select', this.selectedZoneId], ['#input-select', this.selectedInputName], ['#manual-fav-input', this.selectedInputName]]) {
+      const select = this.querySelector(selector);
+      if (select && document.activeElement !== select) setValue(select, value);
     }
     
     // Update media info dynamically
-    const mappedPlayerId = this._config?.mappings?.[this.selectedInputName];
     const mediaContainer = this.querySelector('#media-info-container');
     const cardBg = this.querySelector('.card-bg');
     const cardEl = this.querySelector('.glass-card');
+    const artwork = mappedPlayerState?.attributes?.entity_picture || '';
     
-    if (mediaContainer && mappedPlayerId && this._hass.states[mappedPlayerId]) {
-      const playerState = this._hass.states[mappedPlayerId];
-      const title = playerState.attributes.media_title || 'Unknown Title';
-      const artist = playerState.attributes.media_artist || 'Unknown Artist';
-      const artwork = playerState.attributes.entity_picture;
-      
-      const titleEl = mediaContainer.querySelector('.media-title');
-      const artistEl = mediaContainer.querySelector('.media-artist');
+    if (mediaContainer && mappedPlayerState) {
       const artEl = mediaContainer.querySelector('.media-artwork');
-      const playBtn = mediaContainer.querySelector('#play-btn ha-icon');
-      
-      if (titleEl) titleEl.textContent = title;
-      if (artistEl) artistEl.textContent = artist;
       
-      if (artEl) {
-        if (artwork) {
-          artEl.innerHTML = `<img src="${artwork}" style="width: 70px; height: 70px; border-radius: 8px; object-fit: cover; box-shadow: 0 4px 10px rgba(0,0,0,0.3);">`;
-          if (cardBg) {
-            cardBg.style.backgroundImage = `url('${artwork}')`;
-            cardBg.style.display = 'block';
-          }
-          if (cardEl) cardEl.classList.add('has-artwork');
-        } else {
-          artEl.innerHTML = `
-            <div style="width: 70px; height: 70px; border-radius: 8px; background: var(--glass-bg); display: flex; align-items: center; justify-content: center;">
-              <ha-icon icon="mdi:music" style="color: var(--text-color-disabled); font-size: 30px;"></ha-icon>
-            </div>
-          `;
-          if (cardBg) cardBg.style.display = 'none';
-          if (cardEl) cardEl.classList.remove('has-artwork');
-        }
-      }
+      setText(mediaContainer.querySelector('.media-title'), mappedPlayerState.attributes.media_title || 'Unknown Title');
+      setText(mediaContainer.querySelector('.media-artist'), mappedPlayerState.attributes.media_artist || 'Unknown Artist');
+      setText(mediaContainer.querySelector('.media-via'), `via ${mappedPlayerState.attributes.friendly_name || mappedPlayerId}`);
+      setIcon(mediaContainer.querySelector('#play-btn ha-icon'), mappedPlayerState.state === 'playing' ? 'mdi:pause' : 'mdi:play');
       
-      if (playBtn) {
-        playBtn.setAttribute('icon', playerState.state === 'playing' ? 'mdi:pause' : 'mdi:play');
+      if (artEl && artEl.dataset.src !== artwork) {
+        artEl.dataset.src = artwork;
+        artEl.innerHTML = artwork ? `<img src="${artwork}" style="width: 70px; height: 70px; border-radius: 8px; object-fit: cover; box-shadow: 0 4px 10px rgba(0,0,0,0.3);">` : `
+          <div style="width: 70px; height: 70px; border-radius: 8px; background: var(--glass-bg); display: flex; align-items: center; justify-content: center;">
+            <ha-icon icon="mdi:music" style="color: var(--text-color-disabled); font-size: 30px;"></ha-icon>
+          </div>
+        `;
       }
-    } else {
-      if (cardEl) cardEl.classList.remove('has-artwork');
-      if (cardBg) cardBg.style.display = 'none';
     }
     
+    if (cardBg && cardBg.dataset.src !== artwork) {
+      cardBg.dataset.src = artwork;
+      cardBg.style.backgroundImage = artwork ? `url('${artwork}')` : 'none';
+      cardBg.style.display = artwork ? 'block' : 'none';
+    }
+    if (cardEl) cardEl.classList.toggle('has-artwork', !!artwork);
+    
     // Update zone joining states dynamically
-    const zoneChips = this.querySelectorAll('.zone-chip');
-    zoneChips.forEach(chip => {
-      const targetZoneId = chip.getAttribute('data-zone');
-      const zoneState = this._hass.states[targetZoneId];
-      const source = this._optimisticSources[targetZoneId] || zoneState?.attributes?.source;
-      const isJoined = source === this.selectedInputName;
-      
-      if (isJoined) {
-        chip.classList.add('joined');
-      } else {
-        chip.classList.remove('joined');
-      }
+    this.querySelectorAll('.zone-chip').forEach(chip => {
+      chip.classList.toggle('joined', this.getZoneSource(chip.getAttribute('data-zone')) === this.selectedInputName);
     });
     
     // Update linked volumes dynamically
-    const linkedSliders = this.querySelectorAll('.linked-vol-slider');
-    linkedSliders.forEach(slider => {
+    this.querySelectorAll('.linked-vol-slider').forEach(slider => {
       const targetZoneId = slider.getAttribute('data-zone');
-      const zMuted = getZoneMute(targetZoneId);
-      const zVol = getZoneVol(targetZoneId);
+      const zVol = this.getZoneVol(targetZoneId);
       
       const container = slider.closest('.vol-container');
-      if (container) {
-        const icon = container.querySelector('button ha-icon');
-        if (icon) icon.setAttribute('icon', zMuted ? 'mdi:volume-off' : 'mdi:volume-high');
-      }
+      if (container) setIcon(container.querySelector('button ha-icon'), this.getZoneMute(targetZoneId) ? 'mdi:volume-off' : 'mdi:volume-high');
       
-      if (document.activeElement !== slider) {
-        slider.value = zVol;
-        const span = slider.nextElementSibling;
-        if (span) span.textContent = `${zVol}%`;
+      if (!isDragging(slider)) {
+        setValue(slider, String(zVol));
+        setText(slider.nextElementSibling, `${zVol}%`);
       }
     });
-    
+  }
+
+  // Slider drags fire many input events per frame; update their labels once per animation frame
+  flushSliderInputs() {
+    this._inputFrame = null;
+    for (const [slider, val] of this._pendingInputs) {
+      if (slider.id === 'volume-slider') {
+        const volText = this.querySelector('#vol-text');
+        if (volText) volText.textContent = `${val}%`;
+      } else if (slider.classList.contains('linked-vol-slider')) {
+        const span = slider.nextElementSibling;
+        if (span) span.textContent = `${val}%`;
+      } else if (slider.id === 'bass-slider' || slider.id === 'treble-slider') {
+        const text = this.querySelector(slider.id === 'bass-slider' ? '#bass-text' : '#treble-text');
+        if (text) text.textContent = `${val > 0 ? '+' : ''}${val}`;
+      }
+    }
+    this._pendingInputs.clear();
   }
 }
 
@@ -1212,15 +1307,15 @@ class Control4CardEditor extends HTMLElement {
   set hass(hass) {
     this._hass = hass;
     
-    if (!this._entityReg && !this._fetchingReg && hass && typeof hass.callWS === 'function') {
-      this._fetchingReg = true;
-      hass.callWS({ type: 'config/entity_registry/list' }).then(r => {
-        this._entityReg = r;
-        this._fetchingReg = false;
+    if (!this._zoneIndex && !this._fetchingZones && hass && typeof hass.callWS === 'function') {
+      this._fetchingZones = true;
+      fetchControl4Zones(hass).then(index => {
+        this._zoneIndex = index;
+        this._fetchingZones = false;
         this.render(true);
       }).catch(e => {
-        this._entityReg = [];
-        this._fetchingReg = false;
+        this._zoneIndex = {};
+        this._fetchingZones = false;
       });
     }
     
@@ -1237,14 +1332,7 @@ class Control4CardEditor extends HTMLElement {
     }
     
     // Find zones for the dropdown
-    let zones = [];
-    if (this._entityReg) {
-      const integrationEntities = this._entityReg.filter(e => e.platform === 'control4_mediaplayer');
-      zones = integrationEntities
-        .filter(e => e.entity_id.startsWith('media_player.'))
-        .map(e => e.entity_id)
-        .filter(id => id in this._hass.states);
-    }
+    let zones = control4ZoneIds(this._zoneIndex, this._hass);
     
     if (zones.length === 0) {
       const refZone = this._config.default_zone || Object.keys(this._hass.states).find(id => id.startsWith('media_player.') && this._hass.states[id].attributes.source_list);
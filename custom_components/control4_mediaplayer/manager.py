@@ -1,56 +1,368 @@
 import asyncio
 import logging
+import math
 import random
-import socket
+import time
+from collections import deque
+from collections.abc import Callable
+
+from .const import (
+    HEARTBEAT_COMMAND,
+    HEARTBEAT_INTERVAL,
+    REGISTER_COMMANDS,
+    SLO_MAX_SAMPLES,
+    UNAVAILABLE_AFTER_FAILURES,
+    ZONE_COMMANDS,
+)
+from .models import ZoneState
+from .transport import Transport, UDPTransport
 
 _LOGGER = logging.getLogger(__name__)
 
+
+def is_ack(reply: str | None) -> bool:
+    """True when the amplifier answered and accepted the command (no timeout, no `n01` error)."""
+    return bool(reply) and "n01" not in reply
+
+
+def is_refused(reply: str | None) -> bool:
+    """True when the amplifier answered but rejected the command (`n01`); a timeout is not a refusal."""
+    return reply is not None and "n01" in reply
+
+
+def parse_reply(reply: str | None) -> str | None:
+    """Strip the `0r2aNN` sequencer prefix from a reply, leaving the amplifier's payload."""
+    if reply is None:
+        return None
+    _, _, payload = reply.partition(" ")
+    return payload.strip()
+
+
+def register_entry(command: str) -> tuple[str, str] | None:
+    """Split a register-writing command into its shadow key and value ("c4.amp.chvol 01", "d7")."""
+    verb, *args = command.split()
+    address_len = REGISTER_COMMANDS.get(verb)
+    if address_len is None or len(args) <= address_len:
+        return None
+    return " ".join([verb, *args[:address_len]]), " ".join(args[address_len:]).lower()
+
+
+def _flush_order(command: str) -> int:
+    """Safe resend order: volumes first, then waking from power save, then routing and the rest."""
+    if command.startswith("c4.amp.chvol"):
+        return 0
+    return 1 if command.startswith("c4.amp.psave") else 2
+
+
+def input_gain_command(input_num: int, level: float) -> str:
+    """Command setting the gain trim of an input (-6 to +6 dB)."""
+    # Scale: 80 = 0dB. Limits: 7A (-6dB) to 86 (+6dB)
+    return f"c4.amp.ingain {int(input_num):02x} {int(128 + level):02x}"
+
+
 class Control4Manager:
     """Centralized manager for Control4 Matrix Amp UDP communication."""
     
-    def __init__(self, host: str, port: int, udp_timeout: float = 2.0):
+    def __init__(self, host: str, port: int, udp_timeout: float = 2.0, transport: Transport | None = None):
         self.host = host
         self.port = port
         self.udp_timeout = udp_timeout
+        # Swappable for recording or replaying traffic (see transport.py)
+        self.transport: Transport = transport or UDPTransport(host, port)
         self._lock = asyncio.Lock()
-        
+
+        # Availability tracking (driven by real traffic, topped up by the heartbeat)
+        self.available = True
+        self.last_ack = None
+        self._failures = 0
+        self._listeners: list[Callable[[], None]] = []
+        # Round-trip estimate from the startup probe, the initial latency of every zone
+        self.rtt_ms: float | None = None
+
+        # Whether the amp accepts native mute (c4.amp.mute); None until a mute command was answered
+        self.native_mute: bool | None = None
+        self._capability_listeners: list[Callable[[], None]] = []
+
+        # Recent exchanges as (monotonic send time, latency_ms or None if unanswered), for the SLO check
+        self._samples: deque[tuple[float, float | None]] = deque(maxlen=SLO_MAX_SAMPLES)
+
+        # Shadow registers ("c4.amp.chvol 01" -> "d7"): the last value the amp acknowledged
+        self.registers: dict[str, str] = {}
+        self._register_listeners: list[Callable[[], None]] = []
+
+        # Register writes the amp did not answer ("c4.amp.chvol 01" -> latest command), resent as
+        # one batch as soon as it answers again. Bounded by the number of registers, not by writes.
+        self.queued: dict[str, str] = {}
+        self._queue_listeners: list[Callable[[], None]] = []
+
+        # Single commands waiting or in flight, by register (or command): (command, shared result)
+        self._flights: dict[str, tuple[str, asyncio.Future]] = {}
+
+        # Live state of every channel, the single copy read and written by all entities of a zone
+        self.zones: dict[int, ZoneState] = {}
+
+    def close(self) -> None:
+        """Release the transport's socket (on unload)."""
+        self.transport.close()
+
+    def zone(self, channel: int) -> ZoneState:
+        """Return the shared state of `channel`, creating it on first use."""
+        if (zone := self.zones.get(channel)) is None:
+            zone = self.zones[channel] = ZoneState(channel, latency_ms=self.rtt_ms)
+        return zone
+
+    def seed_reachability(self, rtt_ms: float | None) -> None:
+        """Adopt the startup probe's verdict before any command was sent.
+
+        An amp that answered starts with its round-trip time as the zones' latency estimate; one that
+        did not starts unavailable, so setup queues its writes instead of timing out on each of them.
+        """
+        if rtt_ms is not None:
+            self.rtt_ms = rtt_ms
+            self.last_ack = time.monotonic()
+            for zone in self.zones.values():
+                zone.latency_ms = rtt_ms
+            return
+        self._failures = max(self._failures, UNAVAILABLE_AFTER_FAILURES)
+        if self.available:
+            self.available = False
+            _LOGGER.warning("Control4: amplifier %s:%s did not answer the startup probe", self.host, self.port)
+            for update_callback in list(self._listeners):
+                update_callback()
+
+    def queue(self, commands: list[str]) -> None:
+        """Queue register writes to be sent as soon as the amp answers again, without trying them now."""
+        for command in commands:
+            if (entry := register_entry(command)) is not None:
+                self.queued[entry[0]] = command
+
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback invoked whenever availability changes. Returns a remover."""
+        self._listeners.append(update_callback)
+
+        def _remove():
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+
+        return _remove
+
+    def async_add_register_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback invoked whenever a shadow register changes. Returns a remover."""
+        self._register_listeners.append(update_callback)
+
+        def _remove():
+            if update_callback in self._register_listeners:
+                self._register_listeners.remove(update_callback)
+
+        return _remove
+
+    def async_add_queue_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback invoked after queued writes were resent. Returns a remover."""
+        self._queue_listeners.append(update_callback)
+
+        def _remove():
+            if update_callback in self._queue_listeners:
+                self._queue_listeners.remove(update_callback)
+
+        return _remove
+
+    def async_add_capability_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback invoked when native mute support was learned. Returns a remover."""
+        self._capability_listeners.append(update_callback)
+
+        def _remove():
+            if update_callback in self._capability_listeners:
+                self._capability_listeners.remove(update_callback)
+
+        return _remove
+
+    def register_holds(self, command: str) -> bool:
+        """True when the shadow register already holds the value `command` would write."""
+        entry = register_entry(command)
+        return entry is not None and self.registers.get(entry[0]) == entry[1]
+
+    def _record_register(self, command: str) -> None:
+        """Update the shadow register written by an acknowledged command."""
+        entry = register_entry(command)
+        if entry is None:
+            return
+        key, value = entry
+        if self.registers.get(key) == value:
+            return
+        self.registers[key] = value
+        for update_callback in list(self._register_listeners):
+            update_callback()
+
+    def _record_zone_result(self, command: str, res: str | None, latency_ms: float) -> None:
+        """Attribute the outcome of a channel command to its zone (latency if answered, else a drop)."""
+        verb, *args = command.split()
+        if verb not in ZONE_COMMANDS or not args:
+            return
+        try:
+            zone = self.zones.get(int(args[0], 16))
+        except ValueError:
+            return
+        if zone is None:
+            return
+        if res is None:
+            zone.dropped += 1
+        else:
+            zone.latency_ms = latency_ms
+
+    def _record_native_mute(self, command: str, res: str | None) -> None:
+        """Learn native mute support from the first answered c4.amp.mute (a refusal means unsupported)."""
+        if res is None or not command.startswith("c4.amp.mute "):
+            return
+        native_mute = not is_refused(res)
+        if native_mute == self.native_mute:
+            return
+        self.native_mute = native_mute
+        _LOGGER.debug("Control4: %s native mute %s", self.host, "supported" if native_mute else "not supported")
+        for update_callback in list(self._capability_listeners):
+            update_callback()
+
+    def _record_result(self, res) -> None:
+        """Update availability from the outcome of a command (any reply counts as alive)."""
+        if res is not None:
+            self.last_ack = time.monotonic()
+            self._failures = 0
+            available = True
+        else:
+            self._failures += 1
+            available = self.available and self._failures < UNAVAILABLE_AFTER_FAILURES
+
+        if available != self.available:
+            self.available = available
+            if available:
+                _LOGGER.info("Control4: amplifier %s:%s is reachable again", self.host, self.port)
+            else:
+                _LOGGER.warning(
+                    "Control4: amplifier %s:%s stopped answering after %d attempts",
+                    self.host, self.port, self._failures,
+                )
+            for update_callback in list(self._listeners):
+                update_callback()
+
+    def latency_stats(self, window: float) -> tuple[int, float | None, float]:
+        """Commands sent in the last `window` seconds, their p95 latency (answered ones) and timeout rate."""
+        since = time.monotonic() - window
+        recent = [latency for sent, latency in self._samples if sent >= since]
+        if not recent:
+            return 0, None, 0.0
+        answered = sorted(latency for latency in recent if latency is not None)
+        p95 = answered[math.ceil(0.95 * len(answered)) - 1] if answered else None
+        return len(recent), p95, (len(recent) - len(answered)) / len(recent)
+
+    async def async_heartbeat(self):
+        """Probe the amplifier unless real traffic was acknowledged within the heartbeat interval."""
+        if self.last_ack is not None and time.monotonic() - self.last_ack < HEARTBEAT_INTERVAL:
+            return
+        await self.async_send_command(HEARTBEAT_COMMAND)
+
+    @staticmethod
+    def _flight_key(command: str) -> str:
+        """Commands writing the same register share a key; anything else is keyed by itself."""
+        entry = register_entry(command)
+        return entry[0] if entry is not None else command
+
     async def async_send_command(self, command: str):
-        """Send a UDP command to the amplifier using Safe Transport logic."""
+        """Send a UDP command to the amplifier using Safe Transport logic.
+
+        An identical command that is still waiting for the lock or in flight is not sent again:
+        later callers await its result (single flight). A different write to the same register
+        ends the sharing, so nobody joins a command that is about to be overridden.
+        """
+        key = self._flight_key(command)
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] == command:
+            try:
+                return await asyncio.shield(flight[1])
+            except asyncio.CancelledError:
+                if not flight[1].cancelled():
+                    raise
+                # The caller sending it was cancelled or failed: send it ourselves
+
+        shared = asyncio.get_running_loop().create_future()
+        self._flights[key] = (command, shared)
+        try:
+            res = await self._async_send_single(command)
+        except BaseException:
+            shared.cancel()
+            raise
+        else:
+            shared.set_result(res)
+            return res
+        finally:
+            if self._flights.get(key, (None, None))[1] is shared:
+                del self._flights[key]
+
+    async def _async_send_single(self, command: str):
         async with self._lock:
-            # Use random sequencer prefix
-            counter = f"0s2a{random.randint(10, 99)}"
-            payload = f"{counter} {command} \r\n"
-            
-            loop = asyncio.get_running_loop()
-            
-            def _send_and_wait():
-                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                sock.settimeout(self.udp_timeout)
-
-                try:
-                    sock.sendto(payload.encode('utf-8'), (self.host, self.port))
-                    while True:
-                        data, _ = sock.recvfrom(1024)
-                        received = data.decode('utf-8').strip()
-                        # Ensure we are capturing the response to our specific command
-                        expected_prefix = counter.replace("s", "r", 1)
-                        if received.startswith(expected_prefix):
-                            return received
-                except TimeoutError:
-                    # Timeout is an expected fallback condition for the amp if it doesn't ack
-                    return None
-                except Exception as e:
-                    _LOGGER.error("Error sending UDP to %s:%s - %s", self.host, self.port, e)
-                    return None
-                finally:
-                    sock.close()
-                    
-            res = await loop.run_in_executor(None, _send_and_wait)
-            
-            # 10ms hardware guard delay to prevent packet drops on legacy network cards
-            await asyncio.sleep(0.01)
+            res, _ = await self._async_send_locked(command)
+            if res is not None and self.queued:
+                await self._async_flush_queued_locked()
             return res
 
+    async def async_send_batch(self, commands: list[str]) -> list[tuple[str | None, float]]:
+        """Send commands back to back under a single lock hold, in order.
+
+        Returns one (reply, latency_ms) pair per command. Other callers cannot interleave
+        with the batch, so multi-step sequences (e.g. volume before wake-up) stay atomic.
+        """
+        # Writes queued behind this batch must not be joined by callers arriving after it
+        for command in commands:
+            self._flights.pop(self._flight_key(command), None)
+        async with self._lock:
+            replies = [await self._async_send_locked(command) for command in commands]
+            if replies and replies[-1][0] is not None and self.queued:
+                await self._async_flush_queued_locked()
+            return replies
+
+    async def _async_flush_queued_locked(self) -> None:
+        """Resend the queued register writes in safe order; the caller must hold the lock.
+
+        Stops at the first unanswered command, which (with everything after it) stays queued.
+        """
+        commands = sorted(self.queued.values(), key=_flush_order)
+        self.queued.clear()
+        _LOGGER.info(
+            "Control4: amplifier %s:%s answers again, resending %d queued command(s)",
+            self.host, self.port, len(commands),
+        )
+        for index, command in enumerate(commands):
+            res, _ = await self._async_send_locked(command)
+            if res is None:
+                for remaining in commands[index + 1:]:
+                    self.queued.setdefault(register_entry(remaining)[0], remaining)
+                break
+        for update_callback in list(self._queue_listeners):
+            update_callback()
+
+    async def _async_send_locked(self, command: str) -> tuple[str | None, float]:
+        """Send one command; the caller must hold the lock. Returns (reply, latency_ms)."""
+        # Use random sequencer prefix
+        counter = f"0s2a{random.randint(10, 99)}"
+
+        started = time.monotonic()
+        res = await self.transport.async_request(counter, command, self.udp_timeout)
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+        self._samples.append((started, latency_ms if res is not None else None))
+        self._record_result(res)
+        self._record_zone_result(command, res, latency_ms)
+        self._record_native_mute(command, res)
+        if is_ack(res):
+            self._record_register(command)
+        if (entry := register_entry(command)) is not None:
+            if res is None:
+                self.queued[entry[0]] = command
+            else:
+                # Answered (even if refused): supersedes any older queued write to the register
+                self.queued.pop(entry[0], None)
+
+        # 10ms hardware guard delay to prevent packet drops on legacy network cards
+        await asyncio.sleep(0.01)
+        return res, latency_ms
+
 
     async def async_set_max_volume(self, zone: int, volume: float):
         """Set max volume (0 to 100)."""
@@ -69,17 +381,14 @@ class Control4Manager:
     async def async_set_power_save(self, active: bool):
         """Set system power save mode."""
         val = "01 00" if active else "00 00"
-        await self.async_send_command(f"c4.amp.psave {val}")
+        return await self.async_send_command(f"c4.amp.psave {val}")
 
 
 
 
     async def async_set_input_gain(self, input_num: int, level: float):
         """Set input gain trim (-6 to +6 dB)."""
-        input_hex = f"{int(input_num):02x}"
-        # Scale: 80 = 0dB. Limits: 7A (-6dB) to 86 (+6dB)
-        gain_hex = f"{int(128 + level):02x}"
-        await self.async_send_command(f"c4.amp.ingain {input_hex} {gain_hex}")
+        await self.async_send_command(input_gain_command(input_num, level))
 
 
 
@@ -4,7 +4,8 @@ from homeassistant.components.media_player import (
     MediaPlayerEntity,
     MediaPlayerEntityFeature,
 )
-from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import callback
 
 try:
     from homeassistant.helpers.device_registry import DeviceInfo
@@ -12,23 +13,42 @@ except ImportError:
     from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.restore_state import RestoreEntity
 
-from .const import DOMAIN, get_entity_name, get_unique_id
+from .const import (
+    DOMAIN,
+    get_amp_identifier,
+    get_entity_name,
+    get_followers,
+    get_unique_id,
+    get_zone_data,
+    get_zones,
+    hex_to_volume,
+    parse_source_list,
+    volume_to_hex,
+)
 from .control4Amp import control4AmpChannel
+from .manager import is_refused
+from .models import async_write_state
 
 _LOGGER = logging.getLogger(__name__)
 
+# Zone registers whose unanswered writes are reported in the `pending` attribute
+PENDING_REGISTERS = (("c4.amp.out", "source"), ("c4.amp.chvol", "volume"), ("c4.amp.mute", "muted"))
+
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     host = config_entry.data.get("host")
     port = config_entry.data.get("port")
-    channel = config_entry.data.get("channel")
-    name = config_entry.data.get("zone_custom_name")
     
     # Retrieve the manager initialized in __init__.py
-    manager = hass.data[DOMAIN][config_entry.entry_id]["manager"]
+    entry_data = config_entry.runtime_data
+    manager = entry_data.manager
     
-    entity = C4MediaPlayer(host, port, channel, name, config_entry, manager)
-    hass.data[DOMAIN][config_entry.entry_id]["media_player"] = entity
-    async_add_entities([entity], update_before_add=True)
+    entities = []
+    for channel, zone in get_zones(config_entry.data).items():
+        entity = C4MediaPlayer(host, port, channel, zone.get("zone_custom_name"), config_entry, manager)
+        entry_data.media_players[channel] = entity
+        entities.append(entity)
+    async_add_entities(entities, update_before_add=True)
 
 class C4MediaPlayer(MediaPlayerEntity, RestoreEntity):
     _attr_supported_features = (
@@ -36,6 +56,8 @@ class C4MediaPlayer(MediaPlayerEntity, RestoreEntity):
         MediaPlayerEntityFeature.TURN_ON | MediaPlayerEntityFeature.TURN_OFF |
         MediaPlayerEntityFeature.SELECT_SOURCE | MediaPlayerEntityFeature.VOLUME_MUTE
     )
+    # Diagnostics change with every command; keep them out of the recorder
+    _unrecorded_attributes = frozenset({"pending", "last_latency_ms", "dropped_commands"})
 
     def __init__(self, host, port, channel, zone_custom_name, config_entry, manager):
         self._amp = control4AmpChannel(manager, channel)
@@ -44,122 +66,394 @@ class C4MediaPlayer(MediaPlayerEntity, RestoreEntity):
         
         amp_label = config_entry.data.get("name", "Matrix Amp")
         
-        self._state, self._volume, self._muted, self._source = STATE_OFF, 0.5, False, None
+        # Power, volume, mute, routed input and max volume live in the manager's shared zone state
+        self._zone = self._amp._zone
+        # Whether power came from the last run's state; otherwise reconciliation adopts the amp's
+        self._power_restored = False
 
         self._attr_has_entity_name = True
         
-        self._attr_name = get_entity_name(config_entry.data.get("zone_custom_name", zone_custom_name))
+        self._attr_name = get_entity_name(self._zone_data.get("zone_custom_name", zone_custom_name))
         
         # Maintaining the v27_ prefix as explicitly requested by the user
         self._attr_unique_id = get_unique_id(host, channel)
         
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"v27_{host}_main_amp")},
+            identifiers={(DOMAIN, get_amp_identifier(host))},
             name=amp_label,
             manufacturer="Control4",
             model="Matrix Amplifier",
         )
         
-        raw_sources = config_entry.data.get("source_list", "")
-        self._source_list = [s.strip() for s in raw_sources.split("\n") if s.strip()]
+        self._source_list = parse_source_list(self._zone_data.get("source_list", ""))
 
     @property
-    def state(self): return self._state
+    def _zone_data(self) -> dict:
+        """Settings of this zone inside the amplifier's config entry."""
+        return get_zone_data(self._config_entry.data, self._channel)
+
+    @property
+    def state(self): return self._zone.state
     @property
-    def volume_level(self): return self._volume
+    def volume_level(self): return self._zone.volume
     @property
-    def is_volume_muted(self): return self._muted
+    def is_volume_muted(self): return self._zone.muted
     @property
     def source_list(self): return self._source_list
     @property
-    def source(self): return self._source
+    def source(self):
+        """Name of the routed input (follows renames of the source list)."""
+        return self._source_list[self._zone.source - 1] if 0 < self._zone.source <= len(self._source_list) else None
+    @property
+    def available(self): return self._amp._manager.available
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Which values the amp has not confirmed yet (queued while unreachable), and command latency."""
+        zone_hex = f"{int(self._channel):02x}"
+        queued = self._amp._manager.queued
+        return {
+            "pending": [name for verb, name in PENDING_REGISTERS if f"{verb} {zone_hex}" in queued],
+            "last_latency_ms": self._zone.latency_ms,
+            "dropped_commands": self._zone.dropped,
+        }
 
     @property
     def max_volume(self) -> float:
         """Return the current maximum volume level as a float (0.0 to 1.0)."""
-        max_vol_entity = self.hass.data[DOMAIN][self._config_entry.entry_id].get("max_volume_entity")
-        if max_vol_entity and max_vol_entity.native_value is not None:
-            return float(max_vol_entity.native_value) / 100.0
-        return 1.0
+        return self._zone.max_volume / 100.0
+
+    @callback
+    def async_apply_entry_data(self):
+        """Refresh name and source list from the config entry after an options change."""
+        zone = self._zone_data
+        self._attr_name = get_entity_name(zone.get("zone_custom_name", self._attr_name))
+        self._source_list = parse_source_list(zone.get("source_list", ""))
+        async_write_state(self)
+
+    @callback
+    def async_apply_party_mode(self, source_idx: int, volume: float):
+        """Reflect a party mode batch (already sent to the amp) in this entity's state."""
+        self._zone.source = source_idx
+        self._zone.volume = volume
+        self._zone.state = STATE_ON
+        async_write_state(self)
+
+    def _linked_followers(self) -> list[tuple["C4MediaPlayer", int]]:
+        """Zones of this amp linked to follow this one, with their volume offsets in percent."""
+        media_players = self._config_entry.runtime_data.media_players
+        return [
+            (media_players[channel], offset)
+            for channel, offset in get_followers(self._config_entry.data, self._channel)
+            if channel in media_players
+        ]
+
+    def _volume_held_by_mute(self) -> bool:
+        """Whether a volume-based (fallback) mute holds this zone's volume at 0 on the amp.
+
+        A new level must then wait for the unmute, which restores it. Behind a native mute the
+        volume register is free and is sent as usual, so the unmute resumes at the current level.
+        """
+        manager = self._amp._manager
+        return self._zone.muted and (
+            manager.native_mute is False or manager.registers.get(f"c4.amp.chvol {self._channel:02x}") == "9b"
+        )
+
+    def _zone_snapshot(self) -> tuple:
+        return self._zone.state, self._zone.source, self._zone.volume, self._zone.muted
+
+    def _async_rollback_refused(self, replies, snapshot: tuple) -> bool:
+        """Restore `snapshot` if the amp refused any of `replies` (`n01`). Returns True when rolled back.
+
+        An unanswered command is not rolled back: the manager queues it and the value stays pending.
+        """
+        if not any(is_refused(reply) for reply in replies):
+            return False
+        _LOGGER.warning(
+            "Control4: %s refused a command, keeping the previous state of zone %s", self._host, self._channel
+        )
+        self._zone.state, self._zone.source, self._zone.volume, self._zone.muted = snapshot
+        return True
+
+    def _source_index(self) -> int:
+        """Input number of the selected source (input 1 when unknown)."""
+        return self._zone.source or 1
+
+    @staticmethod
+    def _follower_volume(follower: "C4MediaPlayer", volume: float, offset: int) -> float:
+        """Leader volume shifted by the follower's offset, clamped to 0 and the follower's max volume."""
+        return min(max(round(volume + offset / 100.0, 2), 0.0), follower.max_volume)
+
+    async def _async_send_linked(self, commands: list[str], players: list["C4MediaPlayer"], snapshots: dict):
+        """Send the leader's and followers' commands as one batch, then publish every zone's state.
+
+        A zone whose command was refused goes back to its snapshot; the others keep the change.
+        """
+        replies = await self._amp._manager.async_send_batch(commands)
+        for player in players:
+            zone_hex = f"{player._channel:02x}"
+            player._async_rollback_refused(
+                [
+                    reply
+                    for command, (reply, _) in zip(commands, replies, strict=True)
+                    if command.startswith("c4.amp.psave") or command.split()[1] == zone_hex
+                ],
+                snapshots[player],
+            )
+            async_write_state(player)
 
     async def async_turn_on(self):
+        snapshot = self._zone_snapshot()
         # 1. Calculate and cap the play volume
-        on_vol_percent = self._config_entry.data.get("on_volume", 50)
-        self._volume = on_vol_percent / 100.0
-        max_vol = self.max_volume
-        if self._volume > max_vol:
-            self._volume = max_vol
+        on_vol_percent = self._zone_data.get("on_volume", 50)
+        self._zone.volume = min(on_vol_percent / 100.0, self.max_volume)
+
+        if followers := self._linked_followers():
+            # Same safe order across the group: every volume, then wake, then every route
+            players = [self, *(follower for follower, _ in followers)]
+            snapshots = {self: snapshot, **{follower: follower._zone_snapshot() for follower, _ in followers}}
+            for follower, offset in followers:
+                follower._zone.volume = self._follower_volume(follower, self._zone.volume, offset)
+            for player in players:
+                player._zone.source = player._source_index()
+                player._zone.state = STATE_ON
+            # As with volume changes, a follower muted by volume keeps its mute; its level applies when it is unmuted
+            await self._async_send_linked(
+                [
+                    f"c4.amp.chvol {player._channel:02x} {volume_to_hex(player._zone.volume)}"
+                    for player in players
+                    if player is self or not player._volume_held_by_mute()
+                ]
+                + ["c4.amp.psave 00 00"]
+                + [f"c4.amp.out {player._channel:02x} {player._zone.source:02x}" for player in players],
+                players,
+                snapshots,
+            )
+            return
 
         # 2. Pre-load the correct play volume into the amp BEFORE waking it from
         #    power save. This ensures the register is already at the right level
         #    the instant the amp resumes routing, preventing any volume blast.
-        await self._amp.async_set_volume(self._volume)
+        replies = [await self._amp.async_set_volume(self._zone.volume)]
 
         # 3. Wake the system out of power save (amp now resumes at the correct volume)
-        await self._amp._manager.async_set_power_save(False)
+        replies.append(await self._amp._manager.async_set_power_save(False))
 
         # 4. Route the input to start playing
-        if self._source in self._source_list:
-            idx = self._source_list.index(self._source) + 1
-        else:
-            idx = 1
-        self._amp._source = idx
-        await self._amp.async_set_source(idx)
+        replies.append(await self._amp.async_set_source(self._source_index()))
 
-        self._state = STATE_ON
-        self.async_write_ha_state()
+        self._zone.state = STATE_ON
+        self._async_rollback_refused(replies, snapshot)
+        async_write_state(self)
 
     async def async_turn_off(self):
-        await self._amp.async_turn_off()
-        self._state = STATE_OFF
-        self.async_write_ha_state()
+        if followers := self._linked_followers():
+            players = [self, *(follower for follower, _ in followers)]
+            snapshots = {player: player._zone_snapshot() for player in players}
+            for player in players:
+                player._zone.state = STATE_OFF
+            await self._async_send_linked(
+                [f"c4.amp.out {player._channel:02x} 00" for player in players], players, snapshots
+            )
+            return
+
+        snapshot = self._zone_snapshot()
+        self._zone.state = STATE_OFF
+        self._async_rollback_refused([await self._amp.async_turn_off()], snapshot)
+        async_write_state(self)
 
     async def async_set_volume_level(self, volume):
         max_vol = self.max_volume
         if volume > max_vol:
             volume = max_vol
-        await self._amp.async_set_volume(volume)
-        self._volume = volume
-        self.async_write_ha_state()
+
+        if followers := self._linked_followers():
+            levels = [(self, volume)] + [
+                (follower, self._follower_volume(follower, volume, offset)) for follower, offset in followers
+            ]
+            snapshots = {player: player._zone_snapshot() for player, _ in levels}
+            for player, level in levels:
+                player._zone.volume = level
+            # A follower muted by volume stays muted; its new level applies when it is unmuted
+            await self._async_send_linked(
+                [
+                    f"c4.amp.chvol {player._channel:02x} {volume_to_hex(level)}"
+                    for player, level in levels
+                    if player is self or not player._volume_held_by_mute()
+                ],
+                [player for player, _ in levels],
+                snapshots,
+            )
+            return
+
+        snapshot = self._zone_snapshot()
+        self._async_rollback_refused([await self._amp.async_set_volume(volume)], snapshot)
+        async_write_state(self)
 
     async def async_mute_volume(self, mute):
-        await self._amp.async_mute_volume(mute)
-        self._muted = mute
-        self.async_write_ha_state()
+        snapshot = self._zone_snapshot()
+        self._zone.muted = mute
+        self._async_rollback_refused([await self._amp.async_mute_volume(mute)], snapshot)
+        async_write_state(self)
 
     async def async_select_source(self, source):
-        if source in self._source_list:
-            idx = self._source_list.index(source) + 1
-            await self._amp.async_set_source(idx)
-            self._source = source
-            self.async_write_ha_state()
+        if source not in self._source_list:
+            return
+
+        if followers := self._linked_followers():
+            players = [self]
+            snapshots = {self: self._zone_snapshot()}
+            self._zone.source = self._source_list.index(source) + 1
+            commands = [f"c4.amp.out {self._channel:02x} {self._zone.source:02x}"]
+            for follower, _ in followers:
+                if source not in follower._source_list:
+                    continue
+                snapshots[follower] = follower._zone_snapshot()
+                follower._zone.source = follower._source_list.index(source) + 1
+                players.append(follower)
+                # Routing a zone that is off would switch it on; it picks up the source when turned on
+                if follower._zone.state == STATE_ON:
+                    commands.append(f"c4.amp.out {follower._channel:02x} {follower._zone.source:02x}")
+            await self._async_send_linked(commands, players, snapshots)
+            return
+
+        snapshot = self._zone_snapshot()
+        self._async_rollback_refused(
+            [await self._amp.async_set_source(self._source_list.index(source) + 1)], snapshot
+        )
+        async_write_state(self)
 
     async def async_added_to_hass(self):
         """Restore state on startup."""
         await super().async_added_to_hass()
-        
+        self.async_on_remove(self._amp._manager.async_add_listener(self.async_write_ha_state))
+        # Refresh the `pending` attribute once writes queued during an outage have been resent
+        self.async_on_remove(self._amp._manager.async_add_queue_listener(self.async_write_ha_state))
+
         last_state = await self.async_get_last_state()
         if last_state:
-            self._state = last_state.state
+            # An unavailable or unknown state says nothing about power; the amp's shadow decides instead
+            if last_state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+                self._zone.state = last_state.state
+                self._power_restored = True
             
             # Restore volume
             if "volume_level" in last_state.attributes:
-                self._volume = float(last_state.attributes["volume_level"])
+                self._zone.volume = float(last_state.attributes["volume_level"])
             
             # Restore muted
             if "is_volume_muted" in last_state.attributes:
-                self._muted = bool(last_state.attributes["is_volume_muted"])
+                self._zone.muted = bool(last_state.attributes["is_volume_muted"])
             elif "muted" in last_state.attributes:
-                self._muted = bool(last_state.attributes["muted"])
+                self._zone.muted = bool(last_state.attributes["muted"])
                 
             # Restore source
-            if "source" in last_state.attributes:
-                self._source = last_state.attributes["source"]
-                if self._source in self._source_list:
-                    idx = self._source_list.index(self._source) + 1
-                    self._amp._source = idx
+            if last_state.attributes.get("source") in self._source_list:
+                self._zone.source = self._source_list.index(last_state.attributes["source"]) + 1
                     
         # Software cap the restored volume on load (completely silent/passive)
         max_vol = self.max_volume
-        if self._volume > max_vol:
-            self._volume = max_vol
\ No newline at end of file
+        if self._zone.volume > max_vol:
+            self._zone.volume = max_vol
+
+    @callback
+    def async_reconcile_commands(self) -> list[str]:
+        """Commands that bring the amp in line with the restored state, judged by its shadow registers.
+
+        Only registers with a known hardware value are considered, so a first start stays silent.
+        Reconciliation never makes a zone louder: it does not raise volume, unmute or wake a zone
+        that is off on the amp. In those cases the entity adopts the hardware state instead.
+        """
+        registers = self._amp._manager.registers
+        zone = self._zone
+        zone_hex = f"{int(self._channel):02x}"
+        commands = []
+        adopted = False
+
+        hw_out = registers.get(f"c4.amp.out {zone_hex}")
+        if hw_out is not None:
+            hw_on = hw_out != "00"
+            if not self._power_restored:
+                if hw_on and zone.state != STATE_ON:
+                    zone.state = STATE_ON
+                    zone.source = zone.source or int(hw_out, 16)
+                    adopted = True
+            elif zone.state == STATE_ON and not hw_on:
+                zone.state = STATE_OFF
+                adopted = True
+            elif zone.state != STATE_ON and hw_on:
+                commands.append(f"c4.amp.out {zone_hex} 00")
+            elif hw_on and zone.source and int(hw_out, 16) != zone.source:
+                commands.append(f"c4.amp.out {zone_hex} {zone.source:02x}")
+
+        hw_mute = registers.get(f"c4.amp.mute {zone_hex}")
+        if hw_mute is not None and (hw_mute == "01") != zone.muted:
+            if zone.muted:
+                commands.append(f"c4.amp.mute {zone_hex} 01")
+            else:
+                zone.muted = True
+                adopted = True
+
+        # A volume-based (fallback) mute parks chvol at 0, which must not be "restored"
+        hw_vol = registers.get(f"c4.amp.chvol {zone_hex}")
+        if hw_vol is not None and not zone.muted:
+            desired = volume_to_hex(zone.volume)
+            if int(desired, 16) < int(hw_vol, 16):
+                commands.append(f"c4.amp.chvol {zone_hex} {desired}")
+            elif desired != hw_vol:
+                zone.volume = hex_to_volume(hw_vol)
+                adopted = True
+
+        if adopted:
+            async_write_state(self)
+        return commands
+
+    @callback
+    def preset_snapshot(self) -> dict:
+        """Power, source and volume of this zone, as saved in a preset."""
+        return {
+            "state": STATE_ON if self._zone.state == STATE_ON else STATE_OFF,
+            "source": self.source,
+            "volume": self._zone.volume,
+        }
+
+    def _preset_source_index(self, preset: dict) -> int:
+        source = preset.get("source")
+        return self._source_list.index(source) + 1 if source in self._source_list else self._source_index()
+
+    @callback
+    def async_preset_commands(self, preset: dict) -> list[str]:
+        """Commands moving this zone to `preset`, skipping registers that already hold the value.
+
+        The shadow registers are trusted where known, the entity state otherwise. A zone muted by
+        volume stays muted; its preset level takes effect when it is unmuted.
+        """
+        registers = self._amp._manager.registers
+        zone = self._zone
+        zone_hex = f"{int(self._channel):02x}"
+        hw_out = registers.get(f"c4.amp.out {zone_hex}", f"{zone.source:02x}" if zone.state == STATE_ON else "00")
+        if preset.get("state") != STATE_ON:
+            return [] if hw_out == "00" else [f"c4.amp.out {zone_hex} 00"]
+
+        commands = []
+        volume_hex = volume_to_hex(min(float(preset.get("volume", zone.volume)), self.max_volume))
+        hw_vol = registers.get(f"c4.amp.chvol {zone_hex}", volume_to_hex(zone.volume))
+        if not self._volume_held_by_mute() and hw_vol != volume_hex:
+            commands.append(f"c4.amp.chvol {zone_hex} {volume_hex}")
+        idx = self._preset_source_index(preset)
+        if hw_out == "00":
+            commands.append("c4.amp.psave 00 00")
+        if int(hw_out, 16) != idx:
+            commands.append(f"c4.amp.out {zone_hex} {idx:02x}")
+        return commands
+
+    @callback
+    def async_apply_preset(self, preset: dict):
+        """Reflect a preset (already acknowledged by the amp) in this entity's state."""
+        if preset.get("state") == STATE_ON:
+            self._zone.source = self._preset_source_index(preset)
+            self._zone.volume = min(float(preset.get("volume", self._zone.volume)), self.max_volume)
+            self._zone.state = STATE_ON
+        else:
+            self._zone.state = STATE_OFF
+        async_write_state(self)
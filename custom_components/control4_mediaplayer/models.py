@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import STATE_OFF
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.storage import Store
+
+    from .manager import Control4Manager
+    from .media_player import C4MediaPlayer
+    from .number import C4NumberEntity
+
+
+@dataclass(slots=True)
+class ZoneState:
+    """Live state of one amplifier channel, shared by the zone's media player and number entities."""
+
+    channel: int
+    state: str = STATE_OFF
+    source: int = 0            # routed input number, 0 while unknown
+    volume: float = 0.5        # 0.0 - 1.0
+    muted: bool = False
+    max_volume: float = 100.0  # percent; enforced in software only
+    latency_ms: float | None = None  # round-trip of the last answered command
+    dropped: int = 0           # commands the amp did not answer
+
+
+@dataclass(slots=True)
+class Control4Data:
+    """Runtime data of one amplifier entry, stored in `entry.runtime_data`."""
+
+    manager: Control4Manager
+    register_store: Store
+    # Snapshot the running entities were built from, used to hot-apply option changes
+    applied_data: dict
+    # Entities register themselves per channel during platform setup; the max volume number comes first
+    media_players: dict[int, C4MediaPlayer] = field(default_factory=dict)
+    number_entities: dict[int, list[C4NumberEntity]] = field(default_factory=dict)
+    # Consecutive heartbeat checks that found the latency SLO breached, and whether its repair issue is up
+    slo_breaches: int = 0
+    slo_issue: bool = False
+
+
+Control4ConfigEntry = ConfigEntry[Control4Data]
+
+
+@callback
+def async_loaded_entries(hass: HomeAssistant) -> list[Control4ConfigEntry]:
+    """Amplifier entries that are set up, so their `runtime_data` is live."""
+    return [entry for entry in hass.config_entries.async_entries(DOMAIN) if entry.state is ConfigEntryState.LOADED]
+
+
+# Entities whose state write is held back by the surrounding bulk operation (ordered set), if any.
+# A context variable scopes this to the operation's own task tree, so unrelated service calls
+# running meanwhile still write immediately.
+_pending_writes: ContextVar[dict[Entity, None] | None] = ContextVar(f"{DOMAIN}_pending_writes", default=None)
+
+
+@contextmanager
+def coalesced_state_writes() -> Iterator[None]:
+    """Hold back entity state writes inside the block and flush one write per entity at its end.
+
+    Party mode or a preset across a whole house otherwise fires a state_changed event (and a
+    recorder write) for every intermediate step. Nested blocks are flushed by the outermost one.
+    """
+    if _pending_writes.get() is not None:
+        yield
+        return
+    pending: dict[Entity, None] = {}
+    token = _pending_writes.set(pending)
+    try:
+        yield
+    finally:
+        _pending_writes.reset(token)
+        for entity in pending:
+            entity.async_write_ha_state()
+
+
+@callback
+def async_write_state(entity: Entity) -> None:
+    """Write `entity`'s state now, or once at the end of the surrounding bulk operation."""
+    pending = _pending_writes.get()
+    if pending is None:
+        entity.async_write_ha_state()
+    else:
+        pending[entity] = None
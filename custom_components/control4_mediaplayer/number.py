@@ -1,37 +1,46 @@
 import logging
 
 from homeassistant.components.number import RestoreNumber
+from homeassistant.core import callback
 
 try:
     from homeassistant.helpers.device_registry import DeviceInfo
 except ImportError:
     from homeassistant.helpers.entity import DeviceInfo
 
-from .const import DOMAIN, get_entity_name, get_unique_id
+from .const import DOMAIN, get_amp_identifier, get_entity_name, get_unique_id, get_zone_data, get_zones, volume_to_hex
+from .models import async_write_state
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     host = config_entry.data.get("host")
-    channel = config_entry.data.get("channel")
-    manager = hass.data[DOMAIN][config_entry.entry_id]["manager"]
+    entry_data = config_entry.runtime_data
+    manager = entry_data.manager
     amp_label = config_entry.data.get("name", "Matrix Amp")
-    
-    # Get the custom name assigned to this zone
-    zone_custom_name = config_entry.data.get("zone_custom_name", f"Zone {channel}")
 
     device_info = DeviceInfo(
-        identifiers={(DOMAIN, f"v27_{host}_main_amp")},
+        identifiers={(DOMAIN, get_amp_identifier(host))},
         name=amp_label,
         manufacturer="Control4",
         model="Matrix Amplifier",
     )
 
-    entity = C4MaxVolumeNumber(hass, config_entry, manager, host, channel, device_info, zone_custom_name)
-    hass.data[DOMAIN][config_entry.entry_id]["max_volume_entity"] = entity
-    
-    entities = [entity]
-    if config_entry.data.get("enable_eq", False):
+    entities = []
+    for channel, zone in get_zones(config_entry.data).items():
+        zone_entities = _build_zone_entities(hass, config_entry, manager, host, channel, zone, device_info)
+        entry_data.number_entities[channel] = zone_entities
+        entities.extend(zone_entities)
+    async_add_entities(entities)
+
+
+def _build_zone_entities(hass, config_entry, manager, host, channel, zone, device_info):
+    """Create the number entities of one zone; the max volume entity always comes first."""
+    # Get the custom name assigned to this zone
+    zone_custom_name = zone.get("zone_custom_name", f"Zone {channel}")
+
+    entities = [C4MaxVolumeNumber(hass, config_entry, manager, host, channel, device_info, zone_custom_name)]
+    if zone.get("enable_eq", False):
         entities.extend([
             C4EQNumber(
                 hass, config_entry, manager, host, channel, device_info, zone_custom_name,
@@ -77,8 +86,8 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             entity_id = ent_reg.async_get_entity_id("number", DOMAIN, uid)
             if entity_id:
                 ent_reg.async_remove(entity_id)
-                
-    async_add_entities(entities)
+
+    return entities
 
 
 def int_to_signed_hex(val: int) -> str:
@@ -118,7 +127,10 @@ class C4NumberEntity(RestoreNumber):
         self._config_key = config_key
         self._default_val = default_val
         self._cmd_prefix = cmd_prefix
+        # Only a value restored from the last run is pushed to the amp; defaults never are
+        self._restored = False
         
+        self._name_suffix = name_suffix
         self._attr_name = get_entity_name(zone_custom_name, name_suffix)
         self._attr_unique_id = get_unique_id(host, channel, unique_id_suffix)
         self._attr_device_info = device_info
@@ -128,29 +140,84 @@ class C4NumberEntity(RestoreNumber):
         self._attr_native_step = step
         
         # Set initial default value
-        self._attr_native_value = default_val
+        self._set_native_value(default_val)
+
+    @property
+    def available(self) -> bool:
+        return self._manager.available
+
+    @callback
+    def async_apply_entry_data(self):
+        """Refresh the display name from the config entry after an options change."""
+        zone_custom_name = get_zone_data(self._config_entry.data, self._channel).get(
+            "zone_custom_name", f"Zone {self._channel}"
+        )
+        self._attr_name = get_entity_name(zone_custom_name, self._name_suffix)
+        async_write_state(self)
 
     async def async_added_to_hass(self):
         """Restore native value on startup."""
         await super().async_added_to_hass()
-        
+        self.async_on_remove(self._manager.async_add_listener(self.async_write_ha_state))
+
         # Restore the state using Home Assistant's built-in RestoreNumber helper
         last_number_data = await self.async_get_last_number_data()
         if last_number_data and last_number_data.native_value is not None:
-            self._attr_native_value = float(last_number_data.native_value)
+            self._set_native_value(float(last_number_data.native_value))
+            self._restored = True
             
-            # For Max Volume, we do NOT sync to hardware on startup to prevent audible volume jumps
-            # if the physical amplifier is actively playing in the background.
-            # It will be safely synced to the physical hardware on the next zone turn on/off or slider move.
-            if self._config_key != "max_volume":
-                await self._async_send_value_command(self._attr_native_value)
+            # Nothing is sent here: the amp's reconciliation pass sends only registers that differ.
+            # Max Volume is never synced on startup to prevent audible volume jumps if the physical
+            # amplifier is actively playing in the background.
 
-    async def async_set_native_value(self, value: float):
+    @callback
+    def async_reconcile_commands(self) -> list[str]:
+        """Command restoring this register on the amp, unless its shadow already holds the value.
+
+        Nothing is sent without a restored value, so a fresh setup keeps the EQ already set on the amp.
+        """
+        if not self._cmd_prefix or not self._restored or self._attr_native_value is None:
+            return []
+        zone_hex = f"{int(self._channel):02x}"
+        value_hex = int_to_signed_hex(self._attr_native_value)
+        if self._manager.registers.get(f"{self._cmd_prefix} {zone_hex}") == value_hex:
+            return []
+        return [f"{self._cmd_prefix} {zone_hex} {value_hex}"]
+
+    @callback
+    def preset_snapshot(self) -> float | None:
+        """Current value, as saved in a preset."""
+        return self._attr_native_value
+
+    @callback
+    def async_preset_commands(self, value: float) -> list[str]:
+        """Command setting this register to a preset value, unless it already holds it."""
+        if not self._cmd_prefix:
+            return []
+        zone_hex = f"{int(self._channel):02x}"
+        value_hex = int_to_signed_hex(value)
+        current = self._manager.registers.get(
+            f"{self._cmd_prefix} {zone_hex}",
+            int_to_signed_hex(self._attr_native_value) if self._attr_native_value is not None else None,
+        )
+        return [] if current == value_hex else [f"{self._cmd_prefix} {zone_hex} {value_hex}"]
+
+    @callback
+    def async_apply_preset(self, value: float):
+        """Reflect a preset value (already acknowledged by the amp) in this entity's state."""
+        self._set_native_value(float(value))
+        async_write_state(self)
+
+    def _set_native_value(self, value: float | None):
+        """Store the entity's value; subclasses backed by shared zone state override this."""
         self._attr_native_value = value
+
+    async def async_set_native_value(self, value: float):
+        self._set_native_value(value)
         
         # Dispatch command
         await self._async_send_value_command(value)
-        self.async_write_ha_state()
+        async_write_state(self)
 
     async def _async_send_value_command(self, value: float):
         """Send specific amplifier command for the value."""
@@ -163,6 +230,8 @@ class C4NumberEntity(RestoreNumber):
 class C4MaxVolumeNumber(C4NumberEntity):
     """Entity representing the maximum volume limit of a zone."""
     def __init__(self, hass, config_entry, manager, host, channel, device_info, zone_custom_name):
+        # The limit lives in the zone state, where the media player and services read it directly
+        self._zone = manager.zone(channel)
         super().__init__(
             hass, config_entry, manager, host, channel, device_info, zone_custom_name,
             name_suffix="Max Volume",
@@ -173,20 +242,27 @@ class C4MaxVolumeNumber(C4NumberEntity):
             max_value=100,
         )
 
+    @property
+    def native_value(self) -> float:
+        return self._zone.max_volume
+
+    def _set_native_value(self, value: float | None):
+        if value is not None:
+            self._zone.max_volume = float(value)
+
     async def _async_send_value_command(self, value: float):
         # Software-only volume capping: cap the active play volume in HA and
         # send a chvol command if it exceeds the new maximum. No hardware
         # chvolmax command is ever sent to avoid amplifier register corruption
         # that causes audible volume blasts.
-        media_player = self.hass.data[DOMAIN][self._config_entry.entry_id].get("media_player")
-        if media_player:
-            current_volume = media_player.volume_level  # float 0.0 to 1.0
-            max_volume_float = value / 100.0
-            if current_volume > max_volume_float:
-                current_volume = max_volume_float
-                media_player._volume = current_volume
-                media_player.async_write_ha_state()
-                await media_player._amp.async_set_volume(current_volume)
+        max_volume_float = value / 100.0
+        if self._zone.volume > max_volume_float:
+            self._zone.volume = max_volume_float
+            media_player = self._config_entry.runtime_data.media_players.get(self._channel)
+            if media_player:
+                async_write_state(media_player)
+            zone_hex = f"{int(self._channel):02x}"
+            await self._manager.async_send_command(f"c4.amp.chvol {zone_hex} {volume_to_hex(max_volume_float)}")
 
 
 class C4EQNumber(C4NumberEntity):
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, PRESET_STORE_KEY, PRESET_STORE_VERSION
+from .manager import is_ack
+from .models import Control4ConfigEntry, async_loaded_entries, coalesced_state_writes
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key of the preset store and the presets (name -> zone unique ID -> snapshot), None until loaded
+DATA_PRESETS = f"{DOMAIN}_presets"
+
+
+@callback
+def async_setup_presets(hass: HomeAssistant) -> None:
+    """Register the preset services; the saved presets are loaded on first use, off the bootstrap path."""
+    store = Store(hass, PRESET_STORE_VERSION, PRESET_STORE_KEY)
+    hass.data[DATA_PRESETS] = {"store": store, "presets": None, "lock": asyncio.Lock()}
+
+    async def handle_save_preset(call: ServiceCall) -> ServiceResponse:
+        entity_ids = call.data.get("entity_id", [])
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        return await async_save_preset(hass, call.data.get("name"), entity_ids)
+
+    async def handle_apply_preset(call: ServiceCall) -> ServiceResponse:
+        return await async_apply_preset(hass, call.data.get("name"))
+
+    async def handle_delete_preset(call: ServiceCall) -> None:
+        await async_delete_preset(hass, call.data.get("name"))
+
+    hass.services.async_register(
+        DOMAIN, "save_preset", handle_save_preset, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, "apply_preset", handle_apply_preset, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(DOMAIN, "delete_preset", handle_delete_preset)
+
+
+async def _async_presets_data(hass: HomeAssistant) -> dict:
+    """The preset data, loading the store on the first preset service call."""
+    data = hass.data[DATA_PRESETS]
+    if data["presets"] is None:
+        # Concurrent first calls must share one load, or a save could be overwritten by it
+        async with data["lock"]:
+            if data["presets"] is None:
+                data["presets"] = await data["store"].async_load() or {}
+    return data
+
+
+@callback
+def _async_zone_entities(hass: HomeAssistant):
+    """Yield (entry, media player, EQ number entities) for every loaded zone."""
+    for entry in async_loaded_entries(hass):
+        record = entry.runtime_data
+        for channel, media_player in record.media_players.items():
+            numbers = [number for number in record.number_entities.get(channel, []) if number._cmd_prefix]
+            yield entry, media_player, numbers
+
+
+async def async_save_preset(hass: HomeAssistant, name: str, entity_ids: list[str]) -> dict:
+    """Save the power, source, volume and EQ of the zones behind `entity_ids` as preset `name`."""
+    zones = {}
+    for _, media_player, numbers in _async_zone_entities(hass):
+        if media_player.entity_id not in entity_ids:
+            continue
+        snapshot = media_player.preset_snapshot()
+        for number in numbers:
+            snapshot[number._config_key] = number.preset_snapshot()
+        # Keyed by unique ID so the preset survives entity renames
+        zones[media_player.unique_id] = snapshot
+    if not zones:
+        raise ServiceValidationError(f"None of {entity_ids} is a Control4 zone")
+
+    data = await _async_presets_data(hass)
+    data["presets"][name] = {"zones": zones}
+    await data["store"].async_save(data["presets"])
+    _LOGGER.info("Control4: saved preset %s with %d zone(s)", name, len(zones))
+    return {"name": name, "zones": len(zones)}
+
+
+async def async_delete_preset(hass: HomeAssistant, name: str) -> None:
+    """Forget preset `name`."""
+    data = await _async_presets_data(hass)
+    if data["presets"].pop(name, None) is None:
+        raise ServiceValidationError(f"Unknown Control4 preset: {name}")
+    await data["store"].async_save(data["presets"])
+
+
+async def async_apply_preset(hass: HomeAssistant, name: str) -> dict:
+    """Move every zone of preset `name` to its saved state, sending only registers that differ.
+
+    Each amp gets one batch and amps run concurrently, so a preset lands within one batch
+    window per amp. Entity states are published together once every amp has answered.
+    Returns the number of commands, success and latency of every amp.
+    """
+    preset = (await _async_presets_data(hass))["presets"].get(name)
+    if preset is None:
+        raise ServiceValidationError(f"Unknown Control4 preset: {name}")
+
+    targets: dict[str, tuple[Control4ConfigEntry, list]] = {}
+    for entry, media_player, numbers in _async_zone_entities(hass):
+        zone = preset["zones"].get(media_player.unique_id)
+        if zone is None:
+            continue
+        _, amp_targets = targets.setdefault(entry.entry_id, (entry, []))
+        amp_targets.append((media_player, zone))
+        amp_targets.extend(
+            (number, zone[number._config_key])
+            for number in numbers
+            if zone.get(number._config_key) is not None
+        )
+
+    with coalesced_state_writes():
+        results = await asyncio.gather(
+            *(_async_apply_preset_amp(entry, amp_targets) for entry, amp_targets in targets.values())
+        )
+    return {"amps": results}
+
+
+async def _async_apply_preset_amp(entry: Control4ConfigEntry, targets: list) -> dict:
+    manager = entry.runtime_data.manager
+    planned = [(entity, value, entity.async_preset_commands(value)) for entity, value in targets]
+    commands = [command for _, _, entity_commands in planned for command in entity_commands]
+
+    # Same order as turning a zone on: volumes first, then wake from power save (once), then the rest
+    wake = ["c4.amp.psave 00 00"] if "c4.amp.psave 00 00" in commands else []
+    commands = (
+        [command for command in commands if command.startswith("c4.amp.chvol")]
+        + wake
+        + [command for command in commands if not command.startswith(("c4.amp.chvol", "c4.amp.psave"))]
+    )
+    replies = await manager.async_send_batch(commands) if commands else []
+
+    acked = {command for command, (reply, _) in zip(commands, replies, strict=True) if is_ack(reply)}
+    for entity, value, entity_commands in planned:
+        if all(command in acked for command in entity_commands):
+            entity.async_apply_preset(value)
+    return {
+        "entry_id": entry.entry_id,
+        "host": manager.host,
+        "commands": len(commands),
+        "success": all(is_ack(reply) for reply, _ in replies),
+        "latency_ms": round(sum(latency for _, latency in replies), 1),
+    }
@@ -0,0 +1,41 @@
+import logging
+
+from homeassistant.core import HomeAssistant
+
+from .models import Control4ConfigEntry, coalesced_state_writes
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_reconcile_amp(hass: HomeAssistant, entry: Control4ConfigEntry) -> int:
+    """Bring an amplifier in line with its restored entities, sending only registers that differ.
+
+    Each entity compares its restored state with the manager's shadow registers and returns the
+    commands it needs. They go out as one paced batch, volume reductions first so that no other
+    change can make a zone momentarily louder. Returns the number of commands sent.
+    """
+    record = entry.runtime_data
+    entities = [*record.media_players.values()]
+    for zone_entities in record.number_entities.values():
+        entities.extend(zone_entities)
+
+    # Entities adopting hardware state publish it once the whole amp has been compared
+    with coalesced_state_writes():
+        commands = [command for entity in entities for command in entity.async_reconcile_commands()]
+    if not commands:
+        _LOGGER.debug("Control4: %s already matches its restored state", entry.data.get("host"))
+        return 0
+
+    commands.sort(key=lambda command: not command.startswith("c4.amp.chvol"))
+    if not record.manager.available:
+        # Unreachable since the startup probe: the offline queue sends them when the amp answers
+        _LOGGER.info(
+            "Control4: %s is unreachable, queued %d reconcile command(s)", entry.data.get("host"), len(commands)
+        )
+        record.manager.queue(commands)
+        return 0
+    _LOGGER.info(
+        "Control4: reconciling %s with %d command(s) after restart", entry.data.get("host"), len(commands)
+    )
+    await record.manager.async_send_batch(commands)
+    return len(commands)
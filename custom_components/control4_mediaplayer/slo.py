@@ -0,0 +1,87 @@
+"""Per-amplifier latency SLO, surfaced as a Home Assistant repair issue.
+
+Every heartbeat interval the manager's recent exchanges are judged against the entry's
+thresholds (p95 latency and timeout rate). An issue is raised only after SLO_BREACH_CHECKS
+consecutive failing checks, so a single slow burst does not nag, and it is deleted by the first
+check that finds the amp healthy again.
+"""
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+
+from .const import (
+    CONF_SLO_P95_MS,
+    CONF_SLO_TIMEOUT_RATE,
+    DEFAULT_SLO_P95_MS,
+    DEFAULT_SLO_TIMEOUT_RATE,
+    DOMAIN,
+    SLO_BREACH_CHECKS,
+    SLO_MIN_SAMPLES,
+    SLO_WINDOW,
+)
+from .models import Control4ConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_slo_issue_id(entry_id: str) -> str:
+    """Repair issue ID of an amplifier's latency SLO."""
+    return f"amp_slo_{entry_id}"
+
+
+@callback
+def async_check_slo(hass: HomeAssistant, entry: Control4ConfigEntry) -> None:
+    """Judge the amp's recent traffic and raise, refresh or clear its repair issue."""
+    record = entry.runtime_data
+    samples, p95_ms, timeout_rate = record.manager.latency_stats(SLO_WINDOW)
+    if samples < SLO_MIN_SAMPLES:
+        # Too little traffic to tell; keep the current verdict
+        return
+
+    p95_limit = float(entry.data.get(CONF_SLO_P95_MS, DEFAULT_SLO_P95_MS))
+    rate_limit = float(entry.data.get(CONF_SLO_TIMEOUT_RATE, DEFAULT_SLO_TIMEOUT_RATE))
+    breached = (p95_ms is not None and p95_ms > p95_limit) or timeout_rate * 100 > rate_limit
+    name = entry.data.get("name", "Matrix Amp")
+
+    if not breached:
+        record.slo_breaches = 0
+        if record.slo_issue:
+            record.slo_issue = False
+            ir.async_delete_issue(hass, DOMAIN, get_slo_issue_id(entry.entry_id))
+            _LOGGER.info("Control4: %s is back within its latency targets", name)
+        return
+
+    record.slo_breaches += 1
+    if record.slo_breaches < SLO_BREACH_CHECKS:
+        return
+
+    # Created again on every failing check so the issue shows the latest figures
+    ir.async_create_issue(
+        hass,
+        DOMAIN,
+        get_slo_issue_id(entry.entry_id),
+        is_fixable=False,
+        severity=ir.IssueSeverity.WARNING,
+        translation_key="amp_slo",
+        translation_placeholders={
+            "name": name,
+            "host": str(entry.data.get("host")),
+            "p95_ms": "-" if p95_ms is None else f"{p95_ms:.0f}",
+            "p95_limit": f"{p95_limit:.0f}",
+            "timeout_rate": f"{timeout_rate * 100:.0f}",
+            "timeout_limit": f"{rate_limit:.0f}",
+        },
+    )
+    if not record.slo_issue:
+        record.slo_issue = True
+        _LOGGER.warning(
+            "Control4: %s (%s) is missing its latency targets: p95 %s ms, %.0f%% of commands unanswered",
+            name, entry.data.get("host"), "-" if p95_ms is None else f"{p95_ms:.0f}", timeout_rate * 100,
+        )
+
+
+@callback
+def async_delete_slo_issue(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop the amp's repair issue (on unload or removal, when nobody is left to clear it)."""
+    ir.async_delete_issue(hass, DOMAIN, get_slo_issue_id(entry_id))
@@ -0,0 +1,82 @@
+"""One reachability probe of every configured amplifier when the integration starts.
+
+Without it each amp learns it is unreachable only when its first real commands time out, one
+after another. The probe goes out from `async_setup`, before the entries are set up, to all amps at
+once over a single socket, so the whole fleet is known within one timeout window. Each entry then
+seeds its manager from the shared result during its own setup.
+"""
+import asyncio
+import logging
+import socket
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DEFAULT_PORT, DEFAULT_UDP_TIMEOUT, DOMAIN
+from .discovery import async_probe_hosts
+from .manager import Control4Manager
+from .models import Control4ConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key of the running probe and the entries (entry ID -> (host, port)) still to be seeded
+DATA_STARTUP_PROBE = f"{DOMAIN}_startup_probe"
+
+
+@callback
+def async_start_startup_probe(hass: HomeAssistant) -> None:
+    """Probe every enabled amplifier entry concurrently, in the background."""
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.disabled_by is None and entry.data.get("host")
+    ]
+    if not entries:
+        return
+    targets = {entry.entry_id: (entry.data["host"], entry.data.get("port", DEFAULT_PORT)) for entry in entries}
+    # One window long enough for the most patient amp
+    timeout = max(float(entry.data.get("udp_timeout", DEFAULT_UDP_TIMEOUT)) for entry in entries)
+    hass.data[DATA_STARTUP_PROBE] = {
+        "task": hass.async_create_task(_async_probe(list(set(targets.values())), timeout)),
+        "entries": targets,
+    }
+
+
+async def _async_probe(targets: list[tuple[str, int]], timeout: float) -> dict[tuple[str, int], float]:
+    """Resolve and probe the (host, port) targets. Returns the RTT in ms of every answering target."""
+    loop = asyncio.get_running_loop()
+
+    async def _resolve(host: str, port: int) -> tuple[str, int] | None:
+        try:
+            infos = await loop.getaddrinfo(host, port, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        except OSError as err:
+            _LOGGER.debug("Control4: could not resolve %s for the startup probe: %s", host, err)
+            return None
+        return infos[0][4][:2]
+
+    resolved = await asyncio.gather(*(_resolve(host, port) for host, port in targets))
+    # Replies come from addresses, so map them back to the configured (possibly hostname) targets
+    addresses = {address: target for target, address in zip(targets, resolved, strict=True) if address is not None}
+    found = await async_probe_hosts(addresses, timeout=timeout)
+    _LOGGER.info("Control4: startup probe reached %d of %d amplifier(s)", len(found), len(targets))
+    return {addresses[address]: rtt for address, rtt in found.items()}
+
+
+async def async_seed_from_startup_probe(
+    hass: HomeAssistant, entry: Control4ConfigEntry, manager: Control4Manager
+) -> None:
+    """Seed `manager` with the startup probe's verdict on its amp, waiting for the probe if needed.
+
+    Entries set up later (added, enabled or reloaded after startup) were not probed and are left
+    to learn from their own traffic.
+    """
+    probe = hass.data.get(DATA_STARTUP_PROBE)
+    if probe is None or (target := probe["entries"].pop(entry.entry_id, None)) is None:
+        return
+    if not probe["entries"]:
+        hass.data.pop(DATA_STARTUP_PROBE, None)
+    try:
+        results = await probe["task"]
+    except OSError as err:
+        _LOGGER.debug("Control4: startup probe failed: %s", err)
+        return
+    manager.seed_reachability(results.get(target))
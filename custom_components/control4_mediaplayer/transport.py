@@ -0,0 +1,225 @@
+"""Pluggable command transports used by `Control4Manager`.
+
+A transport performs one request/reply exchange: it sends `<counter> <command>` and returns the
+amplifier's reply (`0r2aNN <payload>`) or None when nothing matching arrived within the timeout.
+`UDPTransport` talks to the hardware; `RecordingTransport` wraps any transport and captures every
+exchange with its timing; `ReplayTransport` answers from such a capture, so benchmarks and
+regression tests can run against real-world traffic shapes without an amplifier.
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import socket
+import time
+from collections import deque
+from typing import Protocol
+
+from .const import ADDRESS_TTL, RESOLVE_AFTER_FAILURES
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_VERSION = 1
+
+
+class Transport(Protocol):
+    async def async_request(self, counter: str, command: str, timeout: float) -> str | None:
+        """Send `command` framed with `counter` and return the matching reply, or None on timeout."""
+
+    def close(self) -> None:
+        """Release any socket held by the transport."""
+
+
+def reply_prefix(counter: str) -> str:
+    """Prefix of the amplifier's reply to a request sent with `counter` (0s2aNN -> 0r2aNN)."""
+    return counter.replace("s", "r", 1)
+
+
+class UDPTransport:
+    """A connected UDP socket to the amplifier, used from the executor one exchange at a time.
+
+    A hostname is resolved once and its address cached for ADDRESS_TTL seconds, or until
+    RESOLVE_AFTER_FAILURES consecutive exchanges went unanswered, so commands to a hostname cost
+    the same as to an IP. Connecting the socket makes the kernel drop datagrams from other sources.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._sock: socket.socket | None = None
+        self._family = socket.AF_INET
+        self._address: tuple | None = None
+        self._resolved_at = 0.0
+        self._failures = 0
+        try:
+            ipaddress.ip_address(host)
+            self._literal = True
+        except ValueError:
+            self._literal = False
+
+    def _connected_socket(self) -> socket.socket:
+        """Return the socket connected to the current address, resolving the host if due (executor only)."""
+        now = time.monotonic()
+        if self._address is None or (
+            not self._literal
+            and (now - self._resolved_at > ADDRESS_TTL or self._failures >= RESOLVE_AFTER_FAILURES)
+        ):
+            try:
+                family, _, _, _, address = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_DGRAM)[0]
+            except OSError as err:
+                if self._address is None:
+                    raise
+                # Keep the last known address rather than going deaf while DNS is down
+                _LOGGER.debug("Control4: resolving %s failed (%s), keeping %s", self.host, err, self._address[0])
+            else:
+                if self._address is not None and address != self._address:
+                    _LOGGER.info("Control4: %s now resolves to %s", self.host, address[0])
+                    self.close()
+                self._family, self._address = family, address
+            self._resolved_at = now
+            self._failures = 0
+
+        if self._sock is None:
+            sock = socket.socket(self._family, socket.SOCK_DGRAM)
+            sock.connect(self._address)
+            self._sock = sock
+        return self._sock
+
+    @staticmethod
+    def _drain(sock: socket.socket) -> None:
+        """Discard late replies to earlier (timed out) exchanges still waiting in the socket."""
+        sock.setblocking(False)
+        try:
+            while True:
+                sock.recv(1024)
+        except OSError:
+            pass
+
+    async def async_request(self, counter: str, command: str, timeout: float) -> str | None:
+        payload = f"{counter} {command} \r\n"
+        expected_prefix = reply_prefix(counter)
+
+        def _send_and_wait():
+            try:
+                sock = self._connected_socket()
+                self._drain(sock)
+                sock.settimeout(timeout)
+                sock.send(payload.encode('utf-8'))
+                while True:
+                    received = sock.recv(1024).decode('utf-8').strip()
+                    # Ensure we are capturing the response to our specific command
+                    if received.startswith(expected_prefix):
+                        self._failures = 0
+                        return received
+            except (TimeoutError, ConnectionRefusedError):
+                # Timeout is an expected fallback condition for the amp if it doesn't ack;
+                # on a connected socket an ICMP port unreachable surfaces as a refused connection
+                self._failures += 1
+                return None
+            except Exception as e:
+                _LOGGER.error("Error sending UDP to %s:%s - %s", self.host, self.port, e)
+                self._failures += 1
+                self.close()
+                return None
+
+        return await asyncio.get_running_loop().run_in_executor(None, _send_and_wait)
+
+    def close(self) -> None:
+        """Close the socket; the next exchange opens a new one."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class RecordingTransport:
+    """Wraps another transport and records every exchange: send offset, command, reply and latency."""
+
+    def __init__(self, inner: Transport, host: str | None = None):
+        self.inner = inner
+        self.host = host
+        self.exchanges: list[dict] = []
+        self._started = time.monotonic()
+
+    async def async_request(self, counter: str, command: str, timeout: float) -> str | None:
+        sent = time.monotonic()
+        reply = await self.inner.async_request(counter, command, timeout)
+        self.exchanges.append(
+            {
+                "at_ms": round((sent - self._started) * 1000, 1),
+                "command": command,
+                # Stored without the sequencer prefix; None means the amp did not answer
+                "reply": reply.partition(" ")[2].strip() if reply is not None else None,
+                "latency_ms": round((time.monotonic() - sent) * 1000, 1),
+            }
+        )
+        return reply
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def capture(self) -> dict:
+        """The recording as a JSON-serializable capture."""
+        return {"version": CAPTURE_VERSION, "host": self.host, "exchanges": list(self.exchanges)}
+
+
+class ReplayTransport:
+    """Answers from a capture with the recorded replies and latencies.
+
+    Each command replays its recorded exchanges in order, repeating the last one once they are
+    used up. Commands that never appear in the capture go unanswered after the timeout.
+    """
+
+    def __init__(self, capture: dict):
+        if capture.get("version") != CAPTURE_VERSION:
+            raise ValueError(f"Unsupported capture version: {capture.get('version')}")
+        self._exchanges: dict[str, deque[dict]] = {}
+        for exchange in capture["exchanges"]:
+            self._exchanges.setdefault(exchange["command"], deque()).append(exchange)
+        self.misses = 0
+
+    async def async_request(self, counter: str, command: str, timeout: float) -> str | None:
+        recorded = self._exchanges.get(command)
+        if not recorded:
+            self.misses += 1
+            await asyncio.sleep(timeout)
+            return None
+        exchange = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        await asyncio.sleep(exchange["latency_ms"] / 1000)
+        if exchange["reply"] is None:
+            return None
+        return f"{reply_prefix(counter)} {exchange['reply']}"
+
+    def close(self) -> None:
+        pass
+
+
+async def async_replay_traffic(manager, capture: dict) -> list[tuple[str | None, float]]:
+    """Issue the captured commands through `manager` at their original send offsets.
+
+    Each command goes through `async_send_command` like a live caller, so overlapping identical
+    commands share one exchange. Returns (reply, latency_ms) per command in capture order, the
+    latency as the caller saw it, lock wait included. Combined with a `ReplayTransport` this
+    reproduces a production traffic shape, including overlapping callers, deterministically.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def _issue(exchange: dict) -> tuple[str | None, float]:
+        await asyncio.sleep(max(0.0, started + exchange["at_ms"] / 1000 - loop.time()))
+        issued = loop.time()
+        reply = await manager.async_send_command(exchange["command"])
+        return reply, round((loop.time() - issued) * 1000, 1)
+
+    return await asyncio.gather(*(_issue(exchange) for exchange in capture["exchanges"]))
+
+
+def load_capture(path: str) -> dict:
+    """Read a capture file (blocking)."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_capture(path: str, capture: dict) -> None:
+    """Write a capture file (blocking)."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(capture, file, indent=1)
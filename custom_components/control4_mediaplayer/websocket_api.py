@@ -0,0 +1,216 @@
+import logging
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.dispatcher import async_dispatcher_connect, async_dispatcher_send
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DOMAIN, PREFIX, get_zones
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key of the cached amps -> zones -> entity IDs map served to the Lovelace card
+DATA_ZONE_MAP = f"{DOMAIN}_zone_map"
+# Dispatched whenever the zone map is invalidated so live subscriptions can re-track their entities
+SIGNAL_ZONE_MAP_UPDATED = f"{DOMAIN}_zone_map_updated"
+# Registry updates arrive in bursts while entries set up; re-track subscriptions once per burst
+RETRACK_COOLDOWN = 0.5
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands used by the companion card."""
+    websocket_api.async_register_command(hass, ws_zones)
+    websocket_api.async_register_command(hass, ws_subscribe_zones)
+
+    @callback
+    def _async_registry_updated(_event: Event) -> None:
+        async_invalidate_zone_map(hass)
+
+    hass.bus.async_listen(
+        er.EVENT_ENTITY_REGISTRY_UPDATED,
+        _async_registry_updated,
+        event_filter=lambda event_data: _async_is_own_entity(hass, event_data),
+    )
+
+
+@callback
+def _async_is_own_entity(hass: HomeAssistant, event_data: dict) -> bool:
+    """True when a registry update concerns one of this integration's entities.
+
+    Other integrations' entities never appear in the zone map, so their changes must not
+    invalidate it (and resnapshot every subscribed card).
+    """
+    if event_data["action"] == "remove":
+        # Already gone from the registry: it only matters if the cached map lists it
+        zone_map = hass.data.get(DATA_ZONE_MAP)
+        return zone_map is not None and event_data["entity_id"] in _zone_map_entity_ids(zone_map)
+    entity = er.async_get(hass).async_get(event_data["entity_id"])
+    return entity is not None and entity.platform == DOMAIN
+
+
+def _zone_map_entity_ids(zone_map: dict) -> set[str]:
+    return {
+        entity_id
+        for amp in zone_map["amps"]
+        for zone in amp["zones"]
+        for entity_id in (zone["media_player"], *zone["entities"].values())
+    }
+
+
+@callback
+def async_invalidate_zone_map(hass: HomeAssistant) -> None:
+    """Drop the cached zone map; it is rebuilt on the next request."""
+    hass.data.pop(DATA_ZONE_MAP, None)
+    async_dispatcher_send(hass, SIGNAL_ZONE_MAP_UPDATED)
+
+
+@callback
+def async_get_zone_map(hass: HomeAssistant) -> dict:
+    """Return the compact amps -> zones -> entity IDs map, building it once per registry change."""
+    if (zone_map := hass.data.get(DATA_ZONE_MAP)) is None:
+        zone_map = hass.data[DATA_ZONE_MAP] = _async_build_zone_map(hass)
+    return zone_map
+
+
+@callback
+def _async_build_zone_map(hass: HomeAssistant) -> dict:
+    ent_reg = er.async_get(hass)
+    amps = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        host = entry.data.get("host")
+        zones = {
+            channel: {
+                "channel": channel,
+                "name": zone.get("zone_custom_name", f"Zone {channel}"),
+                "media_player": None,
+                "entities": {},
+            }
+            for channel, zone in get_zones(entry.data).items()
+        }
+
+        # Unique IDs are v27_{host}_ch{n} for the media player and v27_{host}_ch{n}_{suffix} for numbers
+        uid_prefix = f"{PREFIX}_{host}_ch"
+        for reg_entry in er.async_entries_for_config_entry(ent_reg, entry.entry_id):
+            if reg_entry.disabled_by or not str(reg_entry.unique_id).startswith(uid_prefix):
+                continue
+            channel_str, _, suffix = reg_entry.unique_id[len(uid_prefix):].partition("_")
+            zone = zones.get(int(channel_str)) if channel_str.isdigit() else None
+            if zone is None:
+                continue
+            if suffix:
+                zone["entities"][suffix] = reg_entry.entity_id
+            else:
+                zone["media_player"] = reg_entry.entity_id
+
+        amps.append(
+            {
+                "entry_id": entry.entry_id,
+                "name": entry.data.get("name", "Matrix Amp"),
+                "host": host,
+                "zones": [zone for _, zone in sorted(zones.items()) if zone["media_player"]],
+            }
+        )
+    return {"amps": amps}
+
+
+@websocket_api.websocket_command({vol.Required("type"): f"{DOMAIN}/zones"})
+@callback
+def ws_zones(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Return this integration's amps, zones and related entity IDs."""
+    connection.send_result(msg["id"], async_get_zone_map(hass))
+
+
+def _numeric(state) -> float | None:
+    if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return None
+    try:
+        return float(state.state)
+    except ValueError:
+        return None
+
+
+@callback
+def _async_zone_state(hass: HomeAssistant, zone: dict) -> dict:
+    """Compact state of one zone: power, volume %, source, mute, availability and EQ/limit values."""
+    state = hass.states.get(zone["media_player"])
+    attributes = state.attributes if state is not None else {}
+    volume = attributes.get("volume_level")
+    compact = {
+        "state": state.state if state is not None else None,
+        "available": state is not None and state.state != STATE_UNAVAILABLE,
+        "volume": round(volume * 100) if volume is not None else None,
+        "source": attributes.get("source"),
+        "muted": attributes.get("is_volume_muted"),
+    }
+    for key, entity_id in zone["entities"].items():
+        compact[key] = _numeric(hass.states.get(entity_id))
+    return compact
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_zones",
+        vol.Optional("entry_id"): str,
+    }
+)
+@callback
+def ws_subscribe_zones(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Push compact per-zone state for this integration's amps, then only what changes.
+
+    The first event carries every zone with "full": true; later events carry only the changed
+    fields of the changed zones. A new full snapshot follows whenever zones or entities change.
+    """
+    entry_id = msg.get("entry_id")
+    zones_by_entity: dict[str, dict] = {}
+    sent: dict[str, dict] = {}
+    unsub_state = None
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        zone = zones_by_entity.get(event.data["entity_id"])
+        if zone is None:
+            return
+        current = _async_zone_state(hass, zone)
+        previous = sent.get(zone["media_player"], {})
+        delta = {key: value for key, value in current.items() if key not in previous or previous[key] != value}
+        if not delta:
+            return
+        sent[zone["media_player"]] = current
+        connection.send_message(websocket_api.event_message(msg["id"], {"zones": {zone["media_player"]: delta}}))
+
+    @callback
+    def _async_track() -> None:
+        nonlocal unsub_state
+        if unsub_state is not None:
+            unsub_state()
+        zones_by_entity.clear()
+        sent.clear()
+        for amp in async_get_zone_map(hass)["amps"]:
+            if entry_id is not None and amp["entry_id"] != entry_id:
+                continue
+            for zone in amp["zones"]:
+                sent[zone["media_player"]] = _async_zone_state(hass, zone)
+                zones_by_entity[zone["media_player"]] = zone
+                for entity_id in zone["entities"].values():
+                    zones_by_entity[entity_id] = zone
+        unsub_state = async_track_state_change_event(hass, list(zones_by_entity), _async_state_changed)
+        connection.send_message(websocket_api.event_message(msg["id"], {"full": True, "zones": dict(sent)}))
+
+    retrack = Debouncer(hass, _LOGGER, cooldown=RETRACK_COOLDOWN, immediate=False, function=_async_track)
+    unsub_dispatcher = async_dispatcher_connect(hass, SIGNAL_ZONE_MAP_UPDATED, retrack.async_schedule_call)
+
+    @callback
+    def _async_unsubscribe() -> None:
+        unsub_dispatcher()
+        retrack.async_cancel()
+        if unsub_state is not None:
+            unsub_state()
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    _async_track()
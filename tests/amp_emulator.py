@@ -0,0 +1,43 @@
+"""Minimal UDP emulator of a Control4 Matrix Amp for tests and benchmarks."""
+import asyncio
+
+
+class AmpEmulator(asyncio.DatagramProtocol):
+    """Answers `0s2aXX <command>` datagrams with `0r2aXX 000`, like the real amplifier."""
+
+    def __init__(self, reply_delay: float = 0.0, unsupported=()):
+        self.reply_delay = reply_delay
+        self.unsupported = tuple(unsupported)
+        self.silent = False
+        self.commands: list[str] = []
+        self.transport = None
+
+    @classmethod
+    async def start(cls, host: str = "127.0.0.1", **kwargs) -> "AmpEmulator":
+        """Start an emulator on an ephemeral localhost port."""
+        loop = asyncio.get_running_loop()
+        _, protocol = await loop.create_datagram_endpoint(lambda: cls(**kwargs), local_addr=(host, 0))
+        return protocol
+
+    @property
+    def port(self) -> int:
+        return self.transport.get_extra_info("sockname")[1]
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        counter, _, command = data.decode("utf-8").strip().partition(" ")
+        command = command.strip()
+        self.commands.append(command)
+        if self.silent:
+            return
+        status = "n01" if command.startswith(self.unsupported) else "000"
+        reply = f"{counter.replace('s', 'r', 1)} {status}\r\n".encode()
+        if self.reply_delay:
+            asyncio.get_running_loop().call_later(self.reply_delay, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,213 @@
+"""End-to-end scale benchmark: several amplifiers x 8 zones against local emulated amps.
+
+Each amp is a config entry set up through the integration's own `async_setup_entry` and
+platform setup, talking UDP to an `AmpEmulator`. Measured:
+
+* cold start: setup time and commands sent when no shadow registers are stored yet
+* party mode: time until every zone of every amp is routed
+* warm restart: unload, then setup again from the saved registers and restored states
+* memory: Python heap allocated per zone while setting up (tracemalloc)
+
+Run it directly to write a JSON report:
+
+    python -m tests.benchmark_scale --amps 5 --zones 8 --report scale_report.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import time
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Installs the Home Assistant mocks when HA is absent, so it has to come before any HA import
+import tests.test_volume_capping  # noqa: F401
+
+# isort: split
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components import control4_mediaplayer as integration
+from custom_components.control4_mediaplayer import media_player, number
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import DummyState
+
+SOURCES = "Input 1\nInput 2\nInput 3\nInput 4"
+
+
+class MemoryStore:
+    """In-memory stand-in for `Store`, shared across restarts through `data`."""
+
+    data: dict = {}
+
+    def __init__(self, hass, version, key):
+        self.key = key
+
+    async def async_load(self):
+        return self.data.get(self.key)
+
+    async def async_save(self, data):
+        self.data[self.key] = data
+
+    def async_delay_save(self, data_func, delay=0):
+        self.data[self.key] = data_func()
+
+    async def async_remove(self):
+        self.data.pop(self.key, None)
+
+
+class ScaleBench:
+    """A fake Home Assistant core running the integration against emulated amps."""
+
+    def __init__(self, amps: list[AmpEmulator], zones: int, udp_timeout: float):
+        self.amps = amps
+        self.entries = []
+        for index, amp in enumerate(amps):
+            entry = MagicMock()
+            entry.entry_id = f"bench_amp_{index}"
+            entry.data = {
+                "host": "127.0.0.1",
+                "port": amp.port,
+                "name": f"Amp {index + 1}",
+                "udp_timeout": udp_timeout,
+                "zones": {
+                    str(channel): {"zone_custom_name": f"Zone {channel}", "source_list": SOURCES, "enable_eq": True}
+                    for channel in range(1, zones + 1)
+                },
+            }
+            self.entries.append(entry)
+        self.last_states: dict[str, object] = {}
+        self.entities = []
+        self.tasks = []
+        self.hass = MagicMock()
+        self.hass.data = {}
+        self.hass.services.has_service.return_value = True
+        self.hass.config_entries.async_entries.return_value = self.entries
+        self.hass.config_entries.async_forward_entry_setups = self._async_forward_entry_setups
+        self.hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+        self.hass.async_create_task = lambda coro: self.tasks.append(asyncio.ensure_future(coro))
+
+    async def _async_forward_entry_setups(self, entry, platforms):
+        added = []
+        await media_player.async_setup_entry(self.hass, entry, lambda entities, **kwargs: added.extend(entities))
+        await number.async_setup_entry(self.hass, entry, lambda entities, **kwargs: added.extend(entities))
+        for entity in added:
+            entity.hass = self.hass
+            # No state machine behind the fake core
+            entity.async_write_ha_state = MagicMock()
+            last = self.last_states.get(entity.unique_id)
+            if isinstance(entity, media_player.C4MediaPlayer):
+                entity.entity_id = f"media_player.{entity.unique_id}"
+                entity.async_get_last_state = AsyncMock(return_value=last)
+            else:
+                entity.async_get_last_number_data = AsyncMock(return_value=last)
+            await entity.async_added_to_hass()
+        self.entities.extend(added)
+
+    def commands_sent(self) -> int:
+        return sum(len(amp.commands) for amp in self.amps)
+
+    async def async_start(self) -> dict:
+        """Set up every entry concurrently, as Home Assistant does, and wait for reconciliation."""
+        sent_before = self.commands_sent()
+        started = time.perf_counter()
+        await asyncio.gather(*(self._async_setup_entry(entry) for entry in self.entries))
+        await asyncio.gather(*self.tasks)
+        self.tasks.clear()
+        return {
+            "setup_ms": round((time.perf_counter() - started) * 1000, 1),
+            "commands": self.commands_sent() - sent_before,
+        }
+
+    async def _async_setup_entry(self, entry) -> None:
+        if await integration.async_setup_entry(self.hass, entry):
+            entry.state = ConfigEntryState.LOADED
+
+    async def async_stop(self) -> None:
+        """Unload every entry, remembering entity states the way the restore cache would."""
+        for entity in self.entities:
+            if isinstance(entity, media_player.C4MediaPlayer):
+                self.last_states[entity.unique_id] = DummyState(
+                    entity.state, volume_level=entity.volume_level, source=entity.source,
+                    is_volume_muted=entity.is_volume_muted,
+                )
+            else:
+                self.last_states[entity.unique_id] = MagicMock(native_value=entity.native_value)
+        self.entities.clear()
+        for entry in self.entries:
+            await integration.async_unload_entry(self.hass, entry)
+            entry.state = ConfigEntryState.NOT_LOADED
+
+
+async def async_run_benchmark(amps: int = 3, zones: int = 8, reply_delay: float = 0.002) -> dict:
+    """Run the full scenario and return the report."""
+    emulators = [await AmpEmulator.start(reply_delay=reply_delay) for _ in range(amps)]
+    MemoryStore.data = {}
+    try:
+        # The fake core has no registries: setup finds nothing left over from older layouts to clean up
+        with (
+            patch.object(integration, "Store", MemoryStore),
+            patch.object(integration.er, "async_get", return_value=MagicMock(entities={})),
+            patch.object(integration.dr, "async_get", return_value=MagicMock(devices={})),
+        ):
+            bench = ScaleBench(emulators, zones, udp_timeout=0.5)
+
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            cold_start = await bench.async_start()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            started = time.perf_counter()
+            party = await integration.async_party_mode(bench.hass, "Input 2", 30)
+            party_ms = (time.perf_counter() - started) * 1000
+
+            await bench.async_stop()
+            warm_restart = await bench.async_start()
+            entity_count = len(bench.entities)
+            await bench.async_stop()
+    finally:
+        for emulator in emulators:
+            emulator.close()
+
+    zone_count = amps * zones
+    return {
+        "amps": amps,
+        "zones_per_amp": zones,
+        "zones": zone_count,
+        "entities": entity_count,
+        "reply_delay_ms": reply_delay * 1000,
+        "cold_start": cold_start,
+        "warm_restart": warm_restart,
+        "party_mode": {
+            "elapsed_ms": round(party_ms, 1),
+            "zones": len(party["zones"]),
+            "succeeded": sum(zone["success"] for zone in party["zones"]),
+            "max_zone_latency_ms": max((zone["latency_ms"] for zone in party["zones"]), default=0),
+        },
+        "memory": {
+            "bytes_per_zone": (current - baseline) // zone_count,
+            "peak_bytes": peak - baseline,
+        },
+        "python": platform.python_version(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--amps", type=int, default=3)
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--reply-delay", type=float, default=0.002, help="emulated amp reply delay in seconds")
+    parser.add_argument("--report", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(async_run_benchmark(args.amps, args.zones, args.reply_delay))
+    text = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,3 +7,9 @@ pytest_plugins = "pytest_homeassistant_custom_component"
 @pytest.fixture(autouse=True)
 def auto_enable_custom_integrations(enable_custom_integrations):
     yield
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_sockets(socket_enabled):
+    """The tests talk UDP to amplifier emulators on localhost."""
+    yield
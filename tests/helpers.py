@@ -0,0 +1,64 @@
+"""Shared builders for tests that drive the integration's entities against an emulated amp."""
+# Installs the Home Assistant mocks when HA is absent, so it has to come before any HA import
+import tests.test_volume_capping  # noqa: F401
+
+# isort: split
+from unittest.mock import MagicMock
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.media_player import C4MediaPlayer
+from custom_components.control4_mediaplayer.models import Control4Data
+from custom_components.control4_mediaplayer.number import C4EQNumber, C4MaxVolumeNumber
+
+
+class DummyState:
+    """Stand-in for a restored `State`."""
+
+    def __init__(self, state, **attributes):
+        self.state = state
+        self.attributes = attributes
+
+
+def make_entry(manager: Control4Manager, zones: dict, entry_id: str = "amp_1", **data) -> MagicMock:
+    """A loaded amplifier entry whose runtime data wraps `manager`."""
+    entry = MagicMock(entry_id=entry_id, state=ConfigEntryState.LOADED)
+    entry.data = {"host": manager.host, "port": manager.port, **data, "zones": zones}
+    entry.runtime_data = Control4Data(manager=manager, register_store=MagicMock(), applied_data={})
+    return entry
+
+
+def _added(entity, entity_id: str):
+    """Give `entity` the ID it would get when added, with its state writes recorded on a mock."""
+    entity.entity_id = entity_id
+    entity.async_write_ha_state = MagicMock()
+    return entity
+
+
+def make_bass(hass, entry, channel: int, host: str | None = None) -> C4EQNumber:
+    """The Bass slider of a zone."""
+    manager = entry.runtime_data.manager
+    bass = C4EQNumber(
+        hass, entry, manager, host or manager.host, channel, MagicMock(), "Zone",
+        name_suffix="Bass", unique_id_suffix="bass", default_val=0.0, config_key="bass",
+        min_value=-12, max_value=12, cmd_prefix="c4.amp.bassgain",
+    )
+    return _added(bass, f"number.{entry.entry_id}_zone_{channel}_bass")
+
+
+def add_zone(hass, entry, channel: int, host: str | None = None, numbers: bool = True) -> C4MediaPlayer:
+    """Create a zone's media player (and Max Volume number) and register them with the entry.
+
+    `host` overrides the address used in unique IDs.
+    """
+    record = entry.runtime_data
+    manager = record.manager
+    host = host or manager.host
+    media_player = C4MediaPlayer(host, manager.port, channel, f"Zone {channel}", entry, manager)
+    media_player.hass = hass
+    record.media_players[channel] = _added(media_player, f"media_player.{entry.entry_id}_zone_{channel}")
+    if numbers:
+        max_volume = C4MaxVolumeNumber(hass, entry, manager, host, channel, MagicMock(), "Zone")
+        record.number_entities[channel] = [_added(max_volume, f"number.{entry.entry_id}_zone_{channel}_max_volume")]
+    return media_player
@@ -0,0 +1,16 @@
+import unittest
+
+from tests.benchmark_scale import async_run_benchmark
+
+
+class TestScaleBenchmark(unittest.IsolatedAsyncioTestCase):
+    async def test_small_house_report(self):
+        report = await async_run_benchmark(amps=2, zones=4, reply_delay=0.0)
+
+        self.assertEqual((report["zones"], report["entities"]), (8, 40))
+        # A cold start has nothing restored, so it leaves the amp's EQ alone and sends nothing. The first
+        # warm restart restores EQ (3 registers per zone) because the amp never acknowledged those values yet
+        self.assertEqual(report["cold_start"]["commands"], 0)
+        self.assertEqual(report["warm_restart"]["commands"], 3 * 8)
+        self.assertEqual(report["party_mode"]["succeeded"], 8)
+        self.assertGreater(report["memory"]["bytes_per_zone"], 0)
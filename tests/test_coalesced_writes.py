@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from custom_components.control4_mediaplayer import async_party_mode
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.models import async_write_state, coalesced_state_writes
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import add_zone, make_entry
+
+
+class TestCoalescedStateWrites(unittest.IsolatedAsyncioTestCase):
+    async def test_one_write_per_entity_when_the_block_ends(self):
+        first, second = MagicMock(), MagicMock()
+        with coalesced_state_writes():
+            async_write_state(first)
+            async_write_state(second)
+            async_write_state(first)
+            with coalesced_state_writes():
+                async_write_state(second)
+            # The nested block leaves flushing to the outer one
+            first.async_write_ha_state.assert_not_called()
+            second.async_write_ha_state.assert_not_called()
+        first.async_write_ha_state.assert_called_once()
+        second.async_write_ha_state.assert_called_once()
+
+        async_write_state(first)
+        self.assertEqual(first.async_write_ha_state.call_count, 2)
+
+    async def test_unrelated_tasks_write_immediately(self):
+        entity = MagicMock()
+        release = asyncio.Event()
+
+        async def _bulk():
+            with coalesced_state_writes():
+                await release.wait()
+
+        bulk = asyncio.ensure_future(_bulk())
+        await asyncio.sleep(0)
+        async_write_state(entity)
+        entity.async_write_ha_state.assert_called_once()
+        release.set()
+        await bulk
+
+
+class TestPartyModeWrites(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amps = [await AmpEmulator.start(reply_delay=0.005) for _ in range(2)]
+        self.hass = MagicMock()
+        self.entries = []
+        for index, amp in enumerate(self.amps):
+            entry = make_entry(
+                Control4Manager("127.0.0.1", amp.port, udp_timeout=0.5),
+                {str(channel): {"source_list": "Apple TV\nSonos"} for channel in (1, 2)},
+                entry_id=f"amp_{index}",
+            )
+            for channel in (1, 2):
+                add_zone(self.hass, entry, channel, numbers=False)
+            self.entries.append(entry)
+        self.hass.config_entries.async_entries.return_value = self.entries
+
+    async def asyncTearDown(self):
+        for amp in self.amps:
+            amp.close()
+
+    async def test_states_are_published_after_every_amp_answered(self):
+        sent_at_write = []
+        media_players = [mp for entry in self.entries for mp in entry.runtime_data.media_players.values()]
+        for media_player in media_players:
+            media_player.async_write_ha_state.side_effect = lambda: sent_at_write.append(
+                sum(len(amp.commands) for amp in self.amps)
+            )
+
+        response = await async_party_mode(self.hass, "Sonos", 40)
+
+        self.assertTrue(all(zone["success"] for zone in response["zones"]))
+        # Each zone is written exactly once, and only once both amps' batches (5 commands each) are done
+        for media_player in media_players:
+            media_player.async_write_ha_state.assert_called_once()
+            self.assertEqual(media_player.state, "on")
+        self.assertEqual(sent_at_write, [10] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import socket
+import time
+import unittest
+
+from custom_components.control4_mediaplayer.discovery import async_probe_hosts, parse_host_range
+from tests.amp_emulator import AmpEmulator
+
+
+def _unused_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestHostRangeParsing(unittest.TestCase):
+    def test_cidr(self):
+        hosts = parse_host_range("192.168.1.0/24")
+        self.assertEqual(len(hosts), 254)
+        self.assertEqual(hosts[0], "192.168.1.1")
+        self.assertEqual(hosts[-1], "192.168.1.254")
+
+    def test_ranges(self):
+        self.assertEqual(parse_host_range("10.0.0.5-10.0.0.7"), ["10.0.0.5", "10.0.0.6", "10.0.0.7"])
+        self.assertEqual(parse_host_range("10.0.0.5-6"), ["10.0.0.5", "10.0.0.6"])
+        self.assertEqual(parse_host_range("10.0.0.9"), ["10.0.0.9"])
+
+    def test_invalid(self):
+        for value in ("not an ip", "10.0.0.9-10.0.0.1", "10.0.0.0/16"):
+            with self.assertRaises(ValueError):
+                parse_host_range(value)
+
+
+class TestProbeHosts(unittest.IsolatedAsyncioTestCase):
+    async def test_probe_finds_emulated_amps_concurrently(self):
+        amps = [await AmpEmulator.start(reply_delay=0.02) for _ in range(3)]
+        # Unsupported commands still answer with n01, which proves the amp is there
+        amps[0].unsupported = ("c4.sy",)
+        try:
+            live = [("127.0.0.1", amp.port) for amp in amps]
+            dead = [("127.0.0.1", _unused_udp_port()) for _ in range(20)]
+
+            started = time.monotonic()
+            found = await async_probe_hosts(live + dead, timeout=0.3, concurrency=32)
+            elapsed = time.monotonic() - started
+
+            self.assertEqual(set(found), set(live))
+            for rtt in found.values():
+                self.assertGreaterEqual(rtt, 15)
+            # All probes run in a single timeout window rather than one after another
+            self.assertLess(elapsed, 1.0)
+        finally:
+            for amp in amps:
+                amp.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.control4_mediaplayer import frontend
+
+
+class TestDeferredFrontendRegistration(unittest.IsolatedAsyncioTestCase):
+    def _hass(self, items=()):
+        hass = MagicMock()
+        hass.data = {}
+        hass.http.async_register_static_paths = AsyncMock()
+        resources = MagicMock(loaded=False, async_load=AsyncMock(), async_create_item=AsyncMock())
+        resources.async_update_item = AsyncMock()
+        resources.async_items.return_value = list(items)
+        hass.data["lovelace"] = MagicMock(resource_mode="storage", resources=resources)
+        return hass, resources
+
+    async def test_startup_only_serves_the_card(self):
+        hass, resources = self._hass()
+        with patch.object(frontend, "async_at_started") as at_started, patch.object(
+            frontend, "HAS_STATIC_PATH_CONFIG", False
+        ):
+            await frontend.async_register_frontend(hass)
+
+        hass.http.register_static_path.assert_called_once()
+        at_started.assert_called_once_with(hass, frontend.async_register_lovelace_resource)
+        resources.async_load.assert_not_awaited()
+        resources.async_create_item.assert_not_awaited()
+
+    async def test_resource_registered_after_start_with_cached_version(self):
+        hass, resources = self._hass(
+            [{"id": "abc", "url": f"{frontend.URL_BASE}/{frontend.CARD_FILENAME}?v=1.0.0"}]
+        )
+        integration = MagicMock(version="2.5.0")
+        with patch.object(frontend, "async_get_integration", AsyncMock(return_value=integration)) as get_integration:
+            await frontend.async_register_lovelace_resource(hass)
+            await frontend.async_register_lovelace_resource(hass)
+
+        get_integration.assert_awaited_once()
+        resources.async_load.assert_awaited()
+        resources.async_update_item.assert_awaited_with(
+            "abc", {"res_type": "module", "url": f"{frontend.URL_BASE}/{frontend.CARD_FILENAME}?v=2.5.0"}
+        )
@@ -0,0 +1,188 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.control4_mediaplayer import (
+    async_migrate_entry,
+    async_setup_entry,
+    async_unload_entry,
+    update_listener,
+)
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.models import Control4Data
+
+
+def _amp_data(**zone_overrides):
+    zones = {
+        str(channel): {
+            "zone_custom_name": f"Zone {channel}",
+            "source_list": "Apple TV\nSonos",
+            "on_volume": 50,
+            "enable_eq": False,
+        }
+        for channel in (1, 2, 3)
+    }
+    for channel, overrides in zone_overrides.items():
+        zones[channel].update(overrides)
+    return {
+        "host": "10.0.12.246",
+        "port": 8750,
+        "name": "Matrix Amp",
+        "udp_timeout": 2.0,
+        "input_gains": "0\n0",
+        "zones": zones,
+    }
+
+
+class TestHotApplyOptions(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.hass = MagicMock()
+        self.hass.config_entries.async_reload = AsyncMock()
+        self.entry = MagicMock()
+        self.entry.entry_id = "amp_1"
+        self.entry.data = _amp_data()
+        self.manager = MagicMock()
+        self.manager.udp_timeout = 2.0
+        self.manager.registers = {}
+        self.manager.register_holds = lambda command: Control4Manager.register_holds(self.manager, command)
+        self.manager.async_send_batch = AsyncMock()
+        self.media_players = {channel: MagicMock() for channel in (1, 2, 3)}
+        self.numbers = {channel: [MagicMock()] for channel in (1, 2, 3)}
+        self.entry.runtime_data = Control4Data(
+            manager=self.manager,
+            register_store=MagicMock(),
+            applied_data=dict(self.entry.data),
+            media_players=self.media_players,
+            number_entities=self.numbers,
+        )
+
+    async def test_zone_tuning_is_applied_in_place(self):
+        self.entry.data = {
+            **_amp_data(**{"2": {"on_volume": 30, "zone_custom_name": "Den", "source_list": "Apple TV\nSpotify"}}),
+            "udp_timeout": 0.5,
+        }
+
+        await update_listener(self.hass, self.entry)
+
+        self.hass.config_entries.async_reload.assert_not_called()
+        self.assertEqual(self.manager.udp_timeout, 0.5)
+        self.media_players[2].async_apply_entry_data.assert_called_once()
+        self.numbers[2][0].async_apply_entry_data.assert_called_once()
+        self.media_players[1].async_apply_entry_data.assert_not_called()
+        self.manager.async_send_batch.assert_not_called()
+
+        # Nothing changed since the last apply: no work at all
+        self.media_players[2].reset_mock()
+        await update_listener(self.hass, self.entry)
+        self.media_players[2].async_apply_entry_data.assert_not_called()
+
+    async def test_copy_to_all_is_one_update(self):
+        # Copying a source list to every zone is a single entry update: one apply, no reload
+        self.entry.data = _amp_data(**{ch: {"source_list": "Apple TV\nSpotify"} for ch in ("1", "2", "3")})
+
+        await update_listener(self.hass, self.entry)
+
+        self.hass.config_entries.async_reload.assert_not_called()
+        for media_player in self.media_players.values():
+            media_player.async_apply_entry_data.assert_called_once()
+
+    async def test_input_gains_are_sent_without_reload(self):
+        self.entry.data = {**self.entry.data, "input_gains": "2\n-1"}
+
+        await update_listener(self.hass, self.entry)
+
+        self.hass.config_entries.async_reload.assert_not_called()
+        self.manager.async_send_batch.assert_awaited_once_with(["c4.amp.ingain 01 82", "c4.amp.ingain 02 7f"])
+
+    async def test_only_changed_input_gains_are_sent(self):
+        # Input 1 already holds +2 dB on the amp (persisted shadow register), input 3 is blank
+        self.manager.registers["c4.amp.ingain 01"] = "82"
+        self.entry.data = {**self.entry.data, "input_gains": "2\n-1\n\n1"}
+
+        await update_listener(self.hass, self.entry)
+
+        self.manager.async_send_batch.assert_awaited_once_with(["c4.amp.ingain 02 7f", "c4.amp.ingain 04 81"])
+
+        # Reapplying what the amp already holds sends nothing
+        self.manager.async_send_batch.reset_mock()
+        self.manager.registers.update({"c4.amp.ingain 02": "7f", "c4.amp.ingain 04": "81"})
+        self.entry.runtime_data.applied_data = {**self.entry.data, "input_gains": ""}
+        await update_listener(self.hass, self.entry)
+        self.hass.config_entries.async_reload.assert_not_called()
+        self.manager.async_send_batch.assert_not_called()
+
+    async def test_platform_changes_reload(self):
+        self.entry.data = _amp_data(**{"3": {"enable_eq": True}})
+
+        await update_listener(self.hass, self.entry)
+
+        self.hass.config_entries.async_reload.assert_awaited_once_with("amp_1")
+
+
+class TestLegacyEntryMigration(unittest.IsolatedAsyncioTestCase):
+    async def test_zone_entries_are_folded_into_one_amp_entry(self):
+        hass = MagicMock()
+        legacy = []
+        for channel in (2, 1, 3):
+            entry = MagicMock()
+            entry.entry_id = f"zone_{channel}"
+            entry.version = 1
+            entry.data = {
+                "host": "10.0.12.246",
+                "port": 8750,
+                "name": "Matrix Amp",
+                "channel": channel,
+                "zone_custom_name": f"Zone {channel}",
+                "source_list": "A\nB",
+                "on_volume": 40,
+                "udp_timeout": 1.0,
+                "input_gains": "1\n2" if channel == 1 else "",
+            }
+            legacy.append(entry)
+        hass.config_entries.async_entries.return_value = legacy
+
+        def mock_async_update_entry(entry, **changes):
+            for key, value in changes.items():
+                setattr(entry, key, value)
+
+        hass.config_entries.async_update_entry = mock_async_update_entry
+        hass.config_entries.async_remove = MagicMock()
+
+        ent_reg = MagicMock()
+        registry_entries = {
+            f"zone_{channel}": [MagicMock(entity_id=f"media_player.zone_{channel}")] for channel in (1, 2, 3)
+        }
+        with (
+            patch("custom_components.control4_mediaplayer.er") as er_mock,
+            patch("custom_components.control4_mediaplayer.dr") as dr_mock,
+        ):
+            er_mock.async_get.return_value = ent_reg
+            er_mock.async_entries_for_config_entry.side_effect = lambda reg, entry_id: registry_entries[entry_id]
+            dr_mock.async_entries_for_config_entry.return_value = []
+
+            # The first zone entry to migrate becomes the amplifier entry
+            self.assertTrue(await async_migrate_entry(hass, legacy[0]))
+            # Its siblings are absorbed and marked migrated, so none of them reports a failure
+            self.assertEqual([entry.version for entry in legacy], [2, 2, 2])
+            self.assertTrue(await async_migrate_entry(hass, legacy[1]))
+            # Until their removal lands they set up (and unload) as no-ops
+            self.assertTrue(await async_setup_entry(hass, legacy[1]))
+            self.assertTrue(await async_unload_entry(hass, legacy[1]))
+            er_mock.async_get.assert_called_once()
+
+        amp = legacy[0]
+        self.assertEqual(amp.version, 2)
+        self.assertEqual(amp.unique_id, "v27_10.0.12.246")
+        self.assertEqual(sorted(amp.data["zones"]), ["1", "2", "3"])
+        self.assertEqual(amp.data["zones"]["3"]["zone_custom_name"], "Zone 3")
+        self.assertEqual(amp.data["input_gains"], "1\n2")
+
+        # Sibling entities move to the amp entry (IDs untouched) before the siblings are removed
+        ent_reg.async_update_entity.assert_any_call("media_player.zone_1", config_entry_id="zone_2")
+        ent_reg.async_update_entity.assert_any_call("media_player.zone_3", config_entry_id="zone_2")
+        self.assertEqual(ent_reg.async_update_entity.call_count, 2)
+        hass.config_entries.async_remove.assert_any_call("zone_1")
+        hass.config_entries.async_remove.assert_any_call("zone_3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import add_zone, make_entry
+
+
+class TestLinkedZones(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start()
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.2)
+        self.manager.async_send_batch = AsyncMock(wraps=self.manager.async_send_batch)
+        self.hass = MagicMock()
+        self.entry = make_entry(
+            self.manager,
+            {
+                "1": {"source_list": "Apple TV\nSonos", "on_volume": 40},
+                "2": {"source_list": "Sonos", "link_leader": "1", "link_offset": -10},
+                "3": {"source_list": "Apple TV\nSonos", "link_leader": "1", "link_offset": 20},
+                "4": {"source_list": "Apple TV\nSonos"},
+            },
+        )
+        self.zones = {channel: add_zone(self.hass, self.entry, channel) for channel in (1, 2, 3, 4)}
+
+    async def asyncTearDown(self):
+        self.amp.close()
+
+    async def _async_mute_by_volume(self, channel: int):
+        """Mute a zone through the volume-based fallback of an amp without native mute."""
+        self.amp.unsupported = ("c4.amp.mute",)
+        await self.zones[channel].async_mute_volume(True)
+        self.amp.commands.clear()
+
+    async def test_volume_fans_out_in_one_batch_with_offsets_and_caps(self):
+        self.manager.zone(3).max_volume = 60
+        await self._async_mute_by_volume(2)
+
+        await self.zones[1].async_set_volume_level(0.5)
+
+        # Zone 3 (+20%) is held at its own 60% cap; zone 2, muted by volume, is not touched on the amp
+        self.manager.async_send_batch.assert_awaited_once_with(["c4.amp.chvol 01 cd", "c4.amp.chvol 03 d7"])
+        self.assertEqual(self.amp.commands, ["c4.amp.chvol 01 cd", "c4.amp.chvol 03 d7"])
+        self.assertEqual([self.zones[c].volume_level for c in (1, 2, 3)], [0.5, 0.4, 0.6])
+        self.assertEqual(self.manager.registers["c4.amp.chvol 03"], "d7")
+        self.assertEqual(self.zones[2].async_write_ha_state.call_count, 2)
+
+        # Unmuting restores the new level
+        await self.zones[2].async_mute_volume(False)
+        self.assertEqual(self.amp.commands[-1], "c4.amp.chvol 02 c3")
+
+    async def test_natively_muted_follower_unmutes_at_the_new_level(self):
+        await self.zones[2].async_mute_volume(True)
+        self.assertIs(self.manager.native_mute, True)
+
+        await self.zones[1].async_set_volume_level(0.5)
+        await self.zones[2].async_mute_volume(False)
+
+        # The volume register is free behind a native mute, so it follows the leader right away
+        self.assertEqual(
+            self.amp.commands,
+            [
+                "c4.amp.mute 02 01",
+                "c4.amp.chvol 01 cd", "c4.amp.chvol 02 c3", "c4.amp.chvol 03 e1",
+                "c4.amp.mute 02 00",
+            ],
+        )
+        self.assertEqual(self.manager.registers["c4.amp.chvol 02"], "c3")
+        self.assertEqual(self.zones[2].volume_level, 0.4)
+
+    async def test_source_reroutes_only_playing_followers(self):
+        self.zones[3]._zone.state = "on"
+
+        await self.zones[1].async_select_source("Sonos")
+
+        # Zone 2 is off and maps Sonos to its own input 1; it picks it up when turned on
+        self.assertEqual(self.amp.commands, ["c4.amp.out 01 02", "c4.amp.out 03 02"])
+        self.assertEqual(self.zones[2].source, "Sonos")
+        self.assertEqual(self.zones[2]._zone.source, 1)
+        self.assertIsNone(self.zones[4].source)
+
+    async def test_turn_on_sets_every_volume_before_waking_and_routing(self):
+        await self.zones[1].async_turn_on()
+
+        self.manager.async_send_batch.assert_awaited_once()
+        self.assertEqual(
+            self.amp.commands,
+            [
+                "c4.amp.chvol 01 c3", "c4.amp.chvol 02 b9", "c4.amp.chvol 03 d7",
+                "c4.amp.psave 00 00",
+                "c4.amp.out 01 01", "c4.amp.out 02 01", "c4.amp.out 03 01",
+            ],
+        )
+        self.assertTrue(all(self.zones[c].state == "on" for c in (1, 2, 3)))
+        self.assertNotEqual(self.zones[4].state, "on")
+
+        await self.zones[1].async_turn_off()
+        self.assertEqual(self.amp.commands[-3:], ["c4.amp.out 01 00", "c4.amp.out 02 00", "c4.amp.out 03 00"])
+
+    async def test_turn_on_leaves_muted_followers_silent(self):
+        await self._async_mute_by_volume(2)
+
+        await self.zones[1].async_turn_on()
+
+        # Zone 2 is routed but its volume is not sent, which would lift a volume-based mute
+        self.assertEqual(
+            self.amp.commands,
+            [
+                "c4.amp.chvol 01 c3", "c4.amp.chvol 03 d7",
+                "c4.amp.psave 00 00",
+                "c4.amp.out 01 01", "c4.amp.out 02 01", "c4.amp.out 03 01",
+            ],
+        )
+        self.assertEqual((self.zones[2].state, self.zones[2].volume_level), ("on", 0.3))
+        self.assertTrue(self.zones[2].is_volume_muted)
+
+    async def test_unlinked_zone_keeps_single_commands(self):
+        await self.zones[4].async_set_volume_level(0.3)
+
+        self.manager.async_send_batch.assert_not_awaited()
+        self.assertEqual(self.amp.commands, ["c4.amp.chvol 04 b9"])
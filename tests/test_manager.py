@@ -0,0 +1,191 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from custom_components.control4_mediaplayer.const import HEARTBEAT_COMMAND, UNAVAILABLE_AFTER_FAILURES
+from custom_components.control4_mediaplayer.control4Amp import control4AmpChannel
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from tests.amp_emulator import AmpEmulator
+
+
+class TestManagerAvailability(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start()
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.1)
+
+    async def asyncTearDown(self):
+        self.amp.close()
+
+    async def test_heartbeat_skipped_after_recent_ack(self):
+        # No traffic yet: the heartbeat must probe the amp
+        await self.manager.async_heartbeat()
+        self.assertEqual(self.amp.commands, [HEARTBEAT_COMMAND])
+
+        # Real traffic was just acknowledged, so the heartbeat adds no packet
+        await self.manager.async_send_command("c4.amp.out 01 02")
+        await self.manager.async_heartbeat()
+        self.assertEqual(self.amp.commands, [HEARTBEAT_COMMAND, "c4.amp.out 01 02"])
+
+    async def test_availability_follows_replies(self):
+        listener = MagicMock()
+        remove = self.manager.async_add_listener(listener)
+
+        self.amp.silent = True
+        for _ in range(UNAVAILABLE_AFTER_FAILURES - 1):
+            await self.manager.async_send_command("c4.amp.out 01 02")
+        self.assertTrue(self.manager.available)
+
+        await self.manager.async_send_command("c4.amp.out 01 02")
+        self.assertFalse(self.manager.available)
+        listener.assert_called_once()
+
+        # A single reply (even an error reply) brings the amp back
+        self.amp.silent = False
+        self.amp.unsupported = (HEARTBEAT_COMMAND,)
+        await self.manager.async_heartbeat()
+        self.assertTrue(self.manager.available)
+        self.assertEqual(listener.call_count, 2)
+
+        remove()
+        self.amp.silent = True
+        for _ in range(UNAVAILABLE_AFTER_FAILURES):
+            await self.manager.async_send_command("c4.amp.out 01 02")
+        self.assertEqual(listener.call_count, 2)
+
+    async def test_shadow_registers_track_acknowledged_writes(self):
+        listener = MagicMock()
+        self.manager.async_add_register_listener(listener)
+        self.amp.unsupported = ("c4.amp.mute",)
+
+        await self.manager.async_send_batch(["c4.amp.chvol 01 D7", "c4.amp.out 01 02", "c4.amp.psave 00 00"])
+        await self.manager.async_send_command("c4.amp.mute 01 01")  # rejected with n01
+        await self.manager.async_send_command("c4.amp.out 01 02")  # unchanged value
+        await self.manager.async_send_command(HEARTBEAT_COMMAND)  # not a register write
+
+        self.assertEqual(
+            self.manager.registers,
+            {"c4.amp.chvol 01": "d7", "c4.amp.out 01": "02", "c4.amp.psave": "00 00"},
+        )
+        self.assertEqual(listener.call_count, 3)
+
+        # Unanswered writes leave the shadow at the last acknowledged value
+        self.amp.silent = True
+        await self.manager.async_send_command("c4.amp.chvol 01 c3")
+        self.assertEqual(self.manager.registers["c4.amp.chvol 01"], "d7")
+
+    async def test_unanswered_writes_are_compacted_and_flushed_on_reply(self):
+        self.amp.silent = True
+        for command in ("c4.amp.chvol 01 c3", "c4.amp.out 01 02", "c4.amp.chvol 01 b9", "c4.amp.psave 00 00"):
+            await self.manager.async_send_command(command)
+        await self.manager.async_send_command("c4.amp.mute 02 01")
+        await self.manager.async_send_command(HEARTBEAT_COMMAND)  # not a register write, never queued
+        self.assertEqual(len(self.manager.queued), 4)
+
+        # Zone 2 is unmuted once the amp answers again: the queued mute is superseded, not replayed
+        self.amp.silent = False
+        self.amp.commands.clear()
+        await self.manager.async_send_command("c4.amp.mute 02 00")
+
+        # One write per register, latest value, volume before wake before routing
+        self.assertEqual(
+            self.amp.commands,
+            ["c4.amp.mute 02 00", "c4.amp.chvol 01 b9", "c4.amp.psave 00 00", "c4.amp.out 01 02"],
+        )
+        self.assertEqual(self.manager.queued, {})
+        self.assertEqual(self.manager.registers["c4.amp.chvol 01"], "b9")
+
+        # Nothing left to resend
+        await self.manager.async_send_command(HEARTBEAT_COMMAND)
+        self.assertEqual(self.amp.commands[-1], HEARTBEAT_COMMAND)
+        self.assertEqual(len(self.amp.commands), 5)
+
+    async def test_queued_fallback_mute_is_lifted_by_unmute(self):
+        channel = control4AmpChannel(self.manager, 1)
+        self.manager.zone(1).volume = 0.4
+
+        # Unreachable: native mute times out, the volume-based fallback is queued along with it
+        self.amp.silent = True
+        await channel.async_mute_volume(True)
+        self.amp.silent = False
+        await self.manager.async_heartbeat()
+        self.assertEqual(self.manager.registers["c4.amp.chvol 01"], "9b")
+
+        self.amp.commands.clear()
+        await channel.async_mute_volume(False)
+        self.assertEqual(self.amp.commands, ["c4.amp.mute 01 00", "c4.amp.chvol 01 c3"])
+
+    async def test_refused_native_mute_is_not_tried_again(self):
+        listener = MagicMock()
+        self.manager.async_add_capability_listener(listener)
+        self.amp.unsupported = ("c4.amp.mute",)
+        channel = control4AmpChannel(self.manager, 1)
+        self.manager.zone(1).volume = 0.4
+
+        await channel.async_mute_volume(True)
+        self.assertIs(self.manager.native_mute, False)
+        listener.assert_called_once()
+
+        # Known unsupported: straight to the volume-based mute, for every zone
+        self.amp.commands.clear()
+        await channel.async_mute_volume(False)
+        await control4AmpChannel(self.manager, 2).async_mute_volume(True)
+        self.assertEqual(self.amp.commands, ["c4.amp.chvol 01 c3", "c4.amp.chvol 02 9b"])
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start(reply_delay=0.01)
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.5)
+
+    async def asyncTearDown(self):
+        self.manager.close()
+        self.amp.close()
+
+    async def test_identical_concurrent_commands_are_sent_once(self):
+        replies = await asyncio.gather(
+            self.manager.async_send_command("c4.amp.psave 00 00"),
+            self.manager.async_send_command("c4.amp.out 01 02"),
+            self.manager.async_send_command("c4.amp.psave 00 00"),
+            self.manager.async_send_command("c4.amp.psave 00 00"),
+        )
+
+        self.assertEqual(self.amp.commands, ["c4.amp.psave 00 00", "c4.amp.out 01 02"])
+        self.assertEqual(replies[0], replies[2])
+        self.assertEqual(replies[0], replies[3])
+
+        # Nothing is shared once the command has landed
+        await self.manager.async_send_command("c4.amp.psave 00 00")
+        self.assertEqual(len(self.amp.commands), 3)
+
+    async def test_overridden_write_is_not_joined(self):
+        # The third caller must not ride on the first: the second write lands in between
+        await asyncio.gather(
+            self.manager.async_send_command("c4.amp.out 01 02"),
+            self.manager.async_send_command("c4.amp.out 01 00"),
+            self.manager.async_send_command("c4.amp.out 01 02"),
+        )
+        self.assertEqual(self.amp.commands, ["c4.amp.out 01 02", "c4.amp.out 01 00", "c4.amp.out 01 02"])
+        self.assertEqual(self.manager.registers["c4.amp.out 01"], "02")
+
+        self.amp.commands.clear()
+        await asyncio.gather(
+            self.manager.async_send_command("c4.amp.out 01 00"),
+            self.manager.async_send_batch(["c4.amp.out 01 02"]),
+            self.manager.async_send_command("c4.amp.out 01 00"),
+        )
+        self.assertEqual(self.amp.commands, ["c4.amp.out 01 00", "c4.amp.out 01 02", "c4.amp.out 01 00"])
+
+    async def test_joined_caller_sends_itself_when_the_sender_is_cancelled(self):
+        first = asyncio.ensure_future(self.manager.async_send_command("c4.amp.out 01 02"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(self.manager.async_send_command("c4.amp.out 01 02"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        self.assertEqual((await second).split()[1], "000")
+        self.assertTrue(first.cancelled())
+        self.assertIn("c4.amp.out 01 02", self.amp.commands)
+
+
+if __name__ == "__main__":
+    unittest.main()
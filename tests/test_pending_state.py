@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock
+
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import add_zone, make_entry
+
+
+class TestPendingZoneState(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start()
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.1)
+        self.entry = make_entry(
+            self.manager,
+            {
+                "1": {"source_list": "Apple TV\nSonos"},
+                "2": {"source_list": "Apple TV\nSonos", "link_leader": "1"},
+            },
+        )
+        self.zones = {channel: add_zone(MagicMock(), self.entry, channel, numbers=False) for channel in (1, 2)}
+
+    async def asyncTearDown(self):
+        self.amp.close()
+
+    async def test_refused_command_rolls_back(self):
+        zone = self.zones[2]
+        await zone.async_set_volume_level(0.3)
+        self.assertIsNotNone(zone.extra_state_attributes["last_latency_ms"])
+
+        self.amp.unsupported = ("c4.amp.chvol 02",)
+        await zone.async_set_volume_level(0.6)
+
+        self.assertEqual(zone.volume_level, 0.3)
+        self.assertEqual(zone.extra_state_attributes["pending"], [])
+        self.assertEqual(zone.extra_state_attributes["dropped_commands"], 0)
+
+    async def test_linked_group_rolls_back_only_the_refusing_zone(self):
+        self.amp.unsupported = ("c4.amp.out 02",)
+        self.zones[2]._zone.state = "on"
+
+        await self.zones[1].async_select_source("Sonos")
+
+        self.assertEqual(self.zones[1].source, "Sonos")
+        self.assertIsNone(self.zones[2].source)
+
+    async def test_unanswered_command_stays_pending_until_resent(self):
+        zone = self.zones[2]
+        self.amp.silent = True
+        await zone.async_set_volume_level(0.4)
+
+        # Not refused, just unanswered: the value is kept and reported as pending
+        self.assertEqual(zone.volume_level, 0.4)
+        self.assertEqual(zone.extra_state_attributes["pending"], ["volume"])
+        self.assertEqual(zone.extra_state_attributes["dropped_commands"], 1)
+
+        listener = MagicMock()
+        self.manager.async_add_queue_listener(listener)
+        self.amp.silent = False
+        await self.manager.async_heartbeat()
+
+        listener.assert_called_once()
+        self.assertEqual(zone.extra_state_attributes["pending"], [])
+        self.assertEqual(self.manager.registers["c4.amp.chvol 02"], "c3")
+
+
+if __name__ == "__main__":
+    unittest.main()
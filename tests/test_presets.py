@@ -0,0 +1,145 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.presets import (
+    DATA_PRESETS,
+    async_apply_preset,
+    async_delete_preset,
+    async_save_preset,
+    async_setup_presets,
+)
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import add_zone, make_bass, make_entry
+
+
+class TestPresets(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amps = [await AmpEmulator.start() for _ in range(2)]
+        self.hass = MagicMock()
+        self.store = MagicMock(async_save=AsyncMock())
+        self.hass.data = {DATA_PRESETS: {"store": self.store, "presets": {}}}
+        self.zones = {}
+        entries = []
+        for index, amp in enumerate(self.amps):
+            entry = make_entry(
+                Control4Manager("127.0.0.1", amp.port, udp_timeout=0.2),
+                {str(c): {"source_list": "Apple TV\nSonos"} for c in (1, 2)},
+                entry_id=f"amp_{index}",
+            )
+            entries.append(entry)
+            for channel in (1, 2):
+                # Distinct hosts keep the zones' unique IDs apart although both amps are on localhost
+                host = f"10.0.0.{index}"
+                player = add_zone(self.hass, entry, channel, host=host)
+                bass = make_bass(self.hass, entry, channel, host=host)
+                entry.runtime_data.number_entities[channel].append(bass)
+                self.zones[index, channel] = player, bass
+        self.hass.config_entries.async_entries.return_value = entries
+
+    async def asyncTearDown(self):
+        for amp in self.amps:
+            amp.close()
+
+    async def test_apply_sends_only_differing_registers_per_amp(self):
+        playing, playing_bass = self.zones[0, 1]
+        await playing.async_select_source("Sonos")
+        await playing.async_turn_on()
+        await playing.async_set_volume_level(0.4)
+        await playing_bass.async_set_native_value(2)
+        for amp in self.amps:
+            amp.commands.clear()
+
+        entity_ids = [player.entity_id for player, _ in self.zones.values()]
+        response = await async_save_preset(self.hass, "dinner", entity_ids)
+        self.assertEqual(response, {"name": "dinner", "zones": 4})
+        self.store.async_save.assert_awaited_once()
+
+        # Drift away from the preset: zone 1 louder, zone 2 of the second amp switched on
+        await playing.async_set_volume_level(0.6)
+        other, _ = self.zones[1, 2]
+        await other.async_turn_on()
+        for amp in self.amps:
+            amp.commands.clear()
+
+        response = await async_apply_preset(self.hass, "dinner")
+
+        # Source and bass already match and are not resent
+        self.assertEqual(self.amps[0].commands, ["c4.amp.chvol 01 c3"])
+        self.assertEqual(self.amps[1].commands, ["c4.amp.out 02 00"])
+        self.assertEqual([amp["commands"] for amp in response["amps"]], [1, 1])
+        self.assertTrue(all(amp["success"] for amp in response["amps"]))
+        self.assertEqual(playing.volume_level, 0.4)
+        self.assertEqual(other.state, "off")
+
+        # Applying again is a no-op on the wire
+        response = await async_apply_preset(self.hass, "dinner")
+        self.assertEqual([amp["commands"] for amp in response["amps"]], [0, 0])
+        self.assertEqual(len(self.amps[0].commands), 1)
+
+    async def test_apply_wakes_and_routes_after_volumes(self):
+        player, bass = self.zones[0, 2]
+        self.hass.data[DATA_PRESETS]["presets"]["movie"] = {
+            "zones": {player.unique_id: {"state": "on", "source": "Apple TV", "volume": 0.3, "bass": -2}}
+        }
+
+        await async_apply_preset(self.hass, "movie")
+
+        self.assertEqual(
+            self.amps[0].commands,
+            ["c4.amp.chvol 02 b9", "c4.amp.psave 00 00", "c4.amp.out 02 01", "c4.amp.bassgain 02 fe"],
+        )
+        self.assertEqual((player.state, player.source, bass.native_value), ("on", "Apple TV", -2.0))
+
+    async def test_muted_zones_unmute_at_the_preset_volume(self):
+        native, _ = self.zones[0, 2]
+        fallback, _ = self.zones[1, 2]
+        self.amps[1].unsupported = ("c4.amp.mute",)
+        for player in (native, fallback):
+            await player.async_turn_on()
+            await player.async_mute_volume(True)
+        preset = {"state": "on", "source": "Apple TV", "volume": 0.3}
+        self.hass.data[DATA_PRESETS]["presets"]["movie"] = {
+            "zones": {player.unique_id: preset for player in (native, fallback)}
+        }
+        for amp in self.amps:
+            amp.commands.clear()
+
+        await async_apply_preset(self.hass, "movie")
+
+        # Behind a native mute the volume is sent at once; a volume-based mute holds it at 0
+        self.assertEqual(self.amps[0].commands, ["c4.amp.chvol 02 b9"])
+        self.assertEqual(self.amps[1].commands, [])
+
+        for player in (native, fallback):
+            await player.async_mute_volume(False)
+        self.assertEqual(self.amps[0].commands[-1], "c4.amp.mute 02 00")
+        self.assertEqual(self.amps[1].commands[-1], "c4.amp.chvol 02 b9")
+        for player in (native, fallback):
+            self.assertEqual(player._amp._manager.registers["c4.amp.chvol 02"], "b9")
+
+    async def test_presets_are_loaded_on_first_use(self):
+        store = MagicMock(async_load=AsyncMock(return_value={"movie": {"zones": {}}}), async_save=AsyncMock())
+        with patch("custom_components.control4_mediaplayer.presets.Store", return_value=store):
+            async_setup_presets(self.hass)
+        # Nothing is read while Home Assistant boots
+        store.async_load.assert_not_awaited()
+
+        player, _ = self.zones[0, 1]
+        await asyncio.gather(
+            async_apply_preset(self.hass, "movie"), async_save_preset(self.hass, "dinner", [player.entity_id])
+        )
+
+        store.async_load.assert_awaited_once()
+        self.assertEqual(sorted(self.hass.data[DATA_PRESETS]["presets"]), ["dinner", "movie"])
+
+    async def test_unknown_presets_are_rejected(self):
+        with self.assertRaises(ServiceValidationError):
+            await async_apply_preset(self.hass, "missing")
+        with self.assertRaises(ServiceValidationError):
+            await async_delete_preset(self.hass, "missing")
+        with self.assertRaises(ServiceValidationError):
+            await async_save_preset(self.hass, "empty", ["media_player.not_a_zone"])
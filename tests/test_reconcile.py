@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.reconcile import async_reconcile_amp
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import DummyState, add_zone, make_bass, make_entry
+
+
+class TestRestartReconciliation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start()
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.2)
+        self.hass = MagicMock()
+        self.entry = make_entry(
+            self.manager,
+            {
+                str(channel): {"zone_custom_name": f"Zone {channel}", "source_list": "Apple TV\nSonos"}
+                for channel in (1, 2, 3)
+            },
+        )
+        self.record = self.entry.runtime_data
+
+    async def asyncTearDown(self):
+        self.amp.close()
+
+    async def _add_zone(self, channel, last_state, bass=None):
+        media_player = add_zone(self.hass, self.entry, channel)
+        media_player.async_get_last_state = AsyncMock(return_value=last_state)
+        if bass is not None:
+            eq = make_bass(self.hass, self.entry, channel)
+            eq.async_get_last_number_data = AsyncMock(return_value=MagicMock(native_value=bass))
+            await eq.async_added_to_hass()
+            self.record.number_entities[channel].append(eq)
+        await media_player.async_added_to_hass()
+        return media_player
+
+    async def test_only_differing_registers_are_sent(self):
+        self.manager.registers = {
+            "c4.amp.chvol 01": "e1",  # 70% on the amp, 50% restored: lowered
+            "c4.amp.out 01": "02",
+            "c4.amp.chvol 02": "c3",  # 40% on the amp, 60% restored: adopted, never raised
+            "c4.amp.out 02": "02",
+            "c4.amp.out 03": "01",  # playing on the amp but restored as off: switched off
+            "c4.amp.bassgain 01": "02",
+            "c4.amp.bassgain 02": "fe",
+        }
+        zone_1 = await self._add_zone(1, DummyState("on", volume_level=0.5, source="Sonos"), bass=2)
+        zone_2 = await self._add_zone(2, DummyState("on", volume_level=0.6, source="Sonos"), bass=-3)
+        await self._add_zone(3, DummyState("off", volume_level=0.3, source="Apple TV"))
+        # Restoring entities is silent; only the reconciliation pass talks to the amp
+        self.assertEqual(self.amp.commands, [])
+
+        sent = await async_reconcile_amp(self.hass, self.entry)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(self.amp.commands, ["c4.amp.chvol 01 cd", "c4.amp.out 03 00", "c4.amp.bassgain 02 fd"])
+        self.assertEqual(zone_1.volume_level, 0.5)
+        self.assertEqual(zone_2.volume_level, 0.4)
+
+        # The shadow now matches, so a second pass sends nothing
+        self.assertEqual(await async_reconcile_amp(self.hass, self.entry), 0)
+        self.assertEqual(len(self.amp.commands), 3)
+
+    async def test_unknown_hardware_state_stays_silent(self):
+        # No shadow yet (first start after upgrade): the media player sends nothing,
+        # EQ registers are restored as before
+        media_player = await self._add_zone(1, DummyState("on", volume_level=0.9, source="Sonos"), bass=4)
+
+        await async_reconcile_amp(self.hass, self.entry)
+
+        self.assertEqual(self.amp.commands, ["c4.amp.bassgain 01 04"])
+        self.assertEqual(media_player.state, "on")
+
+    async def test_eq_without_restored_value_is_left_alone(self):
+        await self._add_zone(1, DummyState("on", volume_level=0.9, source="Sonos"), bass=None)
+        eq = make_bass(self.hass, self.entry, 1)
+        eq.async_get_last_number_data = AsyncMock(return_value=None)
+        await eq.async_added_to_hass()
+        self.record.number_entities[1].append(eq)
+
+        await async_reconcile_amp(self.hass, self.entry)
+
+        self.assertEqual(self.amp.commands, [])
+
+    async def test_unavailable_last_state_does_not_turn_a_playing_zone_off(self):
+        self.manager.registers = {"c4.amp.out 01": "02", "c4.amp.chvol 01": "cd"}
+        media_player = await self._add_zone(1, DummyState("unavailable"))
+        other = await self._add_zone(2, DummyState("unknown"))
+
+        await async_reconcile_amp(self.hass, self.entry)
+
+        self.assertEqual(self.amp.commands, [])
+        self.assertEqual((media_player.state, media_player.source), ("on", "Sonos"))
+        self.assertEqual(other.state, "off")
+
+    async def test_zone_off_on_amp_is_not_woken(self):
+        self.manager.registers = {"c4.amp.out 01": "00", "c4.amp.chvol 01": "cd"}
+        media_player = await self._add_zone(1, DummyState("on", volume_level=0.5, source="Sonos"))
+
+        await async_reconcile_amp(self.hass, self.entry)
+
+        self.assertEqual(self.amp.commands, [])
+        self.assertEqual(media_player.state, "off")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from custom_components.control4_mediaplayer import async_party_mode, async_send_raw_command
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import make_entry
+
+ZONES_PER_AMP = 4
+REPLY_DELAY = 0.02
+
+
+class TestPartyMode(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amps = [await AmpEmulator.start(reply_delay=REPLY_DELAY) for _ in range(3)]
+        self.hass = MagicMock()
+        entries = []
+        for index, amp in enumerate(self.amps):
+            entry = make_entry(
+                Control4Manager("127.0.0.1", amp.port, udp_timeout=0.5),
+                {
+                    str(channel): {"zone_custom_name": f"Zone {channel}", "source_list": "Apple TV\nSonos"}
+                    for channel in range(1, ZONES_PER_AMP + 1)
+                },
+                entry_id=f"amp_{index}",
+                name=f"Amp {index}",
+            )
+            entries.append(entry)
+        self.hass.config_entries.async_entries.return_value = entries
+
+    async def asyncTearDown(self):
+        for amp in self.amps:
+            amp.close()
+
+    async def test_amps_run_concurrently_with_safe_order(self):
+        # Zone 2 of the first amp is capped at 30%, zone 3 does not carry the source
+        record = self.hass.config_entries.async_entries.return_value[0].runtime_data
+        record.manager.zone(2).max_volume = 30
+        self.hass.config_entries.async_entries.return_value[0].data["zones"]["3"]["source_list"] = "Apple TV"
+        media_player = MagicMock(entity_id="media_player.zone_1")
+        record.media_players[1] = media_player
+
+        started = time.monotonic()
+        response = await async_party_mode(self.hass, "Sonos", 60)
+        elapsed = time.monotonic() - started
+
+        # One amp's batch takes ~ (2 * zones + 1) round-trips; three amps in series would take 3x
+        single_amp = (2 * ZONES_PER_AMP + 1) * (REPLY_DELAY + 0.01)
+        self.assertLess(elapsed, 2 * single_amp)
+
+        zones = response["zones"]
+        self.assertEqual(len(zones), 3 * ZONES_PER_AMP - 1)
+        self.assertTrue(all(zone["success"] for zone in zones))
+        self.assertTrue(all(zone["latency_ms"] > 0 for zone in zones))
+        self.assertEqual(next(z for z in zones if z["amp"] == "Amp 0" and z["channel"] == 2)["volume"], 30)
+
+        # Volumes are loaded before the amp leaves power save, and routing comes last
+        self.assertEqual(
+            self.amps[0].commands,
+            [
+                "c4.amp.chvol 01 d7",
+                "c4.amp.chvol 02 b9",
+                "c4.amp.chvol 04 d7",
+                "c4.amp.psave 00 00",
+                "c4.amp.out 01 02",
+                "c4.amp.out 02 02",
+                "c4.amp.out 04 02",
+            ],
+        )
+        media_player.async_apply_party_mode.assert_called_once_with(2, 0.6)
+
+    async def test_unanswered_zones_are_reported(self):
+        self.amps[1].silent = True
+        for entry in self.hass.config_entries.async_entries.return_value:
+            entry.runtime_data.manager.udp_timeout = 0.05
+
+        response = await async_party_mode(self.hass, "Sonos", 40)
+
+        by_amp = {}
+        for zone in response["zones"]:
+            by_amp.setdefault(zone["amp"], set()).add(zone["success"])
+        self.assertEqual(by_amp, {"Amp 0": {True}, "Amp 1": {False}, "Amp 2": {True}})
+
+
+class TestSendRawCommand(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amps = [await AmpEmulator.start(reply_delay=REPLY_DELAY) for _ in range(2)]
+        self.amps[1].unsupported = ("c4.amp.trebgain",)
+        self.hass = MagicMock()
+        entries = []
+        for index, amp in enumerate(self.amps):
+            entries.append(
+                make_entry(Control4Manager("127.0.0.1", amp.port, udp_timeout=0.5), {}, entry_id=f"amp_{index}")
+            )
+        self.hass.config_entries.async_entries.return_value = entries
+        self.registry = {
+            **{f"media_player.amp0_zone_{ch}": MagicMock(config_entry_id="amp_0") for ch in (1, 2, 3)},
+            "number.amp1_zone_1_bass": MagicMock(config_entry_id="amp_1"),
+            "media_player.other_integration": MagicMock(config_entry_id="someone_else"),
+        }
+
+    async def asyncTearDown(self):
+        for amp in self.amps:
+            amp.close()
+
+    async def test_sent_once_per_amp_with_replies(self):
+        with patch("custom_components.control4_mediaplayer.er") as er_mock:
+            er_mock.async_get.return_value.async_get.side_effect = self.registry.get
+            started = time.monotonic()
+            response = await async_send_raw_command(self.hass, "c4.amp.trebgain 01 03", list(self.registry))
+            elapsed = time.monotonic() - started
+
+        # Three zones of the first amp collapse into a single packet
+        self.assertEqual(self.amps[0].commands, ["c4.amp.trebgain 01 03"])
+        self.assertEqual(self.amps[1].commands, ["c4.amp.trebgain 01 03"])
+        # Both amps answer within one round-trip window, not two
+        self.assertLess(elapsed, 2 * REPLY_DELAY + 0.1)
+
+        amps = {amp["entry_id"]: amp for amp in response["amps"]}
+        self.assertEqual(set(amps), {"amp_0", "amp_1"})
+        self.assertEqual(len(amps["amp_0"]["entity_ids"]), 3)
+        self.assertEqual((amps["amp_0"]["success"], amps["amp_0"]["reply"]), (True, "000"))
+        self.assertEqual((amps["amp_1"]["success"], amps["amp_1"]["reply"]), (False, "n01"))
+        self.assertGreaterEqual(amps["amp_0"]["latency_ms"], REPLY_DELAY * 1000 * 0.75)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from custom_components.control4_mediaplayer.const import SLO_BREACH_CHECKS, SLO_WINDOW
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.slo import async_check_slo
+from tests.amp_emulator import AmpEmulator
+from tests.helpers import make_entry
+
+
+class TestLatencyStats(unittest.IsolatedAsyncioTestCase):
+    async def test_p95_and_timeout_rate_over_the_window(self):
+        manager = Control4Manager("127.0.0.1", 8750)
+        with patch("custom_components.control4_mediaplayer.manager.time.monotonic", return_value=1000.0):
+            self.assertEqual(manager.latency_stats(SLO_WINDOW), (0, None, 0.0))
+            # An old sample outside the window is ignored
+            manager._samples.append((1000.0 - SLO_WINDOW - 1, 900.0))
+            manager._samples.extend((999.0, float(latency)) for latency in range(1, 20))
+            manager._samples.append((999.0, None))
+
+            samples, p95, timeout_rate = manager.latency_stats(SLO_WINDOW)
+
+        self.assertEqual(samples, 20)
+        self.assertEqual(p95, 19.0)
+        self.assertEqual(timeout_rate, 0.05)
+
+
+class TestSloRepairIssue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start(reply_delay=0.03)
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.1)
+        self.entry = make_entry(
+            self.manager, {}, entry_id="amp_0", name="Matrix Amp", slo_p95_ms=10, slo_timeout_rate=10
+        )
+        self.hass = MagicMock()
+        patcher = patch("custom_components.control4_mediaplayer.slo.ir")
+        self.ir = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        self.amp.close()
+
+    async def _async_traffic(self, count: int = 5):
+        await self.manager.async_send_batch([f"c4.amp.out 01 0{index % 4 + 1}" for index in range(count)])
+
+    async def test_raised_after_consecutive_breaches_and_cleared_on_recovery(self):
+        await self._async_traffic()
+        for _ in range(SLO_BREACH_CHECKS - 1):
+            async_check_slo(self.hass, self.entry)
+        self.ir.async_create_issue.assert_not_called()
+
+        async_check_slo(self.hass, self.entry)
+        self.ir.async_create_issue.assert_called_once()
+        _, _, issue_id = self.ir.async_create_issue.call_args.args
+        self.assertEqual(issue_id, "amp_slo_amp_0")
+        placeholders = self.ir.async_create_issue.call_args.kwargs["translation_placeholders"]
+        self.assertEqual((placeholders["p95_limit"], placeholders["timeout_rate"]), ("10", "0"))
+
+        # The amp speeds up (a raised target stands in for it): the next check clears the issue
+        self.entry.data["slo_p95_ms"] = 1000
+        async_check_slo(self.hass, self.entry)
+        self.ir.async_delete_issue.assert_called_once_with(self.hass, "control4_mediaplayer", "amp_slo_amp_0")
+        self.assertEqual(self.entry.runtime_data.slo_breaches, 0)
+
+    async def test_timeouts_breach_and_quiet_amps_are_not_judged(self):
+        self.entry.data["slo_p95_ms"] = 1000
+        await self._async_traffic(SLO_BREACH_CHECKS)
+        # Too few commands to judge
+        async_check_slo(self.hass, self.entry)
+        self.assertEqual(self.entry.runtime_data.slo_breaches, 0)
+
+        self.amp.silent = True
+        await self._async_traffic(2)
+        for _ in range(SLO_BREACH_CHECKS):
+            async_check_slo(self.hass, self.entry)
+        placeholders = self.ir.async_create_issue.call_args.kwargs["translation_placeholders"]
+        self.assertEqual(placeholders["timeout_rate"], "40")
+        self.ir.async_delete_issue.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
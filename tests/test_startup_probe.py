@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from custom_components.control4_mediaplayer import _async_apply_input_gains
+from custom_components.control4_mediaplayer.const import HEARTBEAT_COMMAND
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.startup import (
+    DATA_STARTUP_PROBE,
+    async_seed_from_startup_probe,
+    async_start_startup_probe,
+)
+from tests.amp_emulator import AmpEmulator
+
+UDP_TIMEOUT = 0.2
+
+
+class TestStartupProbe(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amps = [await AmpEmulator.start(reply_delay=0.01) for _ in range(3)]
+        # The last amp is powered off
+        self.amps[2].silent = True
+        self.entries = []
+        for index, amp in enumerate(self.amps):
+            entry = MagicMock(entry_id=f"amp_{index}", disabled_by=None)
+            entry.data = {
+                "host": "localhost" if index == 1 else "127.0.0.1",
+                "port": amp.port,
+                "udp_timeout": UDP_TIMEOUT,
+                "input_gains": "2\n0\n-3",
+            }
+            self.entries.append(entry)
+        self.hass = MagicMock()
+        self.hass.data = {}
+        self.hass.config_entries.async_entries.return_value = self.entries
+        self.hass.async_create_task = asyncio.ensure_future
+
+    async def asyncTearDown(self):
+        for amp in self.amps:
+            amp.close()
+
+    async def test_whole_fleet_is_known_after_one_timeout_window(self):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async_start_startup_probe(self.hass)
+
+        managers = [
+            Control4Manager(entry.data["host"], entry.data["port"], udp_timeout=UDP_TIMEOUT) for entry in self.entries
+        ]
+        await asyncio.gather(
+            *(
+                async_seed_from_startup_probe(self.hass, entry, manager)
+                for entry, manager in zip(self.entries, managers, strict=True)
+            )
+        )
+
+        self.assertLess(loop.time() - started, UDP_TIMEOUT * 2)
+        self.assertEqual([manager.available for manager in managers], [True, True, False])
+        self.assertGreater(managers[1].zone(3).latency_ms, 0)
+        self.assertIsNone(managers[2].zone(3).latency_ms)
+        self.assertNotIn(DATA_STARTUP_PROBE, self.hass.data)
+
+        # The unreachable amp queues its input gains instead of timing out on each of them
+        await _async_apply_input_gains(self.entries[2], managers[2])
+        self.assertEqual(self.amps[2].commands, [HEARTBEAT_COMMAND])
+        self.assertEqual(len(managers[2].queued), 3)
+
+        # Later setups (e.g. a reload) are not seeded from the old probe
+        manager = Control4Manager("127.0.0.1", self.amps[2].port)
+        await async_seed_from_startup_probe(self.hass, self.entries[2], manager)
+        self.assertTrue(manager.available)
+
+
+if __name__ == "__main__":
+    unittest.main()
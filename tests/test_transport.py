@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.control4_mediaplayer import async_start_record_traffic
+from custom_components.control4_mediaplayer.const import ADDRESS_TTL, RESOLVE_AFTER_FAILURES
+from custom_components.control4_mediaplayer.manager import Control4Manager
+from custom_components.control4_mediaplayer.transport import (
+    RecordingTransport,
+    ReplayTransport,
+    UDPTransport,
+    async_replay_traffic,
+    load_capture,
+    save_capture,
+)
+from tests.amp_emulator import AmpEmulator
+
+REPLY_DELAY = 0.02
+
+
+class TestRecordAndReplay(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amp = await AmpEmulator.start(reply_delay=REPLY_DELAY, unsupported=("c4.amp.mute",))
+        self.manager = Control4Manager("127.0.0.1", self.amp.port, udp_timeout=0.1)
+        self.recorder = RecordingTransport(self.manager.transport, "127.0.0.1")
+        self.manager.transport = self.recorder
+
+    async def asyncTearDown(self):
+        self.amp.close()
+
+    async def test_replay_reproduces_replies_and_timing(self):
+        await self.manager.async_send_batch(["c4.amp.chvol 01 c3", "c4.amp.mute 01 01"])
+        self.amp.silent = True
+        await self.manager.async_send_command("c4.amp.out 01 02")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "capture.json")
+            save_capture(path, self.recorder.capture())
+            capture = load_capture(path)
+        self.assertEqual(
+            [(exchange["command"], exchange["reply"]) for exchange in capture["exchanges"]],
+            [("c4.amp.chvol 01 c3", "000"), ("c4.amp.mute 01 01", "n01"), ("c4.amp.out 01 02", None)],
+        )
+        self.assertGreaterEqual(capture["exchanges"][0]["latency_ms"], REPLY_DELAY * 1000 * 0.75)
+        self.assertLess(capture["exchanges"][0]["at_ms"], capture["exchanges"][1]["at_ms"])
+
+        replayed = Control4Manager("10.0.0.1", 8750, udp_timeout=0.1, transport=ReplayTransport(capture))
+        replies = await replayed.async_send_batch(["c4.amp.chvol 01 c3", "c4.amp.mute 01 01", "c4.amp.out 01 02"])
+
+        self.assertEqual([reply.split()[1] if reply else None for reply, _ in replies], ["000", "n01", None])
+        self.assertTrue(replies[0][0].startswith("0r2a"))
+        self.assertGreaterEqual(replies[0][1], REPLY_DELAY * 1000 * 0.75)
+        # The replayed amp ends up in the same state: acked write shadowed, unanswered one queued
+        self.assertEqual(replayed.registers, {"c4.amp.chvol 01": "c3"})
+        self.assertEqual(list(replayed.queued), ["c4.amp.out 01"])
+
+    async def test_unknown_commands_go_unanswered(self):
+        transport = ReplayTransport({"version": 1, "host": None, "exchanges": []})
+        self.assertIsNone(await transport.async_request("0s2a10", "c4.amp.out 01 02", 0.01))
+        self.assertEqual(transport.misses, 1)
+
+        with self.assertRaises(ValueError):
+            ReplayTransport({"version": 99, "exchanges": []})
+
+    async def test_traffic_replays_with_original_offsets(self):
+        capture = {
+            "version": 1,
+            "host": None,
+            "exchanges": [
+                {"at_ms": 0.0, "command": "c4.amp.chvol 01 c3", "reply": "000", "latency_ms": 5.0},
+                {"at_ms": 60.0, "command": "c4.amp.chvol 02 c3", "reply": "000", "latency_ms": 5.0},
+            ],
+        }
+        manager = Control4Manager("10.0.0.1", 8750, udp_timeout=0.1, transport=ReplayTransport(capture))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        results = await async_replay_traffic(manager, capture)
+
+        self.assertTrue(all(reply for reply, _ in results))
+        self.assertGreaterEqual(loop.time() - started, 0.06)
+
+    async def test_overlapping_identical_commands_share_one_exchange(self):
+        exchange = {"command": "c4.amp.psave 00 00", "reply": "000", "latency_ms": 30.0}
+        capture = {
+            "version": 1,
+            "host": None,
+            "exchanges": [{"at_ms": 0.0, **exchange}, {"at_ms": 10.0, **exchange}, {"at_ms": 60.0, **exchange}],
+        }
+        transport = ReplayTransport(capture)
+        transport.async_request = AsyncMock(wraps=transport.async_request)
+        manager = Control4Manager("10.0.0.1", 8750, udp_timeout=0.1, transport=transport)
+
+        results = await async_replay_traffic(manager, capture)
+
+        # The second caller joins the first one's flight; the third comes after it landed
+        self.assertEqual(transport.async_request.await_count, 2)
+        self.assertEqual(results[0][0], results[1][0])
+        self.assertLess(results[1][1], results[0][1])
+
+
+class TestHostnameResolution(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.amps = [await AmpEmulator.start() for _ in range(2)]
+        self.target = self.amps[0]
+        self.getaddrinfo = MagicMock(
+            side_effect=lambda host, port, **kwargs: [
+                (socket.AF_INET, socket.SOCK_DGRAM, 17, "", ("127.0.0.1", self.target.port))
+            ]
+        )
+        patcher = patch("custom_components.control4_mediaplayer.transport.socket.getaddrinfo", self.getaddrinfo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.transport = UDPTransport("amp.example.lan", 8750)
+        self.addCleanup(self.transport.close)
+
+    async def asyncTearDown(self):
+        for amp in self.amps:
+            amp.close()
+
+    async def test_resolved_once_and_reused(self):
+        for counter in ("0s2a11", "0s2a12", "0s2a13"):
+            reply = await self.transport.async_request(counter, "c4.amp.out 01 02", 0.2)
+            self.assertEqual(reply, f"0r2a{counter[-2:]} 000")
+        self.getaddrinfo.assert_called_once()
+        self.assertEqual(len(self.amps[0].commands), 3)
+
+        # The cached address expires after its TTL
+        self.transport._resolved_at -= ADDRESS_TTL + 1
+        await self.transport.async_request("0s2a14", "c4.amp.out 01 02", 0.2)
+        self.assertEqual(self.getaddrinfo.call_count, 2)
+
+    async def test_re_resolved_after_repeated_failures(self):
+        await self.transport.async_request("0s2a11", "c4.amp.out 01 02", 0.2)
+
+        # The amp moves: the old address stops answering, the name now points at the new one
+        self.amps[0].silent = True
+        self.target = self.amps[1]
+        for _ in range(RESOLVE_AFTER_FAILURES):
+            self.assertIsNone(await self.transport.async_request("0s2a12", "c4.amp.out 01 02", 0.05))
+
+        self.assertEqual(await self.transport.async_request("0s2a13", "c4.amp.out 01 02", 0.2), "0r2a13 000")
+        self.assertEqual(self.amps[1].commands, ["c4.amp.out 01 02"])
+        self.assertEqual(self.getaddrinfo.call_count, 2)
+
+    async def test_ip_addresses_are_not_resolved_again(self):
+        transport = UDPTransport("127.0.0.1", self.amps[0].port)
+        self.addCleanup(transport.close)
+        self.amps[0].silent = True
+        for _ in range(RESOLVE_AFTER_FAILURES + 1):
+            await transport.async_request("0s2a11", "c4.amp.out 01 02", 0.02)
+        self.amps[0].silent = False
+        self.assertEqual(await transport.async_request("0s2a12", "c4.amp.out 01 02", 0.2), "0r2a12 000")
+        self.assertLessEqual(self.getaddrinfo.call_count, 1)
+
+
+class TestRecordTrafficService(unittest.IsolatedAsyncioTestCase):
+    async def test_records_targeted_amps_in_the_background(self):
+        amp = await AmpEmulator.start()
+        try:
+            manager = Control4Manager("127.0.0.1", amp.port, udp_timeout=0.5)
+            entry = MagicMock(entry_id="amp_0", state=ConfigEntryState.LOADED)
+            entry.runtime_data.manager = manager
+            tasks = []
+            entry.async_create_background_task = lambda hass, coro, name: tasks.append(asyncio.ensure_future(coro))
+            hass = MagicMock()
+            hass.config_entries.async_entries.return_value = [entry]
+            hass.async_add_executor_job = AsyncMock()
+
+            with tempfile.TemporaryDirectory() as directory:
+                hass.config.path = lambda name: os.path.join(directory, name)
+                with patch("custom_components.control4_mediaplayer.er") as er_mock:
+                    er_mock.async_get.return_value.async_get.side_effect = {
+                        "media_player.zone_1": MagicMock(config_entry_id="amp_0")
+                    }.get
+                    response = async_start_record_traffic(hass, ["media_player.zone_1"], 0.05)
+
+            # The call returns at once while the amp keeps recording
+            [result] = response["amps"]
+            self.assertEqual((result["host"], response["duration"]), ("127.0.0.1", 0.05))
+            self.assertIsInstance(manager.transport, RecordingTransport)
+            await manager.async_send_command("c4.amp.out 01 02")
+            await asyncio.gather(*tasks)
+
+            self.assertIsInstance(manager.transport, UDPTransport)
+            _, path, capture = hass.async_add_executor_job.await_args.args
+            self.assertEqual(path, result["file"])
+            self.assertTrue(path.endswith("control4_capture_127.0.0.1.json"))
+            self.assertEqual(
+                [exchange["command"] for exchange in json.loads(json.dumps(capture))["exchanges"]], ["c4.amp.out 01 02"]
+            )
+        finally:
+            amp.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,8 +20,15 @@ if not HAS_HOMEASSISTANT:
     # 2. Mock homeassistant.config_entries
     ha_ce = ModuleType("homeassistant.config_entries")
     class DummyConfigEntry:
-        pass
+        def __class_getitem__(cls, item):
+            return cls
     ha_ce.ConfigEntry = DummyConfigEntry
+    from enum import Enum
+    class DummyConfigEntryState(Enum):
+        LOADED = "loaded"
+        SETUP_IN_PROGRESS = "setup_in_progress"
+        NOT_LOADED = "not_loaded"
+    ha_ce.ConfigEntryState = DummyConfigEntryState
     sys.modules["homeassistant.config_entries"] = ha_ce
 
     # 3. Mock homeassistant.core
@@ -29,12 +36,35 @@ if not HAS_HOMEASSISTANT:
     class DummyHomeAssistant:
         pass
     ha_core.HomeAssistant = DummyHomeAssistant
+    ha_core.callback = lambda func: func
+    class DummyEvent:
+        pass
+    ha_core.Event = DummyEvent
+    ha_core.ServiceCall = MagicMock
+    ha_core.ServiceResponse = dict
+    class DummySupportsResponse:
+        NONE = "none"
+        OPTIONAL = "optional"
+        ONLY = "only"
+    ha_core.SupportsResponse = DummySupportsResponse
     sys.modules["homeassistant.core"] = ha_core
 
+    # 3a. Mock homeassistant.exceptions
+    ha_exc = ModuleType("homeassistant.exceptions")
+    class DummyHomeAssistantError(Exception):
+        pass
+    class DummyServiceValidationError(DummyHomeAssistantError):
+        pass
+    ha_exc.HomeAssistantError = DummyHomeAssistantError
+    ha_exc.ServiceValidationError = DummyServiceValidationError
+    sys.modules["homeassistant.exceptions"] = ha_exc
+
     # 4. Mock homeassistant.const
     ha_const = ModuleType("homeassistant.const")
     ha_const.STATE_OFF = "off"
     ha_const.STATE_ON = "on"
+    ha_const.STATE_UNAVAILABLE = "unavailable"
+    ha_const.STATE_UNKNOWN = "unknown"
     sys.modules["homeassistant.const"] = ha_const
 
     # 5. Mock homeassistant.helpers
@@ -44,13 +74,50 @@ if not HAS_HOMEASSISTANT:
     # 6. Mock homeassistant.helpers.device_registry
     ha_dr = ModuleType("homeassistant.helpers.device_registry")
     ha_dr.DeviceInfo = MagicMock()
+    ha_dr.async_get = MagicMock()
     sys.modules["homeassistant.helpers.device_registry"] = ha_dr
 
     # 7. Mock homeassistant.helpers.entity_registry
     ha_er = ModuleType("homeassistant.helpers.entity_registry")
     ha_er.async_get = MagicMock()
+    ha_er.EVENT_ENTITY_REGISTRY_UPDATED = "entity_registry_updated"
     sys.modules["homeassistant.helpers.entity_registry"] = ha_er
 
+    # 7a. Mock homeassistant.helpers.event
+    ha_event = ModuleType("homeassistant.helpers.event")
+    ha_event.async_track_time_interval = MagicMock()
+    sys.modules["homeassistant.helpers.event"] = ha_event
+    ha_event.async_track_state_change_event = MagicMock()
+
+    # 7a. Mock homeassistant.helpers.start / homeassistant.loader
+    ha_start = ModuleType("homeassistant.helpers.start")
+    ha_start.async_at_started = MagicMock()
+    sys.modules["homeassistant.helpers.start"] = ha_start
+    ha_loader = ModuleType("homeassistant.loader")
+    ha_loader.async_get_integration = AsyncMock()
+    sys.modules["homeassistant.loader"] = ha_loader
+
+    # 7a. Mock homeassistant.helpers.issue_registry
+    ha_ir = ModuleType("homeassistant.helpers.issue_registry")
+    ha_ir.async_create_issue = MagicMock()
+    ha_ir.async_delete_issue = MagicMock()
+    ha_ir.IssueSeverity = MagicMock()
+    sys.modules["homeassistant.helpers.issue_registry"] = ha_ir
+
+    # 7b. Mock homeassistant.helpers.storage
+    ha_storage = ModuleType("homeassistant.helpers.storage")
+    ha_storage.Store = MagicMock()
+    sys.modules["homeassistant.helpers.storage"] = ha_storage
+
+    # 7c. Mock homeassistant.helpers.dispatcher / debounce
+    ha_dispatcher = ModuleType("homeassistant.helpers.dispatcher")
+    ha_dispatcher.async_dispatcher_connect = MagicMock()
+    ha_dispatcher.async_dispatcher_send = MagicMock()
+    sys.modules["homeassistant.helpers.dispatcher"] = ha_dispatcher
+    ha_debounce = ModuleType("homeassistant.helpers.debounce")
+    ha_debounce.Debouncer = MagicMock()
+    sys.modules["homeassistant.helpers.debounce"] = ha_debounce
+
     # 7b. Mock homeassistant.helpers.restore_state
     ha_rs = ModuleType("homeassistant.helpers.restore_state")
     class DummyRestoreEntity:
@@ -68,8 +135,13 @@ if not HAS_HOMEASSISTANT:
     # 9. Mock homeassistant.components.media_player
     ha_mp = ModuleType("homeassistant.components.media_player")
     class DummyMediaPlayerEntity:
+        @property
+        def unique_id(self):
+            return getattr(self, "_attr_unique_id", None)
         def async_write_ha_state(self):
             pass
+        def async_on_remove(self, func):
+            pass
     ha_mp.MediaPlayerEntity = DummyMediaPlayerEntity
     class DummyMediaPlayerEntityFeature:
         VOLUME_SET = 1
@@ -81,11 +153,35 @@ if not HAS_HOMEASSISTANT:
     ha_mp.MediaPlayerEntityFeature = DummyMediaPlayerEntityFeature
     sys.modules["homeassistant.components.media_player"] = ha_mp
 
+    # 9a. Mock homeassistant.components.websocket_api
+    ha_ws = ModuleType("homeassistant.components.websocket_api")
+    ha_ws.ActiveConnection = MagicMock
+    ha_ws.async_register_command = MagicMock()
+    ha_ws.websocket_command = lambda schema: lambda func: func
+    ha_ws.event_message = lambda msg_id, event: {"id": msg_id, "type": "event", "event": event}
+    sys.modules["homeassistant.components.websocket_api"] = ha_ws
+    ha_comp.websocket_api = ha_ws
+
+    # 9b. voluptuous ships with Home Assistant
+    try:
+        import voluptuous  # noqa: F401
+    except ModuleNotFoundError:
+        vol = ModuleType("voluptuous")
+        vol.Required = lambda key, **kwargs: key
+        vol.Optional = lambda key, **kwargs: key
+        vol.Schema = MagicMock()
+        sys.modules["voluptuous"] = vol
+
     # 10. Mock homeassistant.components.number
     ha_num = ModuleType("homeassistant.components.number")
     class DummyNumberEntity:
+        @property
+        def unique_id(self):
+            return getattr(self, "_attr_unique_id", None)
         def async_write_ha_state(self):
             pass
+        def async_on_remove(self, func):
+            pass
         @property
         def native_value(self):
             return getattr(self, "_attr_native_value", None)
@@ -101,11 +197,20 @@ if not HAS_HOMEASSISTANT:
     sys.modules["homeassistant.components.number"] = ha_num
 
 # Now import the actual code
-from custom_components.control4_mediaplayer.const import DOMAIN  # noqa: E402
+from custom_components.control4_mediaplayer.manager import Control4Manager  # noqa: E402
 from custom_components.control4_mediaplayer.media_player import C4MediaPlayer  # noqa: E402
+from custom_components.control4_mediaplayer.models import Control4Data  # noqa: E402
 from custom_components.control4_mediaplayer.number import C4MaxVolumeNumber  # noqa: E402
 
 
+def mock_manager():
+    """MagicMock manager that still keeps real shared zone state."""
+    manager = MagicMock()
+    manager.zones = {}
+    manager.zone = lambda channel: Control4Manager.zone(manager, channel)
+    return manager
+
+
 class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
     async def test_volume_capping_and_sync(self):
         # Setup mocks
@@ -115,11 +220,14 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         entry.data = {
             "host": "10.0.12.246",
             "port": 8750,
-            "channel": 1,
-            "zone_custom_name": "Living Room",
             "name": "Matrix Amp",
-            "source_list": "Apple TV\nSonos\nSpotify",
-            "on_volume": 50,
+            "zones": {
+                "1": {
+                    "zone_custom_name": "Living Room",
+                    "source_list": "Apple TV\nSonos\nSpotify",
+                    "on_volume": 50,
+                },
+            },
         }
         
         def mock_async_update_entry(e, data=None, options=None):
@@ -127,18 +235,12 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
                 e.data.update(data)
         hass.config_entries.async_update_entry = mock_async_update_entry
         
-        manager = MagicMock()
+        manager = mock_manager()
         manager.async_send_command = AsyncMock(return_value="OK")
         manager.async_set_max_volume = AsyncMock()
         manager.async_set_power_save = AsyncMock()
         
-        hass.data = {
-            DOMAIN: {
-                "test_entry_id": {
-                    "manager": manager
-                }
-            }
-        }
+        entry.runtime_data = Control4Data(manager=manager, register_store=MagicMock(), applied_data={})
         
         device_info = MagicMock()
         
@@ -148,12 +250,11 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         # Give media_player a mock hass
         media_player.hass = hass
         
-        # Store media_player in hass.data
-        hass.data[DOMAIN]["test_entry_id"]["media_player"] = media_player
+        # Register media_player in the entry's runtime data
+        entry.runtime_data.media_players[1] = media_player
         
         max_volume_number = C4MaxVolumeNumber(hass, entry, manager, "10.0.12.246", 1, device_info, "Living Room")
         max_volume_number.entity_id = "number.living_room_max_volume"
-        hass.data[DOMAIN]["test_entry_id"]["max_volume_entity"] = max_volume_number
         
         # 1. Test max volume property retrieval
         self.assertEqual(media_player.max_volume, 1.0)  # Default max volume entity native value is 100 -> 1.0
@@ -175,7 +276,7 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         
         # 3. Test volume capping during async_turn_on
         # Let's reset the volume to a safe level under the max
-        media_player._volume = 0.2
+        media_player._zone.volume = 0.2
         # Turn on should use entry's "on_volume" (50) which exceeds max (40), so it caps to 40
         await media_player.async_turn_on()
         self.assertEqual(media_player.volume_level, 0.4)
@@ -212,23 +313,16 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         entry.data = {
             "host": "10.0.12.246",
             "port": 8750,
-            "channel": 1,
-            "zone_custom_name": "Living Room",
             "name": "Matrix Amp",
+            "zones": {"1": {"zone_custom_name": "Living Room"}},
         }
         
-        manager = MagicMock()
+        manager = mock_manager()
         manager.async_send_command = AsyncMock(return_value="OK")
         manager.async_set_max_volume = AsyncMock()
         
-        hass.data = {
-            DOMAIN: {
-                "test_entry_id": {
-                    "manager": manager
-                }
-            },
-            "entity_registry": MagicMock()
-        }
+        hass.data = {"entity_registry": MagicMock()}
+        entry.runtime_data = Control4Data(manager=manager, register_store=MagicMock(), applied_data={})
         
         # Instantiate media player
         media_player = C4MediaPlayer("10.0.12.246", 8750, 1, "Living Room", entry, manager)
@@ -239,17 +333,13 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         device_info = MagicMock()
         max_volume_number = C4MaxVolumeNumber(hass, entry, manager, "10.0.12.246", 1, device_info, "Living Room")
         max_volume_number.entity_id = "number.living_room_max_volume"
-        max_volume_number._attr_native_value = 80.0 # max volume is 80%
-        hass.data[DOMAIN]["test_entry_id"]["max_volume_entity"] = max_volume_number
-        hass.data[DOMAIN]["test_entry_id"]["media_player"] = media_player
+        max_volume_number._zone.max_volume = 80.0 # max volume is 80%
+        entry.runtime_data.media_players[1] = media_player
         
         # Setup mock last state: playing (on) at 0.9 (90%) volume
-        class DummyState:
-            def __init__(self, state, volume_level):
-                self.state = state
-                self.attributes = {"volume_level": volume_level}
-                
-        mock_state = DummyState("on", 0.9)
+        from tests.helpers import DummyState
+
+        mock_state = DummyState("on", volume_level=0.9)
         media_player._mock_last_state = mock_state
         media_player.async_get_last_state = AsyncMock(return_value=mock_state)
         
@@ -268,16 +358,16 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         hass = MagicMock()
         entry = MagicMock()
         entry.entry_id = "test_entry_id"
-        entry.data = {"host": "10.0.12.246", "port": 8750, "channel": 1}
+        entry.data = {"host": "10.0.12.246", "port": 8750, "zones": {"1": {}}}
         
-        manager = MagicMock()
+        manager = mock_manager()
         # Native mute succeeds and returns a matched ACK prefix with "000"
         manager.async_send_command = AsyncMock(return_value="0r2a49 000")
         
         media_player = C4MediaPlayer("10.0.12.246", 8750, 1, "Living Room", entry, manager)
         media_player.entity_id = "media_player.living_room"
         media_player.hass = hass
-        media_player._volume = 0.25
+        media_player._zone.volume = 0.25
         
         await media_player.async_mute_volume(True)
         
@@ -289,16 +379,16 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         hass = MagicMock()
         entry = MagicMock()
         entry.entry_id = "test_entry_id"
-        entry.data = {"host": "10.0.12.246", "port": 8750, "channel": 1}
+        entry.data = {"host": "10.0.12.246", "port": 8750, "zones": {"1": {}}}
         
-        manager = MagicMock()
+        manager = mock_manager()
         # Native mute returns None (timeout) or "n01" (error/not supported)
         manager.async_send_command = AsyncMock(return_value=None)
         
         media_player = C4MediaPlayer("10.0.12.246", 8750, 1, "Living Room", entry, manager)
         media_player.entity_id = "media_player.living_room"
         media_player.hass = hass
-        media_player._volume = 0.25
+        media_player._zone.volume = 0.25
         
         await media_player.async_mute_volume(True)
         
@@ -317,10 +407,8 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         entry.data = {
             "host": "10.0.12.246",
             "port": 8750,
-            "channel": 1,
-            "zone_custom_name": "Living Room",
             "name": "Matrix Amp",
-            "enable_eq": False,
+            "zones": {"1": {"zone_custom_name": "Living Room", "enable_eq": False}},
         }
         
         def mock_async_update_entry(e, data=None, options=None):
@@ -328,17 +416,11 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
                 e.data.update(data)
         hass.config_entries.async_update_entry = mock_async_update_entry
         
-        manager = MagicMock()
+        manager = mock_manager()
         mock_ent_reg = MagicMock()
         mock_ent_reg.async_get_entity_id.return_value = None
-        hass.data = {
-            DOMAIN: {
-                "test_entry_id": {
-                    "manager": manager
-                }
-            },
-            "entity_registry": mock_ent_reg
-        }
+        hass.data = {"entity_registry": mock_ent_reg}
+        entry.runtime_data = Control4Data(manager=manager, register_store=MagicMock(), applied_data={})
         
         registered_entities = []
         def mock_add_entities(entities, update_before_add=False):
@@ -351,7 +433,7 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(registered_entities[0].__class__.__name__, "C4MaxVolumeNumber")
         
         # 2. Verify EQ entities ARE created if enable_eq is True
-        entry.data["enable_eq"] = True
+        entry.data["zones"]["1"]["enable_eq"] = True
         registered_entities.clear()
         
         await async_setup_entry(hass, entry, mock_add_entities)
@@ -412,19 +494,21 @@ class TestVolumeCappingAndSync(unittest.IsolatedAsyncioTestCase):
         
         # Call async_added_to_hass to trigger restoration
         manager.async_send_command = AsyncMock()
+        manager.registers = {"c4.amp.bassgain 01": "fe"}
         await treble_entity.async_added_to_hass()
         await bass_entity.async_added_to_hass()
         await bal_entity.async_added_to_hass()
         
-        # Assert restored values are loaded and synced to hardware
+        # Restored values are loaded silently; reconciliation sends only what the amp doesn't hold
+        manager.async_send_command.assert_not_called()
         self.assertEqual(treble_entity.native_value, 5.0)
-        manager.async_send_command.assert_any_call("c4.amp.trebgain 01 05")
+        self.assertEqual(treble_entity.async_reconcile_commands(), ["c4.amp.trebgain 01 05"])
         
         self.assertEqual(bass_entity.native_value, -2.0)
-        manager.async_send_command.assert_any_call("c4.amp.bassgain 01 fe")
+        self.assertEqual(bass_entity.async_reconcile_commands(), [])
         
         self.assertEqual(bal_entity.native_value, -1.0)
-        manager.async_send_command.assert_any_call("c4.amp.bal 01 ff")
+        self.assertEqual(bal_entity.async_reconcile_commands(), ["c4.amp.bal 01 ff"])
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from custom_components.control4_mediaplayer.const import DOMAIN
+from custom_components.control4_mediaplayer.websocket_api import (
+    DATA_ZONE_MAP,
+    async_get_zone_map,
+    async_invalidate_zone_map,
+    async_setup_websocket_api,
+    ws_subscribe_zones,
+    ws_zones,
+)
+
+
+def _reg_entry(unique_id, entity_id, disabled_by=None):
+    return MagicMock(unique_id=unique_id, entity_id=entity_id, disabled_by=disabled_by)
+
+
+class TestZoneMap(unittest.TestCase):
+    def setUp(self):
+        self.hass = MagicMock()
+        self.hass.data = {}
+        self.entry = MagicMock()
+        self.entry.entry_id = "amp_1"
+        self.entry.data = {
+            "host": "10.0.12.246",
+            "name": "Matrix Amp",
+            "zones": {"1": {"zone_custom_name": "Kitchen"}, "2": {"zone_custom_name": "Den"}, "3": {}},
+        }
+        self.hass.config_entries.async_entries.return_value = [self.entry]
+        self.registry = [
+            _reg_entry("v27_10.0.12.246_ch2", "media_player.den"),
+            _reg_entry("v27_10.0.12.246_ch1", "media_player.kitchen"),
+            _reg_entry("v27_10.0.12.246_ch1_max_volume", "number.kitchen_max_volume"),
+            _reg_entry("v27_10.0.12.246_ch1_bass", "number.kitchen_bass"),
+            _reg_entry("v27_10.0.12.246_ch2_treble", "number.den_treble", disabled_by="user"),
+            # Zone 3 has no media player entity and is left out
+            _reg_entry("v27_10.0.12.246_ch3_max_volume", "number.zone_3_max_volume"),
+        ]
+
+    def test_zone_map_is_compact_and_cached(self):
+        with patch("custom_components.control4_mediaplayer.websocket_api.er") as er_mock:
+            er_mock.async_entries_for_config_entry.return_value = self.registry
+            zone_map = async_get_zone_map(self.hass)
+            self.assertIs(async_get_zone_map(self.hass), zone_map)
+            self.assertEqual(er_mock.async_entries_for_config_entry.call_count, 1)
+
+            self.assertEqual(
+                zone_map["amps"][0]["zones"],
+                [
+                    {
+                        "channel": 1,
+                        "name": "Kitchen",
+                        "media_player": "media_player.kitchen",
+                        "entities": {"max_volume": "number.kitchen_max_volume", "bass": "number.kitchen_bass"},
+                    },
+                    {"channel": 2, "name": "Den", "media_player": "media_player.den", "entities": {}},
+                ],
+            )
+
+            # Invalidation forces one rebuild on the next request
+            async_invalidate_zone_map(self.hass)
+            async_get_zone_map(self.hass)
+            self.assertEqual(er_mock.async_entries_for_config_entry.call_count, 2)
+
+    def test_ws_command_returns_the_map(self):
+        connection = MagicMock()
+        with patch("custom_components.control4_mediaplayer.websocket_api.er") as er_mock:
+            er_mock.async_entries_for_config_entry.return_value = self.registry
+            ws_zones(self.hass, connection, {"id": 7, "type": f"{DOMAIN}/zones"})
+        msg_id, result = connection.send_result.call_args.args
+        self.assertEqual(msg_id, 7)
+        self.assertEqual(result["amps"][0]["entry_id"], "amp_1")
+
+    def test_subscription_pushes_snapshot_then_deltas(self):
+        states = {
+            "media_player.kitchen": MagicMock(
+                state="on", attributes={"volume_level": 0.4, "source": "Sonos", "is_volume_muted": False}
+            ),
+            "media_player.den": MagicMock(state="off", attributes={}),
+            "number.kitchen_max_volume": MagicMock(state="80.0"),
+            "number.kitchen_bass": MagicMock(state="2.0"),
+        }
+        self.hass.states.get.side_effect = states.get
+        connection = MagicMock()
+        connection.subscriptions = {}
+        module = "custom_components.control4_mediaplayer.websocket_api"
+        with (
+            patch(f"{module}.er") as er_mock,
+            patch(f"{module}.async_track_state_change_event") as track_mock,
+            patch(f"{module}.async_dispatcher_connect"),
+            patch(f"{module}.Debouncer"),
+        ):
+            er_mock.async_entries_for_config_entry.return_value = self.registry
+            ws_subscribe_zones(self.hass, connection, {"id": 3, "type": f"{DOMAIN}/subscribe_zones"})
+
+            tracked, on_change = track_mock.call_args.args[1:]
+            self.assertEqual(
+                sorted(tracked),
+                ["media_player.den", "media_player.kitchen", "number.kitchen_bass", "number.kitchen_max_volume"],
+            )
+            full = connection.send_message.call_args.args[0]["event"]
+            self.assertTrue(full["full"])
+            self.assertEqual(
+                full["zones"]["media_player.kitchen"],
+                {
+                    "state": "on",
+                    "available": True,
+                    "volume": 40,
+                    "source": "Sonos",
+                    "muted": False,
+                    "max_volume": 80.0,
+                    "bass": 2.0,
+                },
+            )
+
+            # Only the changed field of the changed zone is pushed
+            states["number.kitchen_bass"] = MagicMock(state="-3.0")
+            on_change(MagicMock(data={"entity_id": "number.kitchen_bass"}))
+            self.assertEqual(
+                connection.send_message.call_args.args[0]["event"],
+                {"zones": {"media_player.kitchen": {"bass": -3.0}}},
+            )
+
+            # A state write that changes nothing the card shows sends nothing
+            connection.send_message.reset_mock()
+            on_change(MagicMock(data={"entity_id": "media_player.kitchen"}))
+            connection.send_message.assert_not_called()
+
+            states["media_player.den"] = MagicMock(state="unavailable", attributes={})
+            on_change(MagicMock(data={"entity_id": "media_player.den"}))
+            self.assertEqual(
+                connection.send_message.call_args.args[0]["event"],
+                {"zones": {"media_player.den": {"state": "unavailable", "available": False}}},
+            )
+
+            connection.subscriptions[3]()
+            track_mock.return_value.assert_called_once()
+
+    def test_only_own_registry_updates_invalidate_the_map(self):
+        with patch("custom_components.control4_mediaplayer.websocket_api.websocket_api"):
+            async_setup_websocket_api(self.hass)
+        event_filter = self.hass.bus.async_listen.call_args.kwargs["event_filter"]
+
+        with patch("custom_components.control4_mediaplayer.websocket_api.er") as er_mock:
+            er_mock.async_entries_for_config_entry.return_value = self.registry
+            async_get_zone_map(self.hass)
+            er_mock.async_get.return_value.async_get.side_effect = {
+                "light.porch": MagicMock(platform="hue"),
+                "number.kitchen_treble": MagicMock(platform=DOMAIN),
+            }.get
+
+            self.assertFalse(event_filter({"action": "update", "entity_id": "light.porch"}))
+            self.assertTrue(event_filter({"action": "create", "entity_id": "number.kitchen_treble"}))
+            # Removed entities are no longer in the registry: judged by the cached map
+            self.assertFalse(event_filter({"action": "remove", "entity_id": "light.porch"}))
+            self.assertTrue(event_filter({"action": "remove", "entity_id": "number.kitchen_bass"}))
+        self.assertIn(DATA_ZONE_MAP, self.hass.data)
+
+
+if __name__ == "__main__":
+    unittest.main()